@@ -0,0 +1,47 @@
+"""Data version counter bumped by every write to grants
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_versions",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('grants', 1)")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_grants_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO data_versions (name, version, updated_at)
+            VALUES ('grants', 1, now())
+            ON CONFLICT (name) DO UPDATE
+            SET version = data_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_grants_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON grants
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_grants_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_grants_version ON grants")
+    op.execute("DROP FUNCTION IF EXISTS bump_grants_version()")
+    op.drop_table("data_versions")
@@ -0,0 +1,63 @@
+"""Composite and partial indexes matching /grants filter+sort combinations
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = "status IN ('open', 'closing_soon')"
+
+
+def upgrade() -> None:
+    # Redundant: source_id has a unique constraint, and source / deadline are
+    # prefixes of the composites below.
+    op.drop_index("idx_grants_source_id", table_name="grants")
+    op.drop_index("idx_grants_source", table_name="grants")
+    op.drop_index("idx_grants_deadline", table_name="grants")
+
+    op.create_index("idx_grants_deadline_id", "grants", ["application_deadline", "id"])
+    op.create_index("idx_grants_source_deadline_id", "grants", ["source", "application_deadline", "id"])
+    op.create_index(
+        "idx_grants_amount_id", "grants",
+        [sa.text("amount_max DESC NULLS LAST"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "idx_grants_source_amount_id", "grants",
+        ["source", sa.text("amount_max DESC NULLS LAST"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "idx_grants_created_id", "grants",
+        [sa.text("created_at DESC NULLS LAST"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "idx_grants_live_deadline_id", "grants",
+        ["application_deadline", "id"],
+        postgresql_where=sa.text(LIVE),
+    )
+    op.create_index(
+        "idx_grants_live_amount_id", "grants",
+        [sa.text("amount_max DESC NULLS LAST"), sa.text("id DESC")],
+        postgresql_where=sa.text(LIVE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_grants_live_amount_id", table_name="grants")
+    op.drop_index("idx_grants_live_deadline_id", table_name="grants")
+    op.drop_index("idx_grants_created_id", table_name="grants")
+    op.drop_index("idx_grants_source_amount_id", table_name="grants")
+    op.drop_index("idx_grants_amount_id", table_name="grants")
+    op.drop_index("idx_grants_source_deadline_id", table_name="grants")
+    op.drop_index("idx_grants_deadline_id", table_name="grants")
+
+    op.create_index("idx_grants_deadline", "grants", ["application_deadline"])
+    op.create_index("idx_grants_source", "grants", ["source"])
+    op.create_index("idx_grants_source_id", "grants", ["source_id"])
@@ -0,0 +1,78 @@
+"""Change feed: per-row change xid and tombstones for deleted grants
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("grants", sa.Column("change_xid", sa.BigInteger))
+    op.execute("UPDATE grants SET change_xid = pg_current_xact_id()::text::bigint")
+    op.create_index("idx_grants_change_xid_id", "grants", ["change_xid", "id"])
+
+    op.create_table(
+        "grant_tombstones",
+        sa.Column("grant_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("source_id", sa.String(200)),
+        sa.Column("change_xid", sa.BigInteger, nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "idx_grant_tombstones_change_xid_id", "grant_tombstones", ["change_xid", "grant_id"]
+    )
+
+    # Sync upserts rewrite every row; only bump the xid when content changed.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION grants_track_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT'
+               OR (to_jsonb(NEW) - 'last_synced_at' - 'updated_at' - 'change_xid')
+                  IS DISTINCT FROM (to_jsonb(OLD) - 'last_synced_at' - 'updated_at' - 'change_xid') THEN
+                NEW.change_xid := pg_current_xact_id()::text::bigint;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_grants_change
+        BEFORE INSERT OR UPDATE ON grants
+        FOR EACH ROW EXECUTE FUNCTION grants_track_change()
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION grants_record_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO grant_tombstones (grant_id, source_id, change_xid, deleted_at)
+            VALUES (OLD.id, OLD.source_id, pg_current_xact_id()::text::bigint, now())
+            ON CONFLICT (grant_id) DO UPDATE
+            SET change_xid = EXCLUDED.change_xid, deleted_at = EXCLUDED.deleted_at;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_grants_tombstone
+        AFTER DELETE ON grants
+        FOR EACH ROW EXECUTE FUNCTION grants_record_tombstone()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_grants_tombstone ON grants")
+    op.execute("DROP FUNCTION IF EXISTS grants_record_tombstone()")
+    op.execute("DROP TRIGGER IF EXISTS trg_grants_change ON grants")
+    op.execute("DROP FUNCTION IF EXISTS grants_track_change()")
+    op.drop_table("grant_tombstones")
+    op.drop_index("idx_grants_change_xid_id", table_name="grants")
+    op.drop_column("grants", "change_xid")
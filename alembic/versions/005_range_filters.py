@@ -0,0 +1,39 @@
+"""Indexes for deadline window, amount overlap and category filters
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Deadline windows are served by idx_grants_deadline_id (003).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION grant_amount_range(lo bigint, hi bigint) RETURNS int8range AS $$
+            SELECT CASE
+                WHEN lo IS NULL AND hi IS NULL THEN NULL
+                WHEN lo > hi THEN int8range(hi, lo, '[]')
+                ELSE int8range(lo, hi, '[]')
+            END
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """)
+    op.create_index(
+        "idx_grants_amount_range", "grants",
+        [sa.text("grant_amount_range(amount_min, amount_max)")],
+        postgresql_using="gist",
+    )
+    op.create_index("idx_grants_category", "grants", ["category"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_grants_category", table_name="grants")
+    op.drop_index("idx_grants_amount_range", table_name="grants")
+    op.execute("DROP FUNCTION IF EXISTS grant_amount_range(bigint, bigint)")
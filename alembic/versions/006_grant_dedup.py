@@ -0,0 +1,51 @@
+"""Near-duplicate grouping: canonical_id plus MinHash fingerprints and LSH buckets
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "grants",
+        sa.Column("canonical_id", UUID(as_uuid=True), sa.ForeignKey("grants.id", ondelete="SET NULL")),
+    )
+    op.create_index("idx_grants_canonical_id", "grants", ["canonical_id"])
+
+    op.create_table(
+        "grant_fingerprints",
+        sa.Column(
+            "grant_id", UUID(as_uuid=True),
+            sa.ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("text_hash", sa.String(32), nullable=False),
+        sa.Column("signature", ARRAY(sa.BigInteger), nullable=False),
+    )
+    op.create_table(
+        "grant_lsh_buckets",
+        sa.Column("band", sa.SmallInteger, primary_key=True),
+        sa.Column("bucket", sa.BigInteger, primary_key=True),
+        sa.Column(
+            "grant_id", UUID(as_uuid=True),
+            sa.ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True,
+        ),
+    )
+    op.create_index("idx_grant_lsh_buckets_grant_id", "grant_lsh_buckets", ["grant_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_grant_lsh_buckets_grant_id", table_name="grant_lsh_buckets")
+    op.drop_table("grant_lsh_buckets")
+    op.drop_table("grant_fingerprints")
+    op.drop_index("idx_grants_canonical_id", table_name="grants")
+    op.drop_column("grants", "canonical_id")
@@ -0,0 +1,114 @@
+"""Grant stats rollups maintained by statement-level triggers on grants
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRANSITIONS = (
+    ("INSERT", "NEW TABLE AS new_rows"),
+    ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("DELETE", "OLD TABLE AS old_rows"),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "grant_rollups",
+        sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("dimension", sa.String(20), nullable=False),
+        sa.Column("key", sa.Text),
+        sa.Column("source", sa.String(50), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("category", sa.String(100)),
+        sa.Column("canonical", sa.Boolean, nullable=False),
+        sa.Column("grant_count", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+        sa.Column("amount_max_sum", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+    )
+    op.create_index(
+        "uq_grant_rollups_group", "grant_rollups",
+        ["dimension", "key", "source", "status", "category", "canonical"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION grants_rollup_delta() RETURNS trigger AS $$
+        DECLARE
+            changes text;
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM grant_rollups;
+                RETURN NULL;
+            END IF;
+            changes := CASE TG_OP
+                WHEN 'INSERT' THEN 'SELECT *, 1 AS sign FROM new_rows'
+                WHEN 'DELETE' THEN 'SELECT *, -1 AS sign FROM old_rows'
+                ELSE 'SELECT *, 1 AS sign FROM new_rows UNION ALL SELECT *, -1 FROM old_rows'
+            END;
+            EXECUTE format($q$
+                INSERT INTO grant_rollups AS r
+                    (dimension, key, source, status, category, canonical, grant_count, amount_max_sum)
+                SELECT d.dimension, d.key, c.source, c.status, c.category, c.canonical_id IS NULL,
+                       sum(c.sign), coalesce(sum(c.sign * c.amount_max), 0)
+                FROM (%s) AS c
+                CROSS JOIN LATERAL (VALUES
+                    ('category', c.category),
+                    ('organization', c.organization),
+                    ('source', c.source),
+                    ('deadline_month', to_char(c.application_deadline, 'YYYY-MM'))
+                ) AS d (dimension, key)
+                GROUP BY 1, 2, 3, 4, 5, 6
+                HAVING sum(c.sign) <> 0 OR coalesce(sum(c.sign * c.amount_max), 0) <> 0
+                ON CONFLICT (dimension, key, source, status, category, canonical) DO UPDATE
+                SET grant_count = r.grant_count + EXCLUDED.grant_count,
+                    amount_max_sum = r.amount_max_sum + EXCLUDED.amount_max_sum
+            $q$, changes);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Backfill and attach the triggers in one go so no write is missed or counted twice.
+    op.execute("LOCK TABLE grants IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("""
+        INSERT INTO grant_rollups
+            (dimension, key, source, status, category, canonical, grant_count, amount_max_sum)
+        SELECT d.dimension, d.key, g.source, g.status, g.category, g.canonical_id IS NULL,
+               count(*), coalesce(sum(g.amount_max), 0)
+        FROM grants AS g
+        CROSS JOIN LATERAL (VALUES
+            ('category', g.category),
+            ('organization', g.organization),
+            ('source', g.source),
+            ('deadline_month', to_char(g.application_deadline, 'YYYY-MM'))
+        ) AS d (dimension, key)
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+    for event, transition in TRANSITIONS:
+        op.execute(f"""
+            CREATE TRIGGER trg_grants_rollup_{event.lower()}
+            AFTER {event} ON grants REFERENCING {transition}
+            FOR EACH STATEMENT EXECUTE FUNCTION grants_rollup_delta()
+        """)
+    op.execute("""
+        CREATE TRIGGER trg_grants_rollup_truncate
+        AFTER TRUNCATE ON grants
+        FOR EACH STATEMENT EXECUTE FUNCTION grants_rollup_delta()
+    """)
+
+
+def downgrade() -> None:
+    for event in ("insert", "update", "delete", "truncate"):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_grants_rollup_{event} ON grants")
+    op.execute("DROP FUNCTION IF EXISTS grants_rollup_delta()")
+    op.drop_index("uq_grant_rollups_group", table_name="grant_rollups")
+    op.drop_table("grant_rollups")
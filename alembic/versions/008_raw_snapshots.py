@@ -0,0 +1,97 @@
+"""Move grants.raw_data into compressed, versioned grant_raw_snapshots
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from payloads import canonical_json, compress_payload, content_hash, decompress_payload
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    op.create_table(
+        "grant_raw_snapshots",
+        sa.Column(
+            "grant_id", UUID(as_uuid=True),
+            sa.ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("content_hash", sa.String(64), primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column("payload", sa.LargeBinary, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "uq_grant_raw_snapshots_version", "grant_raw_snapshots",
+        ["grant_id", "version"], unique=True,
+    )
+    op.add_column("grants", sa.Column("raw_data_hash", sa.String(64)))
+
+    # Compression happens here rather than in SQL, in id order batches.
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, raw_data FROM grants WHERE raw_data IS NOT NULL"
+                + (" AND id > :last_id" if last_id else "")
+                + " ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE} if last_id else {"limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        snapshots = []
+        for grant_id, raw_data in rows:
+            encoded = canonical_json(raw_data)
+            snapshots.append({
+                "grant_id": grant_id,
+                "content_hash": content_hash(encoded),
+                "payload": compress_payload(encoded),
+            })
+        conn.execute(
+            sa.text(
+                "INSERT INTO grant_raw_snapshots (grant_id, content_hash, version, payload) "
+                "VALUES (:grant_id, :content_hash, 1, :payload)"
+            ),
+            snapshots,
+        )
+        conn.execute(
+            sa.text("UPDATE grants SET raw_data_hash = :content_hash WHERE id = :grant_id"),
+            snapshots,
+        )
+        last_id = rows[-1][0]
+
+    op.drop_column("grants", "raw_data")
+
+
+def downgrade() -> None:
+    op.add_column("grants", sa.Column("raw_data", JSONB))
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT s.grant_id, s.payload FROM grant_raw_snapshots s "
+            "JOIN grants g ON g.id = s.grant_id AND g.raw_data_hash = s.content_hash"
+        )
+    ).all()
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(
+            sa.text("UPDATE grants SET raw_data = CAST(:raw_data AS jsonb) WHERE id = :grant_id"),
+            [
+                {"grant_id": grant_id, "raw_data": canonical_json(decompress_payload(payload)).decode()}
+                for grant_id, payload in rows[start:start + BATCH_SIZE]
+            ],
+        )
+    op.drop_column("grants", "raw_data_hash")
+    op.drop_index("uq_grant_raw_snapshots_version", table_name="grant_raw_snapshots")
+    op.drop_table("grant_raw_snapshots")
@@ -0,0 +1,111 @@
+"""Partition scrape_logs by month and add scrape_log_daily for retired months
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, source_id, started_at, finished_at, status, records_found, "
+    "records_created, records_updated, error_message, created_at"
+)
+
+
+def _columns():
+    return [
+        sa.Column("id", UUID(as_uuid=True), nullable=False, server_default=sa.text("gen_random_uuid()")),
+        sa.Column(
+            "source_id", UUID(as_uuid=True),
+            sa.ForeignKey("scrape_sources.id", name="scrape_logs_source_id_fkey"), nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column("status", sa.String(20), nullable=False, server_default=sa.text("'running'")),
+        sa.Column("records_found", sa.Integer, server_default=sa.text("0")),
+        sa.Column("records_created", sa.Integer, server_default=sa.text("0")),
+        sa.Column("records_updated", sa.Integer, server_default=sa.text("0")),
+        sa.Column("error_message", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ]
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE scrape_logs RENAME TO scrape_logs_unpartitioned")
+    op.execute("ALTER INDEX scrape_logs_pkey RENAME TO scrape_logs_unpartitioned_pkey")
+
+    op.create_table(
+        "scrape_logs",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "started_at"),
+        postgresql_partition_by="RANGE (started_at)",
+    )
+    op.execute("CREATE TABLE scrape_logs_default PARTITION OF scrape_logs DEFAULT")
+    # One partition per month that has runs, plus the current and next two
+    # months; workers/scraper/maintenance.py keeps creating them from here.
+    op.execute("""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    LEAST(
+                        (SELECT date_trunc('month', min(started_at) AT TIME ZONE 'UTC')::date
+                         FROM scrape_logs_unpartitioned),
+                        date_trunc('month', now() AT TIME ZONE 'UTC')::date
+                    ),
+                    date_trunc('month', now() AT TIME ZONE 'UTC')::date + interval '2 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF scrape_logs FOR VALUES FROM (%L) TO (%L)',
+                    'scrape_logs_p' || to_char(month, 'YYYYMM'),
+                    month::text || ' 00:00:00+00',
+                    (month + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute(f"""
+        INSERT INTO scrape_logs ({COLUMNS})
+        SELECT id, source_id, COALESCE(started_at, created_at, now()), finished_at, status,
+               records_found, records_created, records_updated, error_message, created_at
+        FROM scrape_logs_unpartitioned
+    """)
+    op.drop_table("scrape_logs_unpartitioned")
+    op.create_index("idx_scrape_logs_source_started", "scrape_logs", ["source_id", "started_at"])
+    op.create_index("idx_scrape_logs_started", "scrape_logs", ["started_at"])
+
+    op.create_table(
+        "scrape_log_daily",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("source_id", UUID(as_uuid=True), sa.ForeignKey("scrape_sources.id"), primary_key=True),
+        sa.Column("runs", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("succeeded", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("failed", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("records_found", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+        sa.Column("records_created", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+        sa.Column("records_updated", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+        sa.Column("duration_sec", sa.Float, nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scrape_log_daily")
+
+    op.execute("ALTER TABLE scrape_logs RENAME TO scrape_logs_partitioned")
+    op.execute("ALTER INDEX scrape_logs_pkey RENAME TO scrape_logs_partitioned_pkey")
+    op.create_table("scrape_logs", *_columns(), sa.PrimaryKeyConstraint("id"))
+    op.execute(f"INSERT INTO scrape_logs ({COLUMNS}) SELECT {COLUMNS} FROM scrape_logs_partitioned")
+    # Drops every partition with it.
+    op.drop_table("scrape_logs_partitioned")
@@ -0,0 +1,61 @@
+"""Leased crawl work units and shared per-upstream rate budgets
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crawl_units",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("scrape_log_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("source", sa.String(50), nullable=False),
+        sa.Column("params", JSONB, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default=sa.text("'pending'")),
+        sa.Column("attempts", sa.SmallInteger, nullable=False, server_default=sa.text("0")),
+        sa.Column("leased_by", sa.String(100)),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True)),
+        sa.Column("pages_fetched", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("records_found", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("records_created", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("records_updated", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("error_message", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index(
+        "uq_crawl_units_log_params", "crawl_units", ["scrape_log_id", "source", "params"], unique=True
+    )
+    op.create_index("idx_crawl_units_log_status", "crawl_units", ["scrape_log_id", "status"])
+    op.create_index(
+        "idx_crawl_units_claimable",
+        "crawl_units",
+        ["created_at"],
+        postgresql_where=sa.text("status IN ('pending', 'leased')"),
+    )
+
+    op.create_table(
+        "rate_budgets",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("tokens", sa.Float, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_budgets")
+    op.drop_index("idx_crawl_units_claimable", table_name="crawl_units")
+    op.drop_index("idx_crawl_units_log_status", table_name="crawl_units")
+    op.drop_index("uq_crawl_units_log_params", table_name="crawl_units")
+    op.drop_table("crawl_units")
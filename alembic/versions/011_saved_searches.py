@@ -0,0 +1,91 @@
+"""Saved searches, their percolator postings, match inbox and change-feed cursors
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "saved_searches",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("owner", sa.String(100), nullable=False),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("keywords", ARRAY(sa.Text), nullable=False, server_default=sa.text("'{}'")),
+        sa.Column("sources", ARRAY(sa.String(50)), nullable=False, server_default=sa.text("'{}'")),
+        sa.Column("categories", ARRAY(sa.String(100)), nullable=False, server_default=sa.text("'{}'")),
+        sa.Column("amount_min", sa.BigInteger),
+        sa.Column("amount_max", sa.BigInteger),
+        sa.Column("deadline_from", sa.Date),
+        sa.Column("deadline_to", sa.Date),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("idx_saved_searches_owner", "saved_searches", ["owner"])
+
+    op.create_table(
+        "saved_search_terms",
+        sa.Column("term", sa.Text, primary_key=True),
+        sa.Column(
+            "search_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("saved_searches.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+    )
+    op.create_index("idx_saved_search_terms_search_id", "saved_search_terms", ["search_id"])
+
+    op.create_table(
+        "saved_search_matches",
+        sa.Column(
+            "search_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("saved_searches.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "grant_id", UUID(as_uuid=True), sa.ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("owner", sa.String(100), nullable=False),
+        sa.Column("matched_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "idx_saved_search_matches_search_matched",
+        "saved_search_matches",
+        ["search_id", sa.text("matched_at DESC")],
+    )
+    op.create_index(
+        "idx_saved_search_matches_owner_matched",
+        "saved_search_matches",
+        ["owner", sa.text("matched_at DESC")],
+    )
+    op.create_index("idx_saved_search_matches_grant_id", "saved_search_matches", ["grant_id"])
+
+    op.create_table(
+        "change_cursors",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("change_xid", sa.BigInteger, nullable=False),
+        sa.Column("grant_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("change_cursors")
+    op.drop_index("idx_saved_search_matches_grant_id", table_name="saved_search_matches")
+    op.drop_index("idx_saved_search_matches_owner_matched", table_name="saved_search_matches")
+    op.drop_index("idx_saved_search_matches_search_matched", table_name="saved_search_matches")
+    op.drop_table("saved_search_matches")
+    op.drop_index("idx_saved_search_terms_search_id", table_name="saved_search_terms")
+    op.drop_table("saved_search_terms")
+    op.drop_index("idx_saved_searches_owner", table_name="saved_searches")
+    op.drop_table("saved_searches")
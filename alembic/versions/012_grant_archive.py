@@ -0,0 +1,61 @@
+"""Archive tables for long-closed and withdrawn grants
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "grants_archive",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("source", sa.String(50), nullable=False),
+        sa.Column("source_id", sa.String(200)),
+        sa.Column("title", sa.Text, nullable=False),
+        sa.Column("organization", sa.String(200), nullable=False),
+        sa.Column("category", sa.String(100)),
+        sa.Column("summary", sa.Text),
+        sa.Column("target_audience", sa.Text),
+        sa.Column("amount_min", sa.BigInteger),
+        sa.Column("amount_max", sa.BigInteger),
+        sa.Column("application_start", sa.Date),
+        sa.Column("application_deadline", sa.Date),
+        sa.Column("detail_url", sa.Text),
+        sa.Column("guideline_url", sa.Text),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("raw_data_hash", sa.String(64)),
+        sa.Column("last_synced_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("change_xid", sa.BigInteger),
+        sa.Column("canonical_id", UUID(as_uuid=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("idx_grants_archive_source_id", "grants_archive", ["source_id"])
+    op.create_index("idx_grants_archive_archived_at", "grants_archive", ["archived_at"])
+
+    op.create_table(
+        "grant_raw_snapshots_archive",
+        sa.Column("grant_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("content_hash", sa.String(64), primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column("payload", sa.LargeBinary, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("grant_raw_snapshots_archive")
+    op.drop_index("idx_grants_archive_archived_at", table_name="grants_archive")
+    op.drop_index("idx_grants_archive_source_id", table_name="grants_archive")
+    op.drop_table("grants_archive")
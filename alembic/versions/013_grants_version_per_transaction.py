@@ -0,0 +1,77 @@
+"""Bump the grants data version once per transaction, at commit
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION next_grants_version() RETURNS bigint AS $$
+        DECLARE
+            current bigint := nullif(current_setting('grantdraft.grants_version', true), '')::bigint;
+        BEGIN
+            IF current IS NULL THEN
+                INSERT INTO data_versions (name, version, updated_at)
+                VALUES ('grants', 1, now())
+                ON CONFLICT (name) DO UPDATE
+                SET version = data_versions.version + 1, updated_at = now()
+                RETURNING version INTO current;
+                PERFORM set_config('grantdraft.grants_version', current::text, true);
+            END IF;
+            RETURN current;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_grants_version() RETURNS trigger AS $$
+        BEGIN
+            IF nullif(current_setting('grantdraft.grants_version', true), '') IS NULL THEN
+                PERFORM next_grants_version();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_grants_version ON grants")
+    op.execute("""
+        CREATE CONSTRAINT TRIGGER trg_grants_version
+        AFTER INSERT OR UPDATE OR DELETE ON grants
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION bump_grants_version()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_grants_version_truncate
+        AFTER TRUNCATE ON grants
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_grants_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_grants_version_truncate ON grants")
+    op.execute("DROP TRIGGER IF EXISTS trg_grants_version ON grants")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_grants_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO data_versions (name, version, updated_at)
+            VALUES ('grants', 1, now())
+            ON CONFLICT (name) DO UPDATE
+            SET version = data_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_grants_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON grants
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_grants_version()
+    """)
+    op.execute("DROP FUNCTION IF EXISTS next_grants_version()")
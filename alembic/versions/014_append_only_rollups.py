@@ -0,0 +1,80 @@
+"""Append grant rollup deltas instead of upserting shared rows
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FUNCTION = """
+    CREATE OR REPLACE FUNCTION grants_rollup_delta() RETURNS trigger AS $$
+    DECLARE
+        changes text;
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            DELETE FROM grant_rollups;
+            RETURN NULL;
+        END IF;
+        changes := CASE TG_OP
+            WHEN 'INSERT' THEN 'SELECT *, 1 AS sign FROM new_rows'
+            WHEN 'DELETE' THEN 'SELECT *, -1 AS sign FROM old_rows'
+            ELSE 'SELECT *, 1 AS sign FROM new_rows UNION ALL SELECT *, -1 FROM old_rows'
+        END;
+        EXECUTE format($q$
+            INSERT INTO grant_rollups %s
+                (dimension, key, source, status, category, canonical, grant_count, amount_max_sum)
+            SELECT d.dimension, d.key, c.source, c.status, c.category, c.canonical_id IS NULL,
+                   sum(c.sign), coalesce(sum(c.sign * c.amount_max), 0)
+            FROM (%%s) AS c
+            CROSS JOIN LATERAL (VALUES
+                ('category', c.category),
+                ('organization', c.organization),
+                ('source', c.source),
+                ('deadline_month', to_char(c.application_deadline, 'YYYY-MM'))
+            ) AS d (dimension, key)
+            GROUP BY 1, 2, 3, 4, 5, 6
+            HAVING sum(c.sign) <> 0 OR coalesce(sum(c.sign * c.amount_max), 0) <> 0
+            %s
+        $q$, changes);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+UPSERT = """
+            ON CONFLICT (dimension, key, source, status, category, canonical) DO UPDATE
+            SET grant_count = r.grant_count + EXCLUDED.grant_count,
+                amount_max_sum = r.amount_max_sum + EXCLUDED.amount_max_sum"""
+
+GROUP = ["dimension", "key", "source", "status", "category", "canonical"]
+
+
+def upgrade() -> None:
+    op.execute(FUNCTION % ("", ""))
+    op.drop_index("uq_grant_rollups_group", table_name="grant_rollups")
+    op.create_index("idx_grant_rollups_group", "grant_rollups", GROUP)
+
+
+def downgrade() -> None:
+    # Fold the deltas first: the unique index allows one row per group.
+    op.execute("LOCK TABLE grants IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(f"""
+        WITH folded AS (DELETE FROM grant_rollups RETURNING *)
+        INSERT INTO grant_rollups ({", ".join(GROUP)}, grant_count, amount_max_sum)
+        SELECT {", ".join(GROUP)}, sum(grant_count), sum(amount_max_sum)
+        FROM folded
+        GROUP BY {", ".join(GROUP)}
+    """)
+    op.drop_index("idx_grant_rollups_group", table_name="grant_rollups")
+    op.create_index(
+        "uq_grant_rollups_group", "grant_rollups", GROUP,
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.execute(FUNCTION % ("AS r", UPSERT))
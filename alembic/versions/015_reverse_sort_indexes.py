@@ -0,0 +1,34 @@
+"""Indexes for the listing sorts not covered by 003, in either order
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Sorts keep NULLS LAST in both orders, so the 003 indexes cannot be
+    # scanned backward for the other direction.
+    op.create_index(
+        "idx_grants_deadline_desc_id", "grants",
+        [sa.text("application_deadline DESC NULLS LAST"), sa.text("id DESC")],
+    )
+    op.create_index("idx_grants_amount_asc_id", "grants", ["amount_max", "id"])
+    op.create_index("idx_grants_created_asc_id", "grants", ["created_at", "id"])
+    # title is NOT NULL and sorted without a NULLS clause: one index, both orders.
+    op.create_index("idx_grants_title_id", "grants", ["title", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_grants_title_id", table_name="grants")
+    op.drop_index("idx_grants_created_asc_id", table_name="grants")
+    op.drop_index("idx_grants_amount_asc_id", table_name="grants")
+    op.drop_index("idx_grants_deadline_desc_id", table_name="grants")
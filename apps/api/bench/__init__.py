@@ -0,0 +1,6 @@
+"""Synthetic data and load harness for measuring the API at realistic scale.
+
+    python -m bench.seed --rows 100000          # fill DATABASE_URL with synthetic grants
+    python -m bench.load --requests 5000         # replay a request mix, write JSON results
+    python -m bench.compare base.json head.json  # latency deltas between two runs
+"""
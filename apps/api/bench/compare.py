@@ -0,0 +1,53 @@
+"""Print latency and query-count deltas between two ``bench.load`` result files.
+
+    python -m bench.compare bench/results/base.json bench/results/head.json
+"""
+from typing import Optional
+import argparse
+import json
+
+METRICS = ["p50_ms", "p95_ms", "p99_ms", "queries_per_request"]
+
+
+def _change(base: Optional[float], head: Optional[float]) -> str:
+    if base is None or head is None:
+        return "n/a"
+    if base == 0:
+        return "=" if head == 0 else "new"
+    return f"{(head - base) / base * 100:+.1f}%"
+
+
+def compare(base: dict, head: dict) -> list[list[str]]:
+    """One row per scenario and metric present in both runs: name, metric, base, head, change."""
+    rows = []
+    groups = [("overall", base["overall"], head["overall"])] + [
+        (name, stats, head["scenarios"][name])
+        for name, stats in base["scenarios"].items()
+        if name in head["scenarios"]
+    ]
+    for name, before, after in groups:
+        for metric in METRICS:
+            rows.append([name, metric, str(before[metric]), str(after[metric]),
+                         _change(before[metric], after[metric])])
+    return rows
+
+
+def main(base_path: str, head_path: str):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+    print(f"base {base['meta'].get('commit')} ({base['meta'].get('grants')} grants)  "
+          f"head {head['meta'].get('commit')} ({head['meta'].get('grants')} grants)")
+    rows = [["scenario", "metric", "base", "head", "change"]] + compare(base, head)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two bench.load result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args()
+    main(args.base, args.head)
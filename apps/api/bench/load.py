@@ -0,0 +1,278 @@
+"""Replay a weighted mix of API requests in-process and report latency percentiles.
+
+Requests go straight to the ASGI app (no network or server in the way), from
+``--concurrency`` concurrent clients. Each request is timed end to end, and
+every SQL statement it issues is counted, so a regression shows up both as
+latency and as extra round trips. Results are written as JSON for
+``bench.compare``.
+
+    python -m bench.load --requests 5000 --concurrency 8 --output results/head.json
+"""
+from contextlib import suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+from uuid import UUID
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+
+from bench.seed import CATEGORIES, ORGANIZATIONS, THEMES
+from config import settings
+from models.grant import Grant
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+ID_SAMPLE_SIZE = 5000
+
+Request = tuple[str, dict]
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: float
+    build: Callable[[random.Random, list[UUID]], Request]
+
+
+def _listing(**fixed) -> Callable[[random.Random, list[UUID]], Request]:
+    def build(rng, ids):
+        return "/api/v1/grants", {"page": rng.choice([1, 1, 1, 2, 3, 5]), **fixed}
+    return build
+
+
+def _window(rng, ids):
+    start = date.today() + timedelta(days=rng.randint(-30, 90))
+    return "/api/v1/grants", {
+        "deadline_from": start.isoformat(),
+        "deadline_to": (start + timedelta(days=30)).isoformat(),
+        "amount_min": rng.choice([1_000_000, 5_000_000, 10_000_000]),
+    }
+
+
+SCENARIOS = [
+    Scenario("list_default", 20, _listing()),
+    Scenario("list_open_by_deadline", 15, _listing(status="open", sort="deadline")),
+    Scenario("list_amount_desc", 8, _listing(sort="amount", order="desc")),
+    Scenario("list_source_created", 6, lambda rng, ids: (
+        "/api/v1/grants", {"source": rng.choice(["jgrants", "erad"]), "sort": "created", "order": "desc"}
+    )),
+    Scenario("list_deep_page", 3, lambda rng, ids: (
+        "/api/v1/grants", {"page": rng.randint(20, 200)}
+    )),
+    Scenario("search_keyword", 15, lambda rng, ids: (
+        "/api/v1/grants", {"keyword": rng.choice(THEMES)}
+    )),
+    Scenario("search_organization_category", 5, lambda rng, ids: (
+        "/api/v1/grants",
+        {"keyword": rng.choice(ORGANIZATIONS), "category": rng.choice(CATEGORIES)[0]},
+    )),
+    Scenario("filter_deadline_amount", 6, _window),
+    Scenario("stats_by_category", 2, lambda rng, ids: (
+        "/api/v1/grants/stats", {"group_by": rng.choice(["category", "source", "deadline_month"])}
+    )),
+    Scenario("detail", 20, lambda rng, ids: (f"/api/v1/grants/{rng.choice(ids)}", {})),
+]
+
+_statements: ContextVar[Optional[list[int]]] = ContextVar("bench_statements", default=None)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of ``values`` (0 <= q <= 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: list[tuple[float, int, bool]]) -> dict:
+    """Latency (ms) percentiles, error count and mean statements for (seconds, statements, ok) samples."""
+    latencies = [s[0] * 1000 for s in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s[2]),
+        "p50_ms": _round(percentile(latencies, 50)),
+        "p95_ms": _round(percentile(latencies, 95)),
+        "p99_ms": _round(percentile(latencies, 99)),
+        "mean_ms": _round(sum(latencies) / len(latencies)) if latencies else None,
+        "max_ms": _round(max(latencies)) if latencies else None,
+        "queries_per_request": _round(sum(s[1] for s in samples) / len(samples)) if samples else None,
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+async def _send(client: AsyncClient, request: Request) -> tuple[float, int, bool]:
+    path, params = request
+    counter = [0]
+    token = _statements.set(counter)
+    started = time.perf_counter()
+    try:
+        response = await client.get(path, params=params)
+        ok = response.status_code < 400
+    finally:
+        elapsed = time.perf_counter() - started
+        _statements.reset(token)
+    return elapsed, counter[0], ok
+
+
+async def run_load(
+    client: AsyncClient,
+    ids: list[UUID],
+    requests: int,
+    concurrency: int = 4,
+    warmup: int = 20,
+    seed: int = 0,
+    scenarios: list[Scenario] = SCENARIOS,
+) -> dict:
+    """Send ``requests`` requests drawn from ``scenarios`` and summarize them.
+
+    ``ids`` are grant ids for the detail scenario. The first ``warmup``
+    requests are sent but not recorded.
+    """
+    rng = random.Random(seed)
+    weights = [s.weight for s in scenarios]
+    plan = []
+    for _ in range(warmup + requests):
+        scenario = rng.choices(scenarios, weights)[0]
+        plan.append((scenario.name, scenario.build(rng, ids)))
+
+    for _, request in plan[:warmup]:
+        await _send(client, request)
+    pending = iter(plan[warmup:])
+    samples: dict[str, list[tuple[float, int, bool]]] = {s.name: [] for s in scenarios}
+
+    async def worker():
+        for name, request in pending:
+            samples[name].append(await _send(client, request))
+
+    event.listen(Engine, "before_cursor_execute", _count_statement)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    finally:
+        event.remove(Engine, "before_cursor_execute", _count_statement)
+
+    overall = summarize([s for group in samples.values() for s in group])
+    overall["throughput_rps"] = _round(requests / wall) if wall else None
+    return {
+        "overall": overall,
+        "scenarios": {name: summarize(group) for name, group in samples.items() if group},
+        "wall_sec": _round(wall),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    from database import async_session, engine, replica_router
+    from main import app
+    from services.grant_cache import grant_cache
+    from services.listener import listener
+    from services.response_cache import response_cache
+
+    async with async_session() as session:
+        grants = (await session.execute(select(func.count()).select_from(Grant))).scalar()
+        result = await session.execute(select(Grant.id).order_by(func.random()).limit(ID_SAMPLE_SIZE))
+        ids = list(result.scalars().all())
+    if not ids:
+        raise SystemExit("No grants to load-test against; run `python -m bench.seed` first")
+
+    if args.cold:
+        # Every response is built from the database.
+        response_cache.max_entries = 0
+
+    # ASGITransport does not run the app's lifespan; follow grants_changed as it would.
+    follower = None
+    if settings.GRANT_CACHE_ENABLED:
+        follower = asyncio.create_task(grant_cache.follow(listener))
+        while not grant_cache.active:
+            await asyncio.sleep(0.01)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        report = await run_load(
+            client, ids, args.requests,
+            concurrency=args.concurrency, warmup=args.warmup, seed=args.seed,
+        )
+    if follower is not None:
+        follower.cancel()
+        with suppress(asyncio.CancelledError):
+            await follower
+    await listener.close()
+    await replica_router.dispose()
+    await engine.dispose()
+
+    commit = _git_commit()
+    created_at = datetime.now(timezone.utc)
+    report["meta"] = {
+        "commit": commit,
+        "created_at": created_at.isoformat(),
+        "grants": grants,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "cold_cache": args.cold,
+        "grant_cache": settings.GRANT_CACHE_ENABLED,
+        "python": platform.python_version(),
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{created_at:%Y%m%dT%H%M%S}-{commit or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    overall = report["overall"]
+    logger.info(
+        f"[bench] {overall['requests']} requests, {overall['throughput_rps']} req/s, "
+        f"p50 {overall['p50_ms']}ms p95 {overall['p95_ms']}ms p99 {overall['p99_ms']}ms, "
+        f"{overall['queries_per_request']} queries/request -> {output}"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Load-test the API in-process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request mix")
+    parser.add_argument("--cold", action="store_true", help="Disable the response cache")
+    parser.add_argument("--output", help="Results file (default: bench/results/<time>-<commit>.json)")
+    asyncio.run(main(parser.parse_args()))
@@ -3,11 +3,99 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "postgresql+asyncpg://grantdraft:grantdraft_dev@db:5432/grantdraft"
+    # Comma-separated read replica URLs; reads fall back to DATABASE_URL when empty
+    DATABASE_REPLICA_URLS: str = ""
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_REPLICA_MAX_LAG_SEC: float = 5.0
+    DB_REPLICA_LAG_CHECK_SEC: float = 2.0
+    # A lag check slower than this counts as an unavailable replica
+    DB_REPLICA_LAG_TIMEOUT_SEC: float = 0.5
     JGRANTS_API_BASE_URL: str = "https://api.jgrants-portal.go.jp/exp/v1/public"
     ERAD_BASE_URL: str = "https://www.e-rad.go.jp"
 
+    # Upper bound on ids accepted by the batch lookup endpoint
+    BATCH_MAX_IDS: int = 200
+
+    # count=estimate on GET /grants counts exactly when the planner expects fewer rows
+    LISTING_EXACT_COUNT_BELOW: int = 1000
+
+    # Response cache (serialized + compressed bodies keyed on the data version)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MIN_COMPRESS_BYTES: int = 1024
+
+    # In-process cache of grants and listing pages, invalidated over
+    # NOTIFY grants_changed; served only while that subscription is up
+    GRANT_CACHE_ENABLED: bool = False
+    GRANT_CACHE_MAX_GRANTS: int = 5000
+    GRANT_CACHE_MAX_LISTINGS: int = 1000
+    GRANT_CACHE_TTL_SEC: float = 300.0
+
+    # Crawls split into leased work units (workers/scraper/crawl.py)
+    CRAWL_LEASE_SEC: float = 120.0
+    CRAWL_MAX_ATTEMPTS: int = 3
+    # Request rate (and burst) allowed against JGrants, across all workers
+    JGRANTS_RATE_PER_SEC: float = 2.0
+    JGRANTS_RATE_BURST: float = 4.0
+
+    # A complete sync withdraws the live grants of its source it did not see,
+    # unless they are more than this share of them
+    RECONCILE_MAX_WITHDRAWN_FRACTION: float = 0.2
+
+    # Directory shared by the worker (writes) and API processes (memory-map)
+    # holding the TF-IDF recommendation index
+    RECOMMEND_INDEX_DIR: str = "/data/recommend"
+    # Publish SQLite/Parquet catalogue snapshots after each sync, into the
+    # directory shared by the worker (writes) and API processes (serve)
+    SNAPSHOTS_ENABLED: bool = False
+    SNAPSHOT_DIR: str = "/data/snapshots"
+
+    # Listings and exports: select plain rows and encode them with orjson,
+    # skipping per-row pydantic validation
+    FAST_SERIALIZATION: bool = False
+
+    # Admission control (middleware/admission.py): per-client token buckets
+    # and per-class concurrency limits with a bounded wait queue. The
+    # concurrency limits should add up to at most DB_POOL_SIZE + DB_MAX_OVERFLOW.
+    ADMISSION_ENABLED: bool = False
+    ADMISSION_SEARCH_RATE_PER_SEC: float = 10.0
+    ADMISSION_SEARCH_BURST: float = 20.0
+    ADMISSION_SEARCH_CONCURRENCY: int = 5
+    ADMISSION_SEARCH_QUEUE: int = 24
+    ADMISSION_DETAIL_RATE_PER_SEC: float = 50.0
+    ADMISSION_DETAIL_BURST: float = 100.0
+    ADMISSION_DETAIL_CONCURRENCY: int = 8
+    ADMISSION_DETAIL_QUEUE: int = 64
+    # CSV exports and snapshot downloads, which hold their slot while streaming
+    ADMISSION_EXPORT_RATE_PER_SEC: float = 0.2
+    ADMISSION_EXPORT_BURST: float = 3.0
+    ADMISSION_EXPORT_CONCURRENCY: int = 1
+    ADMISSION_EXPORT_QUEUE: int = 2
+    ADMISSION_SYNC_RATE_PER_SEC: float = 1 / 60
+    ADMISSION_SYNC_BURST: float = 2.0
+    ADMISSION_SYNC_CONCURRENCY: int = 1
+    ADMISSION_SYNC_QUEUE: int = 0
+    ADMISSION_QUEUE_TIMEOUT_SEC: float = 2.0
+    ADMISSION_RETRY_AFTER_SEC: float = 1.0
+    # Clients whose buckets are remembered, per class
+    ADMISSION_MAX_CLIENTS: int = 10000
+
+    # Per-request query profiling (Server-Timing headers, slow query log)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SLOW_QUERY_MS: float = 200.0
+    # Re-run slow SELECTs under EXPLAIN ANALYZE and log the plan
+    PROFILING_EXPLAIN_SLOW: bool = False
+
     class Config:
         env_file = ".env"
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [u.strip() for u in self.DATABASE_REPLICA_URLS.split(",") if u.strip()]
+
 
 settings = Settings()
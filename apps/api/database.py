@@ -1,10 +1,140 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from typing import Optional
 from config import settings
+import asyncio
+import logging
+import time
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+logger = logging.getLogger(__name__)
+
+# Replay lag in seconds; 0 on a primary or on a replica that has replayed
+# everything it received (replay timestamps stop moving when the primary idles).
+# NULL, i.e. unusable, on a replica with no streaming WAL receiver: having
+# replayed all it received says nothing once it stops receiving. Without
+# pg_read_all_stats the receiver's status reads as NULL, so only its presence
+# is checked then.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE coalesce(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+
+
+engine = create_engine(settings.DATABASE_URL)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+class ReplicaRouter:
+    """Round-robin over replicas whose replay lag is within bounds, else the primary.
+
+    Lag is sampled at most every ``check_interval`` seconds per replica, so
+    routing costs one cheap query per replica per interval, not per request.
+    The sample runs in the request that finds it due, bounded by
+    ``check_timeout``: a replica that cannot answer in time counts as
+    unavailable until the next sample.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica_urls: list[str],
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float = 0.5,
+    ):
+        self.primary = primary
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.replicas = [
+            async_sessionmaker(create_engine(url), class_=AsyncSession, expire_on_commit=False)
+            for url in replica_urls
+        ]
+        self._lag: list[Optional[float]] = [None] * len(self.replicas)
+        self._checked_at = [0.0] * len(self.replicas)
+        self._next = 0
+
+    async def session_factory(self) -> async_sessionmaker:
+        for _ in range(len(self.replicas)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+            lag = await self._current_lag(index)
+            if lag is not None and lag <= self.max_lag:
+                return self.replicas[index]
+        return self.primary
+
+    async def dispose(self):
+        for factory in self.replicas:
+            await factory.kw["bind"].dispose()
+
+    async def _current_lag(self, index: int) -> Optional[float]:
+        now = time.monotonic()
+        if now - self._checked_at[index] >= self.check_interval:
+            self._checked_at[index] = now
+            self._lag[index] = await self._measure_lag(self.replicas[index])
+        return self._lag[index]
+
+    async def _measure_lag(self, factory: async_sessionmaker) -> Optional[float]:
+        try:
+            lag = await asyncio.wait_for(self._query_lag(factory), timeout=self.check_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Replica lag check timed out after {self.check_timeout}s, routing reads to primary"
+            )
+            return None
+        except Exception as e:
+            logger.warning(f"Replica unavailable, routing reads to primary: {e}")
+            return None
+        if lag is None:
+            logger.warning("Replica is not streaming WAL, routing reads to primary")
+        return lag
+
+    async def _query_lag(self, factory: async_sessionmaker) -> Optional[float]:
+        async with factory() as session:
+            lag = (await session.execute(REPLICA_LAG_SQL)).scalar()
+            return None if lag is None else float(lag)
+
+
+replica_router = ReplicaRouter(
+    async_session,
+    settings.replica_urls,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SEC,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_SEC,
+    check_timeout=settings.DB_REPLICA_LAG_TIMEOUT_SEC,
+)
+
+
 async def get_db() -> AsyncSession:
+    """Primary session, for endpoints that write."""
     async with async_session() as session:
         yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Replica session when one is healthy and fresh enough, else primary."""
+    factory = await replica_router.session_factory()
+    async with factory() as session:
+        yield session
+
+
+async def get_read_session_factory() -> async_sessionmaker:
+    """For read-only endpoints that outlive the request scope (streaming), which open their own session."""
+    return await replica_router.session_factory()
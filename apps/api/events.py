@@ -0,0 +1,35 @@
+"""Postgres NOTIFY channels and payloads shared by the API and the workers."""
+from typing import Optional, Sequence
+from uuid import UUID
+import json
+
+SCRAPE_PROGRESS_CHANNEL = "scrape_progress"
+
+TERMINAL_SCRAPE_STATUSES = ("success", "failed")
+
+
+def scrape_progress_payload(
+    log_id: UUID,
+    status: str,
+    phase: Optional[str] = None,
+    **counters: int,
+) -> str:
+    """Serialize one progress event; NOTIFY payloads must stay well under 8000 bytes."""
+    return json.dumps({"log_id": str(log_id), "status": status, "phase": phase, **counters})
+
+
+GRANTS_CHANGED_CHANNEL = "grants_changed"
+
+# Beyond this many ids a change is announced as "everything changed", keeping
+# the payload under the NOTIFY limit.
+MAX_NOTIFY_IDS = 150
+
+
+def grants_changed_payload(ids: Optional[Sequence[UUID]], version: int) -> str:
+    """Announce committed grant writes; ``ids`` of None means any grant may have changed."""
+    if ids is not None and len(ids) > MAX_NOTIFY_IDS:
+        ids = None
+    return json.dumps({
+        "ids": None if ids is None else [str(i) for i in ids],
+        "version": version,
+    })
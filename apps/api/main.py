@@ -1,8 +1,41 @@
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from config import settings
 from routers.grants import router as grants_router
+from database import engine, replica_router
+from middleware import AdmissionMiddleware, ProfilingMiddleware, admission, enable_query_hooks
+from services.grant_cache import grant_cache
+from services.listener import listener
+import asyncio
 
-app = FastAPI(title="GrantDraft API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    follower = None
+    if settings.GRANT_CACHE_ENABLED:
+        follower = asyncio.create_task(grant_cache.follow(listener))
+    yield
+    if follower is not None:
+        follower.cancel()
+        with suppress(asyncio.CancelledError):
+            await follower
+    await listener.close()
+    await replica_router.dispose()
+    await engine.dispose()
+
+
+app = FastAPI(
+    title="GrantDraft API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if settings.FAST_SERIALIZATION else JSONResponse,
+)
+
+# Added before CORS so that refusals still carry CORS headers.
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,9 +45,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    enable_query_hooks()
+
 app.include_router(grants_router)
 
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition: admission shedding counters and primary pool usage."""
+    lines = [
+        *admission.metrics(),
+        "# TYPE grantdraft_db_pool_checked_out gauge",
+        f"grantdraft_db_pool_checked_out {engine.pool.checkedout()}",
+    ]
+    return "\n".join(lines) + "\n"
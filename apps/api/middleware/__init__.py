@@ -0,0 +1,11 @@
+from middleware.admission import AdmissionMiddleware, admission
+from middleware.profiling import ProfilingMiddleware, disable_query_hooks, enable_query_hooks, span
+
+__all__ = [
+    "AdmissionMiddleware",
+    "ProfilingMiddleware",
+    "admission",
+    "disable_query_hooks",
+    "enable_query_hooks",
+    "span",
+]
@@ -0,0 +1,287 @@
+"""Admission control and load shedding.
+
+Every API request is put in a route class (search, detail, export, sync)
+and must pass two gates before it reaches a handler:
+
+- a per-client token bucket for that class; an empty bucket answers 429
+  with the seconds until the next token in ``Retry-After``;
+- a concurrency limit for the class with a bounded wait queue; when the
+  queue is full, or a request waits longer than the queue timeout, it is
+  answered 503 with ``Retry-After``.
+
+The class limits are meant to add up to at most the DB pool size, so a
+burst of expensive listings waits here, where it is cheap to refuse, instead
+of holding pool checkouts that detail lookups and syncs also need. ``/health``,
+``/metrics`` and the long-lived sync streams are not admission controlled.
+
+A request holds its concurrency slot until its response body has been sent,
+so a streamed download holds one for as long as it streams; downloads are
+the ``export`` class so they cannot crowd out listings. A ``sync`` slot is
+held until the scrape the request starts in the background has finished, so
+the sync limit bounds running scrapes rather than the 202 that starts them.
+
+Clients are keyed on the connection's address; behind a proxy run uvicorn
+with ``--proxy-headers`` so that is the forwarded client.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+import asyncio
+import math
+import time
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import settings
+
+API_PREFIX = "/api/v1/"
+SEARCH_PATHS = frozenset({
+    "/api/v1/grants",
+    "/api/v1/grants/stats",
+    "/api/v1/grants/changes",
+    "/api/v1/grants/batch",
+    "/api/v1/grants/recommend",
+    "/api/v1/sync/logs",
+})
+EXPORT_PATHS = frozenset({
+    "/api/v1/grants/export",
+    "/api/v1/snapshots/latest",
+})
+SYNC_PATH = "/api/v1/grants/sync"
+# Classes whose slot also covers the background work a handler leaves running.
+BACKGROUND_CLASSES = frozenset({"sync"})
+STREAM_PREFIX = "/api/v1/sync/stream/"
+
+COUNTERS = ("admitted", "queued", "rate_limited", "queue_full", "queue_timeout")
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """The class whose limits apply to a request, or None when it is not admission controlled."""
+    if not path.startswith(API_PREFIX) or path.startswith(STREAM_PREFIX):
+        return None
+    if method == "POST" and path == SYNC_PATH:
+        return "sync"
+    if path in SEARCH_PATHS:
+        return "search"
+    if path in EXPORT_PATHS:
+        return "export"
+    return "detail"
+
+
+@dataclass
+class ClassLimits:
+    rate: float
+    burst: float
+    concurrency: int
+    queue: int
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds until one is available (nothing taken)."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ConcurrencyLimit:
+    """At most ``limit`` holders; up to ``max_queue`` more wait, each for at most ``timeout``."""
+
+    def __init__(self, limit: int, max_queue: int, timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @property
+    def saturated(self) -> bool:
+        return self._semaphore.locked()
+
+    async def acquire(self) -> Optional[str]:
+        """Acquire a slot; returns None on success or the reason it was refused."""
+        if not self.saturated:
+            await self._semaphore.acquire()
+        elif self.waiting >= self.max_queue:
+            return "queue_full"
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+        self.active += 1
+        return None
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+
+class AdmissionController:
+    """Token buckets, concurrency limits and shedding counters for each route class."""
+
+    def __init__(
+        self,
+        limits: dict[str, ClassLimits],
+        queue_timeout: float,
+        retry_after: float,
+        max_clients: int,
+    ):
+        self.limits = limits
+        self.retry_after = retry_after
+        self.max_clients = max_clients
+        self.concurrency = {
+            name: ConcurrencyLimit(l.concurrency, l.queue, queue_timeout) for name, l in limits.items()
+        }
+        # Buckets of the most recently seen clients; a forgotten client starts with a full bucket.
+        self.buckets: dict[str, OrderedDict[str, TokenBucket]] = {name: OrderedDict() for name in limits}
+        self.counters = {name: dict.fromkeys(COUNTERS, 0) for name in limits}
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls(
+            limits={
+                "search": ClassLimits(
+                    settings.ADMISSION_SEARCH_RATE_PER_SEC,
+                    settings.ADMISSION_SEARCH_BURST,
+                    settings.ADMISSION_SEARCH_CONCURRENCY,
+                    settings.ADMISSION_SEARCH_QUEUE,
+                ),
+                "detail": ClassLimits(
+                    settings.ADMISSION_DETAIL_RATE_PER_SEC,
+                    settings.ADMISSION_DETAIL_BURST,
+                    settings.ADMISSION_DETAIL_CONCURRENCY,
+                    settings.ADMISSION_DETAIL_QUEUE,
+                ),
+                "export": ClassLimits(
+                    settings.ADMISSION_EXPORT_RATE_PER_SEC,
+                    settings.ADMISSION_EXPORT_BURST,
+                    settings.ADMISSION_EXPORT_CONCURRENCY,
+                    settings.ADMISSION_EXPORT_QUEUE,
+                ),
+                "sync": ClassLimits(
+                    settings.ADMISSION_SYNC_RATE_PER_SEC,
+                    settings.ADMISSION_SYNC_BURST,
+                    settings.ADMISSION_SYNC_CONCURRENCY,
+                    settings.ADMISSION_SYNC_QUEUE,
+                ),
+            },
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SEC,
+            retry_after=settings.ADMISSION_RETRY_AFTER_SEC,
+            max_clients=settings.ADMISSION_MAX_CLIENTS,
+        )
+
+    def take_token(self, name: str, client: str) -> float:
+        buckets = self.buckets[name]
+        bucket = buckets.get(client)
+        if bucket is None:
+            limits = self.limits[name]
+            bucket = buckets[client] = TokenBucket(limits.rate, limits.burst)
+            if len(buckets) > self.max_clients:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(client)
+        return bucket.take()
+
+    def metrics(self) -> list[str]:
+        """Prometheus text exposition lines for the shedding counters and queue gauges."""
+        return [
+            "# TYPE grantdraft_admission_requests_total counter",
+            *(
+                f'grantdraft_admission_requests_total{{class="{name}",outcome="{outcome}"}} {count}'
+                for name, counters in self.counters.items()
+                for outcome, count in counters.items()
+            ),
+            "# TYPE grantdraft_admission_in_flight gauge",
+            *(
+                f'grantdraft_admission_in_flight{{class="{name}"}} {limit.active}'
+                for name, limit in self.concurrency.items()
+            ),
+            "# TYPE grantdraft_admission_waiting gauge",
+            *(
+                f'grantdraft_admission_waiting{{class="{name}"}} {limit.waiting}'
+                for name, limit in self.concurrency.items()
+            ),
+        ]
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionMiddleware:
+    """Admit each API request through its route class's token bucket and concurrency limit."""
+
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        name = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        counters = controller.counters[name]
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        wait = controller.take_token(name, client)
+        if wait:
+            counters["rate_limited"] += 1
+            await _reject(429, "Too many requests", wait)(scope, receive, send)
+            return
+
+        limit = controller.concurrency[name]
+        if limit.saturated and limit.waiting < limit.max_queue:
+            counters["queued"] += 1
+        refused = await limit.acquire()
+        if refused:
+            counters[refused] += 1
+            await _reject(503, "Server busy, retry later", controller.retry_after)(scope, receive, send)
+            return
+
+        counters["admitted"] += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                limit.release()
+
+        async def send_and_release(message):
+            await send(message)
+            # Background tasks run after the last body chunk, still inside self.app.
+            if (
+                name not in BACKGROUND_CLASSES
+                and message["type"] == "http.response.body"
+                and not message.get("more_body", False)
+            ):
+                release()
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            release()
+
+
+admission = AdmissionController.from_settings()
@@ -0,0 +1,175 @@
+"""Per-request query profiling.
+
+When ``PROFILING_ENABLED`` is set, every SQL statement a request issues is
+timed through engine events and attributed to the request via a context
+variable. The response carries a ``Server-Timing`` header: total database
+time and statement count, each statement's duration in order, and named
+spans such as serialization. Statements slower than
+``PROFILING_SLOW_QUERY_MS`` are logged with their parameters and, with
+``PROFILING_EXPLAIN_SLOW``, their ``EXPLAIN ANALYZE`` plan.
+
+With profiling disabled nothing is installed: no middleware and no engine
+listeners, so requests take exactly the unprofiled path.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-statement Server-Timing entries beyond this are folded into the db total only.
+MAX_TIMED_STATEMENTS = 20
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    statements: list[float] = field(default_factory=list)
+    spans: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(self.statements)
+
+    def server_timing(self) -> str:
+        entries = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{len(self.statements)} queries"',
+            *(
+                f"sql-{i};dur={seconds * 1000:.1f}"
+                for i, seconds in enumerate(self.statements[:MAX_TIMED_STATEMENTS], start=1)
+            ),
+            *(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items()),
+            f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}",
+        ]
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block into the current request's Server-Timing; a no-op outside a profiled request."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans[name] = profile.spans.get(name, 0.0) + time.perf_counter() - started
+
+
+class ProfilingMiddleware:
+    """Attach a RequestProfile to each HTTP request and report it in Server-Timing.
+
+    The header is added when the response starts, so a streaming response
+    reports what happened before its first byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current.set(profile)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["profiling_started"].pop()
+    elapsed = time.perf_counter() - started
+    profile = _current.get()
+    if profile is not None:
+        profile.statements.append(elapsed)
+
+    if elapsed * 1000 >= settings.PROFILING_SLOW_QUERY_MS:
+        where = f" {profile.method} {profile.path}" if profile else ""
+        message = f"Slow query {elapsed * 1000:.1f}ms{where}: {statement} params={parameters!r}"
+        if settings.PROFILING_EXPLAIN_SLOW and not executemany:
+            plan = _explain(conn, statement, parameters)
+            if plan:
+                message += "\n" + plan
+        logger.warning(message)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN ANALYZE a slow SELECT on a separate cursor of the same connection.
+
+    This runs the query a second time, inside the caller's transaction, so
+    it is limited to plain SELECTs and only worth enabling while investigating.
+    """
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    cursor = conn.connection.cursor()
+    # A failing EXPLAIN must not abort the request's transaction.
+    cursor.execute("SAVEPOINT profiling_explain")
+    try:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        cursor.execute("RELEASE SAVEPOINT profiling_explain")
+        return plan
+    except Exception as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT profiling_explain")
+        logger.warning(f"EXPLAIN failed for slow query: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def _handle_error(context):
+    # after_cursor_execute does not run for a failed statement.
+    if context.connection is not None:
+        started = context.connection.info.get("profiling_started")
+        if started:
+            started.pop()
+
+
+def enable_query_hooks():
+    """Time statements on every engine, including replica engines created later."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def disable_query_hooks():
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.remove(Engine, "handle_error", _handle_error)
@@ -1,3 +1,3 @@
-from models.grant import Base, Grant, ScrapeSource, ScrapeLog
+from models.grant import Base, Grant, GrantTombstone, GrantRawSnapshot, GrantArchive, GrantRawSnapshotArchive, GrantFingerprint, GrantLshBucket, GrantRollup, ScrapeSource, ScrapeLog, ScrapeLogDaily, CrawlUnit, RateBudget, SavedSearch, SavedSearchTerm, SavedSearchMatch, ChangeCursor, DataVersion
 
-__all__ = ["Base", "Grant", "ScrapeSource", "ScrapeLog"]
+__all__ = ["Base", "Grant", "GrantTombstone", "GrantRawSnapshot", "GrantArchive", "GrantRawSnapshotArchive", "GrantFingerprint", "GrantLshBucket", "GrantRollup", "ScrapeSource", "ScrapeLog", "ScrapeLogDaily", "CrawlUnit", "RateBudget", "SavedSearch", "SavedSearchTerm", "SavedSearchMatch", "ChangeCursor", "DataVersion"]
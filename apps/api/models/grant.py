@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String, Text, BigInteger, Date, Boolean, Integer, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, Text, BigInteger, Date, Boolean, Integer, SmallInteger, DateTime, ForeignKey, LargeBinary, Float, DDL, Index, event, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
 from sqlalchemy.sql import func
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, relationship
+from typing import Any, Optional
+from payloads import decompress_payload
 import uuid
 
 
@@ -9,6 +11,12 @@ class Base(DeclarativeBase):
     pass
 
 
+# Statuses still accepting applications; the partial "live" indexes cover these.
+# The others are "closed" (past the deadline), "upcoming" and "withdrawn" (no
+# longer listed upstream).
+LIVE_STATUSES = ("open", "closing_soon")
+
+
 class Grant(Base):
     __tablename__ = "grants"
 
@@ -27,10 +35,206 @@ class Grant(Base):
     detail_url = Column(Text)
     guideline_url = Column(Text)
     status = Column(String(20), nullable=False, default="open")
-    raw_data = Column(JSONB)
+    # SHA-256 of the current upstream payload, stored in grant_raw_snapshots
+    raw_data_hash = Column(String(64))
     last_synced_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Transaction id of the last content change, maintained by trg_grants_change;
+    # the change feed pages through (change_xid, id).
+    change_xid = Column(BigInteger)
+    # Oldest grant of this grant's near-duplicate group, set by the dedup stage;
+    # NULL for grants that are not a duplicate of an older one.
+    canonical_id = Column(UUID(as_uuid=True), ForeignKey("grants.id", ondelete="SET NULL"))
+
+    # Each listing sort is backed by an index in its ORDER BY shape (sort column
+    # NULLS LAST, then id), optionally led by the source filter, plus partial
+    # indexes over live grants for the hot "open, by deadline/amount" views.
+    __table_args__ = (
+        Index("idx_grants_status", "status"),
+        Index(
+            "idx_grants_title_gin",
+            func.to_tsvector(literal_column("'simple'"), title),
+            postgresql_using="gin",
+        ),
+        Index("idx_grants_deadline_id", application_deadline, id),
+        Index("idx_grants_source_deadline_id", source, application_deadline, id),
+        Index("idx_grants_amount_id", amount_max.desc().nulls_last(), id.desc()),
+        Index("idx_grants_source_amount_id", source, amount_max.desc().nulls_last(), id.desc()),
+        Index("idx_grants_created_id", created_at.desc().nulls_last(), id.desc()),
+        # The other order of each sort; NULLS LAST both ways rules out a backward scan.
+        Index("idx_grants_deadline_desc_id", application_deadline.desc().nulls_last(), id.desc()),
+        Index("idx_grants_amount_asc_id", amount_max, id),
+        Index("idx_grants_created_asc_id", created_at, id),
+        Index("idx_grants_title_id", title, id),
+        Index(
+            "idx_grants_live_deadline_id",
+            application_deadline,
+            id,
+            postgresql_where=status.in_(LIVE_STATUSES),
+        ),
+        Index(
+            "idx_grants_live_amount_id",
+            amount_max.desc().nulls_last(),
+            id.desc(),
+            postgresql_where=status.in_(LIVE_STATUSES),
+        ),
+        Index("idx_grants_change_xid_id", change_xid, id),
+        # Range filters: amount windows are matched by overlap, so they need GiST.
+        Index(
+            "idx_grants_amount_range",
+            func.grant_amount_range(amount_min, amount_max),
+            postgresql_using="gist",
+        ),
+        Index("idx_grants_category", category),
+        Index("idx_grants_canonical_id", canonical_id),
+    )
+
+    # Never loaded implicitly; the detail endpoint eager-loads it.
+    raw_snapshot = relationship(
+        "GrantRawSnapshot",
+        primaryjoin="and_(foreign(GrantRawSnapshot.grant_id) == Grant.id, "
+        "foreign(GrantRawSnapshot.content_hash) == Grant.raw_data_hash)",
+        viewonly=True,
+        uselist=False,
+        lazy="noload",
+    )
+
+    @property
+    def raw_data(self) -> Optional[Any]:
+        """Current upstream payload, if ``raw_snapshot`` was loaded."""
+        return self.raw_snapshot.raw_data if self.raw_snapshot else None
+
+
+class GrantTombstone(Base):
+    """Marker left behind by a deleted grant so change-feed clients can drop it."""
+
+    __tablename__ = "grant_tombstones"
+
+    grant_id = Column(UUID(as_uuid=True), primary_key=True)
+    source_id = Column(String(200))
+    change_xid = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("idx_grant_tombstones_change_xid_id", change_xid, grant_id),)
+
+
+class GrantRawSnapshot(Base):
+    """One zstd-compressed upstream payload per distinct content of a grant."""
+
+    __tablename__ = "grant_raw_snapshots"
+
+    grant_id = Column(UUID(as_uuid=True), ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("uq_grant_raw_snapshots_version", grant_id, version, unique=True),)
+
+    @property
+    def raw_data(self) -> Any:
+        return decompress_payload(self.payload)
+
+
+class GrantArchive(Base):
+    """A grant moved out of ``grants`` after being closed or withdrawn for long enough.
+
+    Same columns as ``grants`` plus ``archived_at``, without the listing
+    indexes: archived grants are looked up, never listed. Their payload
+    history moves to ``grant_raw_snapshots_archive``.
+    """
+
+    __tablename__ = "grants_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    source = Column(String(50), nullable=False)
+    source_id = Column(String(200))
+    title = Column(Text, nullable=False)
+    organization = Column(String(200), nullable=False)
+    category = Column(String(100))
+    summary = Column(Text)
+    target_audience = Column(Text)
+    amount_min = Column(BigInteger)
+    amount_max = Column(BigInteger)
+    application_start = Column(Date)
+    application_deadline = Column(Date)
+    detail_url = Column(Text)
+    guideline_url = Column(Text)
+    status = Column(String(20), nullable=False)
+    raw_data_hash = Column(String(64))
+    last_synced_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    change_xid = Column(BigInteger)
+    canonical_id = Column(UUID(as_uuid=True))
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_grants_archive_source_id", source_id),
+        Index("idx_grants_archive_archived_at", archived_at),
+    )
+
+
+class GrantRawSnapshotArchive(Base):
+    """Payload history of an archived grant, as it was in ``grant_raw_snapshots``."""
+
+    __tablename__ = "grant_raw_snapshots_archive"
+
+    grant_id = Column(UUID(as_uuid=True), primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+
+
+class GrantFingerprint(Base):
+    """MinHash signature of a grant's normalized title and organization."""
+
+    __tablename__ = "grant_fingerprints"
+
+    grant_id = Column(UUID(as_uuid=True), ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True)
+    # md5 of the raw "title|organization" the signature was computed from
+    text_hash = Column(String(32), nullable=False)
+    signature = Column(ARRAY(BigInteger), nullable=False)
+
+
+class GrantLshBucket(Base):
+    """One LSH band bucket per (grant, band); grants sharing a bucket are dedup candidates."""
+
+    __tablename__ = "grant_lsh_buckets"
+
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    grant_id = Column(UUID(as_uuid=True), ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (Index("idx_grant_lsh_buckets_grant_id", grant_id),)
+
+
+class GrantRollup(Base):
+    """Grant counts per stats dimension, maintained by trg_grants_rollup_* from each write.
+
+    Grouped by (dimension, key) and the listing filters the rollup can answer:
+    source, status, category and whether the grant is canonical. Writes only
+    append delta rows, so readers sum each group; maintenance folds a group's
+    deltas back into one row.
+    """
+
+    __tablename__ = "grant_rollups"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    dimension = Column(String(20), nullable=False)
+    key = Column(Text)
+    source = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False)
+    category = Column(String(100))
+    canonical = Column(Boolean, nullable=False)
+    grant_count = Column(BigInteger, nullable=False, default=0)
+    amount_max_sum = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("idx_grant_rollups_group", dimension, key, source, status, category, canonical),
+    )
 
 
 class ScrapeSource(Base):
@@ -47,11 +251,16 @@ class ScrapeSource(Base):
 
 
 class ScrapeLog(Base):
+    """One sync run. Range-partitioned by month on started_at; rows that fall
+    outside every monthly partition land in scrape_logs_default. Partitions are
+    created ahead and retired by workers/scraper/maintenance.py."""
+
     __tablename__ = "scrape_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     source_id = Column(UUID(as_uuid=True), ForeignKey("scrape_sources.id"), nullable=False)
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Part of the primary key because it is the partition key.
+    started_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     finished_at = Column(DateTime(timezone=True))
     status = Column(String(20), nullable=False, default="running")
     records_found = Column(Integer, default=0)
@@ -59,3 +268,353 @@ class ScrapeLog(Base):
     records_updated = Column(Integer, default=0)
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_scrape_logs_source_started", source_id, started_at),
+        Index("idx_scrape_logs_started", started_at),
+        {"postgresql_partition_by": "RANGE (started_at)"},
+    )
+
+
+class ScrapeLogDaily(Base):
+    """Per-day, per-source totals kept after a scrape_logs partition is dropped."""
+
+    __tablename__ = "scrape_log_daily"
+
+    day = Column(Date, primary_key=True)
+    source_id = Column(UUID(as_uuid=True), ForeignKey("scrape_sources.id"), primary_key=True)
+    runs = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    records_found = Column(BigInteger, nullable=False, default=0)
+    records_created = Column(BigInteger, nullable=False, default=0)
+    records_updated = Column(BigInteger, nullable=False, default=0)
+    duration_sec = Column(Float, nullable=False, default=0)
+
+
+class CrawlUnit(Base):
+    """One leasable piece of a sync's crawl, such as a single search page.
+
+    Any worker may claim a pending unit, or one whose lease has expired,
+    with FOR UPDATE SKIP LOCKED. A finished unit keeps its own counters;
+    the sync's ScrapeLog is their sum.
+    """
+
+    __tablename__ = "crawl_units"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # scrape_logs is partitioned, so its id alone cannot be a foreign key target.
+    scrape_log_id = Column(UUID(as_uuid=True), nullable=False)
+    source = Column(String(50), nullable=False)
+    params = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    leased_by = Column(String(100))
+    lease_expires_at = Column(DateTime(timezone=True))
+    pages_fetched = Column(Integer, nullable=False, default=0)
+    records_found = Column(Integer, nullable=False, default=0)
+    records_created = Column(Integer, nullable=False, default=0)
+    records_updated = Column(Integer, nullable=False, default=0)
+    error_message = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # A unit is planned once per sync, however many workers enqueue it.
+        Index("uq_crawl_units_log_params", scrape_log_id, source, params, unique=True),
+        Index("idx_crawl_units_log_status", scrape_log_id, status),
+        Index(
+            "idx_crawl_units_claimable",
+            created_at,
+            postgresql_where=status.in_(("pending", "leased")),
+        ),
+    )
+
+
+class RateBudget(Base):
+    """Token bucket for one upstream, shared by every worker that calls it."""
+
+    __tablename__ = "rate_budgets"
+
+    name = Column(String(50), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class SavedSearch(Base):
+    """A user's alert criteria, matched against grants as they are created or changed.
+
+    Every criterion given must hold: the title contains any of ``keywords``,
+    source and category are among those listed, and the amount and deadline
+    windows are applied the way the listing filters apply them.
+    """
+
+    __tablename__ = "saved_searches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner = Column(String(100), nullable=False)
+    name = Column(String(200), nullable=False)
+    keywords = Column(ARRAY(Text), nullable=False, default=list)
+    sources = Column(ARRAY(String(50)), nullable=False, default=list)
+    categories = Column(ARRAY(String(100)), nullable=False, default=list)
+    amount_min = Column(BigInteger)
+    amount_max = Column(BigInteger)
+    deadline_from = Column(Date)
+    deadline_to = Column(Date)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("idx_saved_searches_owner", owner),)
+
+
+class SavedSearchTerm(Base):
+    """Percolator posting: a grant yielding ``term`` is a candidate for the search."""
+
+    __tablename__ = "saved_search_terms"
+
+    term = Column(Text, primary_key=True)
+    search_id = Column(
+        UUID(as_uuid=True), ForeignKey("saved_searches.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (Index("idx_saved_search_terms_search_id", search_id),)
+
+
+class SavedSearchMatch(Base):
+    """Inbox entry: a grant that matched a saved search when it was created or changed."""
+
+    __tablename__ = "saved_search_matches"
+
+    search_id = Column(
+        UUID(as_uuid=True), ForeignKey("saved_searches.id", ondelete="CASCADE"), primary_key=True
+    )
+    grant_id = Column(UUID(as_uuid=True), ForeignKey("grants.id", ondelete="CASCADE"), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    matched_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    grant = relationship("Grant", lazy="noload")
+
+    __table_args__ = (
+        Index("idx_saved_search_matches_search_matched", search_id, matched_at.desc()),
+        Index("idx_saved_search_matches_owner_matched", owner, matched_at.desc()),
+        Index("idx_saved_search_matches_grant_id", grant_id),
+    )
+
+
+class ChangeCursor(Base):
+    """How far a consumer has read the grants change feed, as a (change_xid, id) key."""
+
+    __tablename__ = "change_cursors"
+
+    name = Column(String(50), primary_key=True)
+    change_xid = Column(BigInteger, nullable=False)
+    grant_id = Column(UUID(as_uuid=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DataVersion(Base):
+    """Monotonic change counter per dataset, bumped once by each transaction that writes to it."""
+
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Indexed expression for amount filters: the closed range a grant funds, with
+# a missing bound left open and reversed bounds swapped. NULL when no amount is
+# known, so such grants never match an amount filter.
+event.listen(
+    Grant.__table__,
+    "before_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION grant_amount_range(lo bigint, hi bigint) RETURNS int8range AS $$
+            SELECT CASE
+                WHEN lo IS NULL AND hi IS NULL THEN NULL
+                WHEN lo > hi THEN int8range(hi, lo, '[]')
+                ELSE int8range(lo, hi, '[]')
+            END
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """),
+)
+# The version is bumped once per transaction, as it commits: the data_versions
+# row is the one every writer shares, so it is locked only for the commit
+# itself. next_grants_version() hands out this transaction's version, bumping
+# on first use; writers call it right before committing to announce the
+# version their changes will be visible at, and the deferred trigger covers
+# every other write. Constraint triggers cannot fire on TRUNCATE, which takes
+# an exclusive lock on grants anyway and bumps straight away.
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION next_grants_version() RETURNS bigint AS $$
+        DECLARE
+            current bigint := nullif(current_setting('grantdraft.grants_version', true), '')::bigint;
+        BEGIN
+            IF current IS NULL THEN
+                INSERT INTO data_versions (name, version, updated_at)
+                VALUES ('grants', 1, now())
+                ON CONFLICT (name) DO UPDATE
+                SET version = data_versions.version + 1, updated_at = now()
+                RETURNING version INTO current;
+                PERFORM set_config('grantdraft.grants_version', current::text, true);
+            END IF;
+            RETURN current;
+        END;
+        $$ LANGUAGE plpgsql
+    """),
+)
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION bump_grants_version() RETURNS trigger AS $$
+        BEGIN
+            IF nullif(current_setting('grantdraft.grants_version', true), '') IS NULL THEN
+                PERFORM next_grants_version();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """),
+)
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE CONSTRAINT TRIGGER trg_grants_version
+        AFTER INSERT OR UPDATE OR DELETE ON grants
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION bump_grants_version()
+    """),
+)
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER trg_grants_version_truncate
+        AFTER TRUNCATE ON grants
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_grants_version()
+    """),
+)
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION grants_track_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT'
+               OR (to_jsonb(NEW) - 'last_synced_at' - 'updated_at' - 'change_xid')
+                  IS DISTINCT FROM (to_jsonb(OLD) - 'last_synced_at' - 'updated_at' - 'change_xid') THEN
+                NEW.change_xid := pg_current_xact_id()::text::bigint;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """),
+)
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER trg_grants_change
+        BEFORE INSERT OR UPDATE ON grants
+        FOR EACH ROW EXECUTE FUNCTION grants_track_change()
+    """),
+)
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION grants_record_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO grant_tombstones (grant_id, source_id, change_xid, deleted_at)
+            VALUES (OLD.id, OLD.source_id, pg_current_xact_id()::text::bigint, now())
+            ON CONFLICT (grant_id) DO UPDATE
+            SET change_xid = EXCLUDED.change_xid, deleted_at = EXCLUDED.deleted_at;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """),
+)
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER trg_grants_tombstone
+        AFTER DELETE ON grants
+        FOR EACH ROW EXECUTE FUNCTION grants_record_tombstone()
+    """),
+)
+# Rollups are adjusted per statement from the transition tables: +1 for each
+# new row image, -1 for each old one, so an upsert that changes nothing the
+# rollup tracks (e.g. only last_synced_at) nets out to no write at all. The
+# deltas are appended rather than added onto a shared row: concurrent writers
+# never wait on (or deadlock over) each other's rollup rows.
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION grants_rollup_delta() RETURNS trigger AS $$
+        DECLARE
+            changes text;
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM grant_rollups;
+                RETURN NULL;
+            END IF;
+            changes := CASE TG_OP
+                WHEN 'INSERT' THEN 'SELECT *, 1 AS sign FROM new_rows'
+                WHEN 'DELETE' THEN 'SELECT *, -1 AS sign FROM old_rows'
+                ELSE 'SELECT *, 1 AS sign FROM new_rows UNION ALL SELECT *, -1 FROM old_rows'
+            END;
+            EXECUTE format($q$
+                INSERT INTO grant_rollups
+                    (dimension, key, source, status, category, canonical, grant_count, amount_max_sum)
+                SELECT d.dimension, d.key, c.source, c.status, c.category, c.canonical_id IS NULL,
+                       sum(c.sign), coalesce(sum(c.sign * c.amount_max), 0)
+                FROM (%%s) AS c
+                CROSS JOIN LATERAL (VALUES
+                    ('category', c.category),
+                    ('organization', c.organization),
+                    ('source', c.source),
+                    ('deadline_month', to_char(c.application_deadline, 'YYYY-MM'))
+                ) AS d (dimension, key)
+                GROUP BY 1, 2, 3, 4, 5, 6
+                HAVING sum(c.sign) <> 0 OR coalesce(sum(c.sign * c.amount_max), 0) <> 0
+            $q$, changes);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """),
+)
+# Transition tables need one trigger per event.
+for _event, _transition in (
+    ("INSERT", "NEW TABLE AS new_rows"),
+    ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("DELETE", "OLD TABLE AS old_rows"),
+):
+    event.listen(
+        Grant.__table__,
+        "after_create",
+        DDL(f"""
+            CREATE TRIGGER trg_grants_rollup_{_event.lower()}
+            AFTER {_event} ON grants REFERENCING {_transition}
+            FOR EACH STATEMENT EXECUTE FUNCTION grants_rollup_delta()
+        """),
+    )
+event.listen(
+    Grant.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER trg_grants_rollup_truncate
+        AFTER TRUNCATE ON grants
+        FOR EACH STATEMENT EXECUTE FUNCTION grants_rollup_delta()
+    """),
+)
+event.listen(
+    ScrapeLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE scrape_logs_default PARTITION OF scrape_logs DEFAULT"),
+)
@@ -0,0 +1,43 @@
+"""Storage format for upstream raw payloads, shared by the API and the workers.
+
+Payloads are serialized to canonical JSON, addressed by the SHA-256 of that
+encoding and stored zstd-compressed, so an unchanged payload hashes the same
+on every sync and is never written twice.
+"""
+from typing import Any
+import hashlib
+import json
+
+import orjson
+import zstandard
+
+ZSTD_LEVEL = 10
+
+_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def canonical_json(payload: Any) -> bytes:
+    # Stays on the stdlib encoder: content hashes of stored payloads depend on
+    # its exact output, and orjson formats floats differently (1e16, not
+    # 1e+16) and writes NaN and Infinity as null.
+    return json.dumps(
+        payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    ).encode()
+
+
+def content_hash(encoded: bytes) -> str:
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def compress_payload(encoded: bytes) -> bytes:
+    return _compressor.compress(encoded)
+
+
+def decompress_payload(blob: bytes) -> Any:
+    encoded = _decompressor.decompress(blob)
+    try:
+        return orjson.loads(encoded)
+    except orjson.JSONDecodeError:
+        # NaN and Infinity, which the stdlib writes and orjson does not read
+        return json.loads(encoded)
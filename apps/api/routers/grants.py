@@ -1,90 +1,450 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
-from services.grant_service import GrantService
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from config import settings
+from database import async_session, get_db, get_read_db, get_read_session_factory
+from events import SCRAPE_PROGRESS_CHANNEL, TERMINAL_SCRAPE_STATUSES, scrape_progress_payload
+from services.listener import PgListener, get_listener
+from services.grant_service import GrantService, FEED_START
+from services.recommender import RecommendationIndexStore, get_recommendation_index
+from services.response_cache import cached_json_response
+from services.snapshots import FORMATS as SNAPSHOT_FORMATS, SnapshotStore, get_snapshot_store
+from services.serialization import encode_grant_list, encode_ndjson
 from schemas.grant import (
+    GRANT_FIELDS,
     GrantResponse,
     GrantDetailResponse,
+    GrantRawSnapshotResponse,
     GrantListResponse,
+    PartialGrantListResponse,
+    GrantBatchRequest,
+    GrantBatchResponse,
+    PartialGrantBatchResponse,
+    GrantRecommendRequest,
+    GrantRecommendation,
+    GrantRecommendResponse,
+    GrantChangesResponse,
+    GrantStatsBucket,
+    GrantStatsResponse,
     PaginationMeta,
     SourcesMeta,
+    SavedSearchCreate,
+    SavedSearchResponse,
+    SavedSearchMatchResponse,
     SyncRequest,
     SyncResponse,
     ScrapeLogResponse,
 )
 from uuid import UUID
-from typing import Optional
+from datetime import date, datetime
+from typing import Optional, Union
 import asyncio
+import csv
+import io
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["grants"])
 
+# Sync source keys accepted by the API -> scrape_sources.name
+SYNC_SOURCE_NAMES = {
+    "jgrants": "JGrants API",
+    "erad": "e-Rad公募一覧",
+}
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """Validate a comma-separated ``fields=`` value; ``id`` is always included."""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(GRANT_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+def _check_ranges(
+    deadline_from: Optional[date],
+    deadline_to: Optional[date],
+    amount_min: Optional[int],
+    amount_max: Optional[int],
+):
+    if deadline_from and deadline_to and deadline_from > deadline_to:
+        raise HTTPException(status_code=422, detail="deadline_from must not be after deadline_to")
+    if amount_min is not None and amount_max is not None and amount_min > amount_max:
+        raise HTTPException(status_code=422, detail="amount_min must not exceed amount_max")
+
 
 @router.get("/grants", response_model=GrantListResponse)
 async def list_grants(
+    request: Request,
     status: Optional[str] = Query(None, description="Filter by status"),
     source: Optional[str] = Query(None, description="Filter by source"),
     keyword: Optional[str] = Query(None, description="Search keyword"),
+    deadline_from: Optional[date] = Query(None, description="Deadline on or after"),
+    deadline_to: Optional[date] = Query(None, description="Deadline on or before"),
+    amount_min: Optional[int] = Query(None, ge=0, description="Funding range overlaps from"),
+    amount_max: Optional[int] = Query(None, ge=0, description="Funding range overlaps up to"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    collapse_duplicates: bool = Query(False, description="List one grant per near-duplicate group"),
     sort: str = Query("deadline", description="Sort field"),
     order: str = Query("asc", description="Sort order"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
-    db: AsyncSession = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    count: str = Query(
+        "exact",
+        pattern="^(exact|estimate|none)$",
+        description="Total: exact, estimate (planner rows) or none (has_more only)",
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    _check_ranges(deadline_from, deadline_to, amount_min, amount_max)
     service = GrantService(db)
-    result = await service.list_grants(
-        status=status,
-        source=source,
-        keyword=keyword,
-        sort=sort,
-        order=order,
-        page=page,
-        limit=limit,
+    selected = _parse_fields(fields)
+
+    async def build():
+        result = await service.list_grants(
+            status=status,
+            source=source,
+            keyword=keyword,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+            sort=sort,
+            order=order,
+            page=page,
+            limit=limit,
+            fields=selected,
+            as_rows=settings.FAST_SERIALIZATION,
+            count=count,
+        )
+        if settings.FAST_SERIALIZATION:
+            return encode_grant_list(result["data"], result["pagination"], result["meta"])
+        if selected:
+            return PartialGrantListResponse(
+                data=[{f: getattr(g, f) for f in selected} for g in result["data"]],
+                pagination=PaginationMeta(**result["pagination"]),
+                meta=SourcesMeta(**result["meta"]),
+            )
+        return GrantListResponse(
+            data=[GrantResponse.model_validate(g) for g in result["data"]],
+            pagination=PaginationMeta(**result["pagination"]),
+            meta=SourcesMeta(**result["meta"]),
+        )
+
+    return await cached_json_response(request, await service.get_data_version(), build)
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _encode_ndjson(rows: list[dict]) -> bytes:
+    if settings.FAST_SERIALIZATION:
+        return encode_ndjson(rows)
+    return b"".join(
+        GrantResponse.model_validate(row).model_dump_json().encode() + b"\n" for row in rows
+    )
+
+
+def _encode_csv(rows: list[dict]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[f] is None else row[f] for f in GRANT_FIELDS])
+    return buffer.getvalue().encode()
+
+
+@router.get("/grants/export")
+async def export_grants(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    source: Optional[str] = Query(None, description="Filter by source"),
+    keyword: Optional[str] = Query(None, description="Search keyword"),
+    deadline_from: Optional[date] = Query(None, description="Deadline on or after"),
+    deadline_to: Optional[date] = Query(None, description="Deadline on or before"),
+    amount_min: Optional[int] = Query(None, ge=0, description="Funding range overlaps from"),
+    amount_max: Optional[int] = Query(None, ge=0, description="Funding range overlaps up to"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    collapse_duplicates: bool = Query(False, description="List one grant per near-duplicate group"),
+    sort: str = Query("deadline", description="Sort field"),
+    order: str = Query("asc", description="Sort order"),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+):
+    """Stream every matching grant with constant memory, one batch at a time."""
+    _check_ranges(deadline_from, deadline_to, amount_min, amount_max)
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+
+    async def generate():
+        # The request-scoped session is closed before the body is streamed,
+        # so the cursor lives in a session owned by the generator.
+        async with session_factory() as session:
+            if fmt == "csv":
+                yield (",".join(GRANT_FIELDS) + "\r\n").encode()
+            batches = GrantService(session).stream_grants(
+                status=status,
+                source=source,
+                keyword=keyword,
+                deadline_from=deadline_from,
+                deadline_to=deadline_to,
+                amount_min=amount_min,
+                amount_max=amount_max,
+                category=category,
+                collapse_duplicates=collapse_duplicates,
+                sort=sort,
+                order=order,
+            )
+            async for rows in batches:
+                yield encode(rows)
+
+    return StreamingResponse(
+        generate(),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="grants.{fmt}"'},
     )
-    return GrantListResponse(
+
+
+@router.get("/snapshots/latest")
+async def get_latest_snapshot(
+    request: Request,
+    fmt: str = Query("sqlite", alias="format", pattern="^(sqlite|parquet)$", description="sqlite or parquet"),
+    store: SnapshotStore = Depends(get_snapshot_store),
+):
+    """Download the catalogue snapshot published after the latest sync (``SNAPSHOTS_ENABLED``).
+
+    The ETag is the file's SHA-256; a matching ``If-None-Match`` gets a 304.
+    """
+    snapshot = store.current()
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="No snapshot has been published yet")
+    etag = snapshot.etag(fmt)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "X-Snapshot-Version": str(snapshot.version),
+        "X-Snapshot-Built-At": snapshot.built_at.isoformat(),
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    filename, media_type = SNAPSHOT_FORMATS[fmt]
+    stem, _, extension = filename.partition(".")
+    return FileResponse(
+        snapshot.file_path(fmt),
+        media_type=media_type,
+        filename=f"{stem}-{snapshot.version}.{extension}",
+        headers=headers,
+    )
+
+
+@router.get("/grants/stats", response_model=GrantStatsResponse)
+async def get_grant_stats(
+    request: Request,
+    group_by: str = Query(
+        ...,
+        pattern="^(category|organization|source|deadline_month)$",
+        description="category, organization, source or deadline_month",
+    ),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    source: Optional[str] = Query(None, description="Filter by source"),
+    keyword: Optional[str] = Query(None, description="Search keyword"),
+    deadline_from: Optional[date] = Query(None, description="Deadline on or after"),
+    deadline_to: Optional[date] = Query(None, description="Deadline on or before"),
+    amount_min: Optional[int] = Query(None, ge=0, description="Funding range overlaps from"),
+    amount_max: Optional[int] = Query(None, ge=0, description="Funding range overlaps up to"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    collapse_duplicates: bool = Query(False, description="Count one grant per near-duplicate group"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Grant counts per group, from the incrementally maintained rollups where possible."""
+    _check_ranges(deadline_from, deadline_to, amount_min, amount_max)
+    service = GrantService(db)
+
+    async def build():
+        buckets = await service.get_stats(
+            group_by,
+            status=status,
+            source=source,
+            keyword=keyword,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+        )
+        return GrantStatsResponse(
+            group_by=group_by, data=[GrantStatsBucket(**b) for b in buckets]
+        )
+
+    return await cached_json_response(request, await service.get_data_version(), build)
+
+
+@router.get("/grants/changes", response_model=GrantChangesResponse)
+async def get_grant_changes(
+    since: Optional[str] = Query(None, description="Token from a previous response; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000, description="Max changes per page"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if since:
+        try:
+            xid, _, key = since.partition(".")
+            cursor = (int(xid), UUID(key))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid change token")
+    else:
+        cursor = FEED_START
+    result = await GrantService(db).get_changes(cursor, limit=limit)
+    return GrantChangesResponse(
         data=[GrantResponse.model_validate(g) for g in result["data"]],
-        pagination=PaginationMeta(**result["pagination"]),
-        meta=SourcesMeta(**result["meta"]),
+        deleted=result["deleted"],
+        next_token=result["next_token"],
+        has_more=result["has_more"],
+    )
+
+
+def _parse_ids(ids: str) -> list[UUID]:
+    try:
+        parsed = [UUID(raw.strip()) for raw in ids.split(",") if raw.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated UUIDs")
+    return parsed
+
+
+async def _batch_lookup(
+    service: GrantService, ids: list[UUID], selected: Optional[tuple[str, ...]]
+):
+    """Resolve ``ids`` with one query, keeping input order and reporting misses."""
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=422, detail="At least one id is required")
+    if len(ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request",
+        )
+
+    found = {g.id: g for g in await service.get_grants_by_ids(ids, fields=selected)}
+    missing = [i for i in ids if i not in found]
+    ordered = [found[i] for i in ids if i in found]
+    if selected:
+        return PartialGrantBatchResponse(
+            data=[{f: getattr(g, f) for f in selected} for g in ordered],
+            missing=missing,
+        )
+    return GrantBatchResponse(
+        data=[GrantResponse.model_validate(g) for g in ordered],
+        missing=missing,
+    )
+
+
+@router.get("/grants/batch", response_model=GrantBatchResponse)
+async def get_grants_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated grant ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    service = GrantService(db)
+    parsed = _parse_ids(ids)
+    selected = _parse_fields(fields)
+
+    async def build():
+        return await _batch_lookup(service, parsed, selected)
+
+    return await cached_json_response(request, await service.get_data_version(), build)
+
+
+@router.post("/grants/batch", response_model=Union[GrantBatchResponse, PartialGrantBatchResponse])
+async def post_grants_batch(body: GrantBatchRequest, db: AsyncSession = Depends(get_read_db)):
+    selected = _parse_fields(",".join(body.fields)) if body.fields else None
+    return await _batch_lookup(GrantService(db), body.ids, selected)
+
+
+@router.post("/grants/recommend", response_model=GrantRecommendResponse)
+async def recommend_grants(
+    body: GrantRecommendRequest,
+    db: AsyncSession = Depends(get_read_db),
+    store: RecommendationIndexStore = Depends(get_recommendation_index),
+):
+    """Open grants whose title, summary and audience best match a free-text profile."""
+    index = store.current()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Recommendation index has not been built yet")
+    matches = await GrantService(db).recommend(index, body.text, body.limit)
+    return GrantRecommendResponse(
+        data=[
+            GrantRecommendation(**GrantResponse.model_validate(grant).model_dump(), score=score)
+            for grant, score in matches
+        ],
+        index_built_at=index.built_at,
     )
 
 
 @router.get("/grants/{grant_id}", response_model=GrantDetailResponse)
-async def get_grant(grant_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_grant(grant_id: UUID, request: Request, db: AsyncSession = Depends(get_read_db)):
     service = GrantService(db)
-    grant = await service.get_grant(grant_id)
-    if not grant:
+
+    async def build():
+        grant = await service.get_grant(grant_id)
+        if not grant:
+            raise HTTPException(status_code=404, detail="Grant not found")
+        return GrantDetailResponse.model_validate(grant)
+
+    return await cached_json_response(request, await service.get_data_version(), build)
+
+
+@router.get("/grants/{grant_id}/raw", response_model=list[GrantRawSnapshotResponse])
+async def get_grant_raw_history(grant_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    """Every upstream payload stored for a grant, newest first."""
+    service = GrantService(db)
+    snapshots = await service.get_raw_history(grant_id)
+    if not snapshots and not await service.get_grant(grant_id):
         raise HTTPException(status_code=404, detail="Grant not found")
-    return GrantDetailResponse.model_validate(grant)
+    return [GrantRawSnapshotResponse.model_validate(s) for s in snapshots]
 
 
-async def _run_sync(source: str, log_id: UUID, db_url: str):
-    """Run scraper in background."""
+async def _run_sync(source: str, log_id: UUID):
+    """Run scraper in background on the API's own primary pool.
+
+    For "all", JGrants reports on ``log_id`` and holds it running until
+    e-Rad has finished too, so a progress stream only ends with the sync.
+    """
     import sys
-    import os
     sys.path.insert(0, "/app")
     sys.path.insert(0, "/workers")
 
-    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
     from workers.scraper.jgrants import JGrantsScraper
     from workers.scraper.erad import ERadScraper
 
-    engine = create_async_engine(db_url)
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with session_factory() as session:
+    async with async_session() as session:
+        jgrants = None
         try:
             if source in ("jgrants", "all"):
-                scraper = JGrantsScraper(session, "JGrants API")
-                await scraper.run()
+                jgrants = JGrantsScraper(
+                    session, "JGrants API", log_id=log_id, hold_log=source == "all"
+                )
+                await jgrants.run()
             if source in ("erad", "all"):
-                scraper = ERadScraper(session, "e-Rad公募一覧")
+                scraper = ERadScraper(
+                    session, "e-Rad公募一覧", log_id=log_id if source == "erad" else None
+                )
                 await scraper.run()
         except Exception as e:
             logger.error(f"Sync failed: {e}")
         finally:
-            await engine.dispose()
+            if jgrants is not None:
+                await jgrants.release_log()
 
 
 @router.post("/grants/sync", response_model=SyncResponse, status_code=202)
@@ -95,14 +455,9 @@ async def trigger_sync(
 ):
     service = GrantService(db)
 
-    # Determine source name for log
-    source_name_map = {
-        "jgrants": "JGrants API",
-        "erad": "e-Rad公募一覧",
-        "all": "JGrants API",
-    }
+    # "all" runs JGrants first and records progress on its log, held open until e-Rad is done
     source_record = await service.get_scrape_source_by_name(
-        source_name_map.get(request.source, "JGrants API")
+        SYNC_SOURCE_NAMES.get(request.source, SYNC_SOURCE_NAMES["jgrants"])
     )
 
     if not source_record:
@@ -110,11 +465,7 @@ async def trigger_sync(
 
     log = await service.create_scrape_log(source_record.id)
 
-    from config import settings
-    background_tasks.add_task(
-        asyncio.to_thread,
-        lambda: asyncio.run(_run_sync(request.source, log.id, settings.DATABASE_URL)),
-    )
+    background_tasks.add_task(_run_sync, request.source, log.id)
 
     return SyncResponse(
         scrape_log_id=log.id,
@@ -122,10 +473,127 @@ async def trigger_sync(
     )
 
 
+@router.get("/sync/logs", response_model=list[ScrapeLogResponse])
+async def list_sync_logs(
+    source: Optional[str] = Query(None, pattern="^(jgrants|erad)$", description="jgrants or erad"),
+    since: Optional[datetime] = Query(None, description="Runs started at or after"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Recent sync runs, newest first."""
+    service = GrantService(db)
+    logs = await service.list_scrape_logs(
+        source_name=SYNC_SOURCE_NAMES[source] if source else None,
+        since=since,
+        limit=limit,
+    )
+    return [ScrapeLogResponse.model_validate(log) for log in logs]
+
+
 @router.get("/sync/status/{log_id}", response_model=ScrapeLogResponse)
-async def get_sync_status(log_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_sync_status(log_id: UUID, db: AsyncSession = Depends(get_read_db)):
     service = GrantService(db)
     log = await service.get_scrape_log(log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Sync log not found")
     return ScrapeLogResponse.model_validate(log)
+
+
+@router.post("/searches", response_model=SavedSearchResponse, status_code=201)
+async def create_saved_search(body: SavedSearchCreate, db: AsyncSession = Depends(get_db)):
+    """Save alert criteria; grants created or changed by later syncs are matched against them."""
+    _check_ranges(body.deadline_from, body.deadline_to, body.amount_min, body.amount_max)
+    criteria = body.model_dump()
+    criteria["keywords"] = list(dict.fromkeys(k.strip() for k in body.keywords if k.strip()))
+    service = GrantService(db)
+    search = await service.create_saved_search(**criteria)
+    return SavedSearchResponse.model_validate(search)
+
+
+@router.get("/searches", response_model=list[SavedSearchResponse])
+async def list_saved_searches(
+    owner: str = Query(..., min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    service = GrantService(db)
+    return [SavedSearchResponse.model_validate(s) for s in await service.list_saved_searches(owner)]
+
+
+@router.delete("/searches/{search_id}", status_code=204)
+async def delete_saved_search(search_id: UUID, db: AsyncSession = Depends(get_db)):
+    service = GrantService(db)
+    if not await service.delete_saved_search(search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return Response(status_code=204)
+
+
+@router.get("/searches/{search_id}/matches", response_model=list[SavedSearchMatchResponse])
+async def list_search_matches(
+    search_id: UUID,
+    since: Optional[datetime] = Query(None, description="Matched at or after"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Grants that matched the saved search, newest match first."""
+    service = GrantService(db)
+    if not await service.get_saved_search(search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    matches = await service.list_search_matches(search_id, since=since, limit=limit)
+    return [SavedSearchMatchResponse.model_validate(m) for m in matches]
+
+
+# Seconds between SSE comment lines that keep idle proxies from closing the stream
+SSE_KEEPALIVE_SEC = 15.0
+
+
+def _sse(event: str, data: str) -> bytes:
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+@router.get("/sync/stream/{log_id}")
+async def stream_sync_status(
+    log_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+    listener: PgListener = Depends(get_listener),
+):
+    """Server-Sent Events relay of scraper progress for one sync."""
+    if not await GrantService(db).get_scrape_log(log_id):
+        raise HTTPException(status_code=404, detail="Sync log not found")
+
+    async def events():
+        async with listener.subscription(SCRAPE_PROGRESS_CHANNEL) as queue:
+            # Subscribe before reading the snapshot so no event falls in between.
+            async with session_factory() as session:
+                log = await GrantService(session).get_scrape_log(log_id)
+            yield _sse("progress", scrape_progress_payload(
+                log.id,
+                log.status,
+                records_found=log.records_found or 0,
+                records_created=log.records_created or 0,
+                records_updated=log.records_updated or 0,
+            ))
+            if log.status in TERMINAL_SCRAPE_STATUSES:
+                return
+
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if payload is None:
+                    return  # listener connection lost; EventSource will reconnect
+                event = json.loads(payload)
+                if event.get("log_id") != str(log_id):
+                    continue
+                yield _sse("progress", payload)
+                if event.get("status") in TERMINAL_SCRAPE_STATUSES:
+                    return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,27 @@
-from schemas.grant import GrantResponse, GrantDetailResponse, GrantListResponse, PaginationMeta, SourcesMeta, SyncRequest, SyncResponse, ScrapeLogResponse
+from schemas.grant import GRANT_FIELDS, GrantResponse, GrantDetailResponse, GrantRawSnapshotResponse, GrantListResponse, PartialGrantListResponse, GrantBatchRequest, GrantBatchResponse, PartialGrantBatchResponse, GrantRecommendRequest, GrantRecommendation, GrantRecommendResponse, GrantTombstoneResponse, GrantChangesResponse, GrantStatsBucket, GrantStatsResponse, PaginationMeta, SourcesMeta, SavedSearchCreate, SavedSearchResponse, SavedSearchMatchResponse, SyncRequest, SyncResponse, ScrapeLogResponse
 
 __all__ = [
+    "GRANT_FIELDS",
     "GrantResponse",
     "GrantDetailResponse",
+    "GrantRawSnapshotResponse",
     "GrantListResponse",
+    "PartialGrantListResponse",
+    "GrantBatchRequest",
+    "GrantBatchResponse",
+    "PartialGrantBatchResponse",
+    "GrantRecommendRequest",
+    "GrantRecommendation",
+    "GrantRecommendResponse",
+    "GrantTombstoneResponse",
+    "GrantChangesResponse",
+    "GrantStatsBucket",
+    "GrantStatsResponse",
     "PaginationMeta",
     "SourcesMeta",
+    "SavedSearchCreate",
+    "SavedSearchResponse",
+    "SavedSearchMatchResponse",
     "SyncRequest",
     "SyncResponse",
     "ScrapeLogResponse",
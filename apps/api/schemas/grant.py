@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
 
@@ -19,12 +19,16 @@ class GrantResponse(BaseModel):
     detail_url: Optional[str] = None
     guideline_url: Optional[str] = None
     status: str
+    canonical_id: Optional[UUID] = None
     last_synced_at: datetime
 
     class Config:
         from_attributes = True
 
 
+GRANT_FIELDS: tuple[str, ...] = tuple(GrantResponse.model_fields)
+
+
 class GrantDetailResponse(GrantResponse):
     raw_data: Optional[dict] = None
     created_at: datetime
@@ -34,11 +38,24 @@ class GrantDetailResponse(GrantResponse):
         from_attributes = True
 
 
+class GrantRawSnapshotResponse(BaseModel):
+    version: int
+    content_hash: str
+    created_at: datetime
+    raw_data: Any
+
+    class Config:
+        from_attributes = True
+
+
 class PaginationMeta(BaseModel):
-    total: int
+    # None with count=none; the planner's estimate when ``estimated``
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    has_more: bool = False
+    estimated: bool = False
 
 
 class SourcesMeta(BaseModel):
@@ -52,6 +69,97 @@ class GrantListResponse(BaseModel):
     meta: SourcesMeta
 
 
+class PartialGrantListResponse(BaseModel):
+    """Listing narrowed with ``fields=``; each item holds only the requested keys."""
+
+    data: list[dict[str, Any]]
+    pagination: PaginationMeta
+    meta: SourcesMeta
+
+
+class GrantBatchRequest(BaseModel):
+    ids: list[UUID]
+    fields: Optional[list[str]] = None
+
+
+class GrantBatchResponse(BaseModel):
+    data: list[GrantResponse]
+    missing: list[UUID]
+
+
+class PartialGrantBatchResponse(BaseModel):
+    data: list[dict[str, Any]]
+    missing: list[UUID]
+
+
+class GrantRecommendRequest(BaseModel):
+    # Free-text research profile: summary, keywords, field
+    text: str = Field(..., min_length=1, max_length=5000)
+    limit: int = Field(10, ge=1, le=50)
+
+
+class GrantRecommendation(GrantResponse):
+    score: float
+
+
+class GrantRecommendResponse(BaseModel):
+    data: list[GrantRecommendation]
+    index_built_at: datetime
+
+
+class GrantTombstoneResponse(BaseModel):
+    id: UUID
+    source_id: Optional[str] = None
+    deleted_at: datetime
+
+
+class GrantChangesResponse(BaseModel):
+    data: list[GrantResponse]
+    deleted: list[GrantTombstoneResponse]
+    next_token: str
+    has_more: bool
+
+
+class GrantStatsBucket(BaseModel):
+    key: Optional[str] = None
+    count: int
+    amount_max_total: int
+
+
+class GrantStatsResponse(BaseModel):
+    group_by: str
+    data: list[GrantStatsBucket]
+
+
+class SavedSearchCreate(BaseModel):
+    owner: str = Field(..., min_length=1, max_length=100)
+    name: str = Field(..., min_length=1, max_length=200)
+    # Matches when the title contains any of these
+    keywords: list[str] = Field(default_factory=list, max_length=20)
+    sources: list[str] = Field(default_factory=list, max_length=20)
+    categories: list[str] = Field(default_factory=list, max_length=50)
+    amount_min: Optional[int] = Field(None, ge=0)
+    amount_max: Optional[int] = Field(None, ge=0)
+    deadline_from: Optional[date] = None
+    deadline_to: Optional[date] = None
+
+
+class SavedSearchResponse(SavedSearchCreate):
+    id: UUID
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SavedSearchMatchResponse(BaseModel):
+    grant: GrantResponse
+    matched_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class SyncRequest(BaseModel):
     source: str  # "jgrants" | "erad" | "all"
 
@@ -0,0 +1,165 @@
+"""In-process cache of grants, listing pages and the data version.
+
+Grants only change when a scraper commits, and every scraper batch announces
+itself on ``grants_changed`` with the ids it wrote and the data version it
+produced. Each API process keeps one subscription (through the shared
+``PgListener``) and evicts exactly those grants; listing pages and the
+cached data version are dropped on any change, since a write can move a grant
+into or out of any page. Between syncs, detail, listing and version lookups
+are answered without touching Postgres.
+
+The cache only serves while its subscription is up: when the LISTEN
+connection drops (or falls behind) everything is cleared and nothing is
+cached until it is re-established, so a missed notification can never leave
+stale entries behind. Entries also expire after ``GRANT_CACHE_TTL_SEC`` as a
+backstop for writers that do not notify.
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence
+from uuid import UUID
+import asyncio
+import json
+import logging
+import time
+
+from config import settings
+from events import GRANTS_CHANGED_CHANNEL
+from models.grant import Grant
+from services.listener import PgListener
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to re-subscribe after the LISTEN connection is lost
+RESUBSCRIBE_DELAY_SEC = 5.0
+
+
+class LRU:
+    """Bounded mapping with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class GrantCache:
+    """Grants (detached, with their raw snapshot loaded) and listing results.
+
+    Writers pass the ``generation`` they read before querying: an
+    invalidation that lands while a query is in flight bumps it, and the
+    now-outdated result is not stored. Results read at a data version older
+    than the newest one announced (a lagging replica) are not stored either.
+    """
+
+    def __init__(self, max_grants: int, max_listings: int, ttl: float):
+        self.grants = LRU(max_grants, ttl)
+        self.listings = LRU(max_listings, ttl)
+        self.ttl = ttl
+        self.active = False
+        self.generation = 0
+        # Newest data version announced; only reads at least this fresh are stored.
+        self.min_version = 0
+        self._version: Optional[tuple[float, int]] = None
+
+    def clear(self):
+        self.grants.clear()
+        self.listings.clear()
+        self._version = None
+        self.generation += 1
+
+    def get_version(self) -> Optional[int]:
+        if not self.active or self._version is None:
+            return None
+        expires, version = self._version
+        if expires < time.monotonic():
+            self._version = None
+            return None
+        return version
+
+    def put_version(self, version: int, generation: int):
+        if self.accepts(generation, version):
+            self._version = (time.monotonic() + self.ttl, version)
+
+    def get_grant(self, grant_id: UUID) -> Optional[Grant]:
+        return self.grants.get(grant_id) if self.active else None
+
+    def put_grant(self, grant: Grant, generation: int, version: int):
+        if self.accepts(generation, version):
+            self.grants.put(grant.id, grant)
+
+    def get_listing(self, key: Hashable) -> Optional[dict]:
+        return self.listings.get(key) if self.active else None
+
+    def put_listing(self, key: Hashable, value: dict, generation: int, version: int):
+        if self.accepts(generation, version):
+            self.listings.put(key, value)
+
+    def accepts(self, generation: int, version: int) -> bool:
+        return self.active and generation == self.generation and version >= self.min_version
+
+    def invalidate(self, ids: Optional[Sequence[UUID]], version: int):
+        """Apply one ``grants_changed`` event; ``ids`` of None evicts every grant."""
+        self.min_version = max(self.min_version, version)
+        if ids is None:
+            self.grants.clear()
+        else:
+            for grant_id in ids:
+                self.grants.pop(grant_id)
+        self.listings.clear()
+        self._version = None
+        self.generation += 1
+
+    def apply(self, payload: str):
+        event = json.loads(payload)
+        ids = event.get("ids")
+        self.invalidate(None if ids is None else [UUID(i) for i in ids], event.get("version") or 0)
+
+    async def follow(self, listener: PgListener):
+        """Serve from the cache while subscribed to ``grants_changed``; runs until cancelled."""
+        while True:
+            try:
+                async with listener.subscription(GRANTS_CHANGED_CHANNEL) as queue:
+                    self.clear()
+                    self.active = True
+                    logger.info("[grant-cache] Following grants_changed")
+                    while (payload := await queue.get()) is not None:
+                        self.apply(payload)
+            except Exception as e:
+                logger.warning(f"[grant-cache] grants_changed subscription failed: {e}")
+            finally:
+                self.active = False
+                self.clear()
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SEC)
+
+
+grant_cache = GrantCache(
+    max_grants=settings.GRANT_CACHE_MAX_GRANTS,
+    max_listings=settings.GRANT_CACHE_MAX_LISTINGS,
+    ttl=settings.GRANT_CACHE_TTL_SEC,
+)
@@ -1,74 +1,270 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, asc, or_
+from sqlalchemy import BigInteger, Select, delete, exists, select, func, desc, asc, literal, any_, or_, tuple_, union_all, null, true, false
+from sqlalchemy.dialects.postgresql import ARRAY, INT8RANGE, UUID as PG_UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, joinedload, load_only
 from sqlalchemy.sql import text
-from models.grant import Grant, ScrapeSource, ScrapeLog
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from config import settings
+from models.grant import LIVE_STATUSES, Grant, GrantRawSnapshot, GrantRollup, GrantTombstone, SavedSearch, SavedSearchMatch, ScrapeSource, ScrapeLog, DataVersion
+from schemas.grant import GRANT_FIELDS
+from services.grant_cache import GrantCache, grant_cache
+from services.percolator import index_search
+from services.recommender import RecommendationIndex
 from uuid import UUID
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import AsyncIterator, Optional, Sequence
+import json
 import math
 
+# Change tokens are "<xid>.<uuid>": the feed resumes strictly after that key.
+FEED_START = (0, UUID(int=0))
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a select, with the select's own bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+SORT_COLUMNS = {
+    "deadline": Grant.application_deadline,
+    "created": Grant.created_at,
+    "amount": Grant.amount_max,
+    "title": Grant.title,
+}
+
+# Dimensions of GET /grants/stats, as computed by the rollup trigger.
+STATS_DIMENSIONS = {
+    "category": Grant.category,
+    "organization": Grant.organization,
+    "source": Grant.source,
+    "deadline_month": func.to_char(Grant.application_deadline, "YYYY-MM"),
+}
+
+
+def _filter_conditions(
+    grant,
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    keyword: Optional[str] = None,
+    deadline_from: Optional[date] = None,
+    deadline_to: Optional[date] = None,
+    amount_min: Optional[int] = None,
+    amount_max: Optional[int] = None,
+    category: Optional[str] = None,
+) -> list:
+    """WHERE conditions for the listing filters on ``grant`` (Grant or an alias of it)."""
+    conditions = []
+    if status:
+        # Rendered inline so the planner can prove the partial-index predicate.
+        conditions.append(grant.status == literal(status, literal_execute=True))
+    if source:
+        conditions.append(grant.source == source)
+    if keyword:
+        conditions.append(grant.title.ilike(f"%{keyword}%"))
+    if deadline_from:
+        conditions.append(grant.application_deadline >= deadline_from)
+    if deadline_to:
+        conditions.append(grant.application_deadline <= deadline_to)
+    if amount_min is not None or amount_max is not None:
+        # Overlap with the grant's amount_min..amount_max, via the GiST expression index.
+        lower, upper = (
+            null() if bound is None else literal(bound, BigInteger)
+            for bound in (amount_min, amount_max)
+        )
+        wanted = func.int8range(lower, upper, "[]", type_=INT8RANGE)
+        conditions.append(
+            func.grant_amount_range(grant.amount_min, grant.amount_max, type_=INT8RANGE)
+            .overlaps(wanted)
+        )
+    if category:
+        conditions.append(grant.category == category)
+    return conditions
+
 
 class GrantService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: Optional[GrantCache] = None):
         self.db = db
+        self.cache = grant_cache if cache is None else cache
+        # Grants data version this session reads at, once queried.
+        self._version: Optional[int] = None
+
+    @staticmethod
+    def apply_filters(
+        query: Select,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        keyword: Optional[str] = None,
+        deadline_from: Optional[date] = None,
+        deadline_to: Optional[date] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
+    ) -> Select:
+        filters = dict(
+            status=status,
+            source=source,
+            keyword=keyword,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            category=category,
+        )
+        query = query.where(*_filter_conditions(Grant, **filters))
+        if collapse_duplicates:
+            # One grant per near-duplicate group: the first of its members that
+            # match the other filters, the canonical grant first, then oldest.
+            ahead = aliased(Grant)
+            query = query.where(~exists().where(
+                or_(
+                    ahead.id == Grant.canonical_id,
+                    ahead.canonical_id == func.coalesce(Grant.canonical_id, Grant.id),
+                ),
+                tuple_(ahead.canonical_id.is_not(None), ahead.created_at, ahead.id)
+                < tuple_(Grant.canonical_id.is_not(None), Grant.created_at, Grant.id),
+                *_filter_conditions(ahead, **filters),
+            ))
+        return query
+
+    @classmethod
+    def list_query(
+        cls,
+        query: Select,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        keyword: Optional[str] = None,
+        deadline_from: Optional[date] = None,
+        deadline_to: Optional[date] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
+        sort: str = "deadline",
+        order: str = "asc",
+    ) -> Select:
+        """Filter and order ``query`` the way list_grants does, before pagination.
+
+        The id tiebreaker keeps pages stable and matches the composite indexes,
+        so every sort, in either order, is served by an ordered index scan.
+        Grants without a sort value come last; NULLS LAST is only spelled out
+        on nullable columns, so one (title, id) index serves both orders.
+        """
+        query = cls.apply_filters(
+            query,
+            status=status,
+            source=source,
+            keyword=keyword,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+        )
+        sort_column = SORT_COLUMNS.get(sort, Grant.application_deadline)
+        direction = desc if order == "desc" else asc
+        key = direction(sort_column)
+        if sort_column.expression.nullable:
+            key = key.nulls_last()
+        return query.order_by(key, direction(Grant.id))
 
     async def list_grants(
         self,
         status: Optional[str] = None,
         source: Optional[str] = None,
         keyword: Optional[str] = None,
+        deadline_from: Optional[date] = None,
+        deadline_to: Optional[date] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
         sort: str = "deadline",
         order: str = "asc",
         page: int = 1,
         limit: int = 20,
+        fields: Optional[Sequence[str]] = None,
+        as_rows: bool = False,
+        count: str = "exact",
     ) -> dict:
+        """One listing page. ``as_rows`` returns plain dicts keyed by field
+        instead of ORM instances, skipping identity-map bookkeeping.
+
+        ``count`` selects how the total is obtained (see ``count_grants``);
+        ``has_more`` always comes from fetching one row past the page.
+
+        With the grant cache active, the page's ids, totals and meta are
+        cached and later requests for it only load grants not cached yet.
+        """
         limit = min(limit, 100)
         page = max(page, 1)
         offset = (page - 1) * limit
 
-        query = select(Grant)
-        count_query = select(func.count(Grant.id))
+        key = (
+            status, source, keyword, deadline_from, deadline_to, amount_min, amount_max,
+            category, collapse_duplicates, sort, order, page, limit, count,
+        )
+        cached = self.cache.get_listing(key)
+        if cached is not None:
+            grants = await self._cached_grants(cached["ids"])
+            if as_rows:
+                names = fields or GRANT_FIELDS
+                grants = [{name: getattr(g, name) for name in names} for g in grants]
+            return {"data": grants, "pagination": cached["pagination"], "meta": cached["meta"]}
+        cacheable = self.cache.active
+        if cacheable:
+            generation = self.cache.generation
+            version = await self._session_version()
 
-        # Filters
-        if status:
-            query = query.where(Grant.status == status)
-            count_query = count_query.where(Grant.status == status)
-        if source:
-            query = query.where(Grant.source == source)
-            count_query = count_query.where(Grant.source == source)
-        if keyword:
-            pattern = f"%{keyword}%"
-            query = query.where(Grant.title.ilike(pattern))
-            count_query = count_query.where(Grant.title.ilike(pattern))
-
-        # Sort
-        sort_column_map = {
-            "deadline": Grant.application_deadline,
-            "created": Grant.created_at,
-            "amount": Grant.amount_max,
-            "title": Grant.title,
-        }
-        sort_column = sort_column_map.get(sort, Grant.application_deadline)
-        if order == "desc":
-            query = query.order_by(desc(sort_column).nulls_last())
-        else:
-            query = query.order_by(asc(sort_column).nulls_last())
+        filters = dict(
+            status=status,
+            source=source,
+            keyword=keyword,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+        )
+        # Only load what the response serializes.
+        columns = [getattr(Grant, name) for name in (fields or GRANT_FIELDS)]
+        query = self.list_query(
+            select(*columns) if as_rows else select(Grant).options(load_only(*columns)),
+            sort=sort,
+            order=order,
+            **filters,
+        )
 
-        # Pagination
-        query = query.offset(offset).limit(limit)
+        # Pagination; the extra row only answers has_more
+        query = query.offset(offset).limit(limit + 1)
 
         # Execute
         result = await self.db.execute(query)
-        grants = result.scalars().all()
+        grants = [dict(row) for row in result.mappings()] if as_rows else result.scalars().all()
+        has_more = len(grants) > limit
+        grants = grants[:limit]
 
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        total, estimated = await self.count_grants(count, **filters)
 
         # Source counts
         source_counts_result = await self.db.execute(
-            select(Grant.source, func.count(Grant.id)).group_by(Grant.source)
+            self._rollup_query(select(GrantRollup.key, func.sum(GrantRollup.grant_count)), "source")
+            .group_by(GrantRollup.key)
+            .having(func.sum(GrantRollup.grant_count) > 0)
         )
-        source_counts = {row[0]: row[1] for row in source_counts_result.all()}
+        source_counts = {row[0]: int(row[1]) for row in source_counts_result.all()}
 
         # Last synced
         last_synced_result = await self.db.execute(
@@ -76,28 +272,412 @@ class GrantService:
         )
         last_synced = last_synced_result.scalar()
 
-        return {
-            "data": grants,
-            "pagination": {
-                "total": total,
-                "page": page,
-                "limit": limit,
-                "total_pages": math.ceil(total / limit) if total > 0 else 0,
-            },
-            "meta": {
-                "sources": source_counts,
-                "last_synced": last_synced,
-            },
+        pagination = {
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "total_pages": None if total is None else math.ceil(total / limit),
+            "has_more": has_more,
+            "estimated": estimated,
         }
+        meta = {
+            "sources": source_counts,
+            "last_synced": last_synced,
+        }
+        if cacheable:
+            ids = [g["id"] for g in grants] if as_rows else [g.id for g in grants]
+            self.cache.put_listing(
+                key, {"ids": ids, "pagination": pagination, "meta": meta}, generation, version
+            )
+        return {"data": grants, "pagination": pagination, "meta": meta}
+
+    async def count_grants(
+        self,
+        mode: str = "exact",
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        keyword: Optional[str] = None,
+        deadline_from: Optional[date] = None,
+        deadline_to: Optional[date] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
+    ) -> tuple[Optional[int], bool]:
+        """Number of grants matching the filters, and whether it is an estimate.
+
+        Filters the rollups are keyed by are answered exactly from grant_rollups
+        in every mode. Otherwise ``exact`` counts the matching rows, ``estimate``
+        takes the planner's row estimate (counting exactly when that is below
+        ``LISTING_EXACT_COUNT_BELOW``), and ``none`` skips the count.
+        """
+        if mode == "none":
+            return None, False
+        if self.rollup_can_answer(
+            keyword, deadline_from, deadline_to, amount_min, amount_max,
+            status=status,
+            source=source,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+        ):
+            result = await self.db.execute(self._rollup_query(
+                select(func.coalesce(func.sum(GrantRollup.grant_count), 0)),
+                "source",
+                status=status,
+                source=source,
+                category=category,
+                collapse_duplicates=collapse_duplicates,
+            ))
+            return int(result.scalar()), False
+
+        filters = dict(
+            status=status,
+            source=source,
+            keyword=keyword,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+        )
+        if mode == "estimate":
+            plan = (await self.db.execute(Explain(self.apply_filters(select(Grant.id), **filters)))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+            if estimate >= settings.LISTING_EXACT_COUNT_BELOW:
+                return estimate, True
+        result = await self.db.execute(self.apply_filters(select(func.count(Grant.id)), **filters))
+        return result.scalar(), False
+
+    @staticmethod
+    def rollup_can_answer(
+        keyword: Optional[str] = None,
+        deadline_from: Optional[date] = None,
+        deadline_to: Optional[date] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
+    ) -> bool:
+        """Whether grant_rollups is keyed by every filter given (keyword, deadline and amount are not).
+
+        Collapsed counts are the rollups' canonical grants, which is only right
+        unfiltered: under a status, source or category filter a group can be
+        represented by a duplicate instead of its canonical grant.
+        """
+        if collapse_duplicates and (status or source or category):
+            return False
+        return not (
+            keyword or deadline_from or deadline_to or amount_min is not None or amount_max is not None
+        )
+
+    @staticmethod
+    def _rollup_query(
+        query: Select,
+        dimension: str,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
+    ) -> Select:
+        query = query.where(GrantRollup.dimension == dimension)
+        if status:
+            query = query.where(GrantRollup.status == status)
+        if source:
+            query = query.where(GrantRollup.source == source)
+        if category:
+            query = query.where(GrantRollup.category == category)
+        if collapse_duplicates:
+            query = query.where(GrantRollup.canonical.is_(True))
+        return query
+
+    async def stream_grants(
+        self,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        keyword: Optional[str] = None,
+        deadline_from: Optional[date] = None,
+        deadline_to: Optional[date] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
+        sort: str = "deadline",
+        order: str = "asc",
+        batch_size: int = 500,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield batches of listing rows through a server-side cursor.
+
+        Plain column rows (no ORM identity map) keep memory flat no matter how
+        many grants match.
+        """
+        columns = [getattr(Grant, name) for name in GRANT_FIELDS]
+        query = self.list_query(
+            select(*columns),
+            status=status,
+            source=source,
+            keyword=keyword,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+            sort=sort,
+            order=order,
+        ).execution_options(yield_per=batch_size)
+        result = await self.db.stream(query)
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+    async def get_stats(
+        self,
+        group_by: str,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        keyword: Optional[str] = None,
+        deadline_from: Optional[date] = None,
+        deadline_to: Optional[date] = None,
+        amount_min: Optional[int] = None,
+        amount_max: Optional[int] = None,
+        category: Optional[str] = None,
+        collapse_duplicates: bool = False,
+    ) -> list[dict]:
+        """Grant count and summed amount_max per ``group_by`` key, largest first.
+
+        Served from grant_rollups when every filter is one the rollup is keyed
+        by; keyword, deadline and amount filters fall back to a live GROUP BY.
+        """
+        if not self.rollup_can_answer(
+            keyword, deadline_from, deadline_to, amount_min, amount_max,
+            status=status,
+            source=source,
+            category=category,
+            collapse_duplicates=collapse_duplicates,
+        ):
+            key = STATS_DIMENSIONS[group_by].label("key")
+            count = func.count(Grant.id)
+            total = func.coalesce(func.sum(Grant.amount_max), 0)
+            query = self.apply_filters(
+                select(key, count, total),
+                status=status,
+                source=source,
+                keyword=keyword,
+                deadline_from=deadline_from,
+                deadline_to=deadline_to,
+                amount_min=amount_min,
+                amount_max=amount_max,
+                category=category,
+                collapse_duplicates=collapse_duplicates,
+            ).group_by(key)
+        else:
+            key = GrantRollup.key
+            count = func.sum(GrantRollup.grant_count)
+            total = func.sum(GrantRollup.amount_max_sum)
+            query = self._rollup_query(
+                select(key, count, total),
+                group_by,
+                status=status,
+                source=source,
+                category=category,
+                collapse_duplicates=collapse_duplicates,
+            ).group_by(key).having(count > 0)
+
+        result = await self.db.execute(query.order_by(count.desc(), asc(key).nulls_last()))
+        return [
+            {"key": row[0], "count": int(row[1]), "amount_max_total": int(row[2])}
+            for row in result.all()
+        ]
+
+    async def get_data_version(self, name: str = "grants") -> int:
+        """Current change counter for ``name``; 0 if nothing was ever written."""
+        if name != "grants":
+            result = await self.db.execute(
+                select(DataVersion.version).where(DataVersion.name == name)
+            )
+            return result.scalar() or 0
+        version = self.cache.get_version()
+        if version is None:
+            generation = self.cache.generation
+            version = await self._session_version()
+            self.cache.put_version(version, generation)
+        return version
+
+    async def _session_version(self) -> int:
+        """The grants data version as this session sees it, queried once.
+
+        Read before anything that gets cached: results are only stored when
+        this is at least the newest version announced on ``grants_changed``.
+        """
+        if self._version is None:
+            result = await self.db.execute(
+                select(DataVersion.version).where(DataVersion.name == "grants")
+            )
+            self._version = result.scalar() or 0
+        return self._version
 
     async def get_grant(self, grant_id: UUID) -> Optional[Grant]:
-        result = await self.db.execute(select(Grant).where(Grant.id == grant_id))
-        return result.scalar_one_or_none()
+        grant = self.cache.get_grant(grant_id)
+        if grant is not None:
+            return grant
+        grants = await self._load_grants(Grant.id == grant_id)
+        return grants[0] if grants else None
+
+    async def _load_grants(self, condition) -> list[Grant]:
+        """Full grants with their raw snapshot, stored in the grant cache when it is active."""
+        cacheable = self.cache.active
+        if cacheable:
+            generation = self.cache.generation
+            version = await self._session_version()
+        result = await self.db.execute(
+            select(Grant)
+            .options(joinedload(Grant.raw_snapshot))
+            .where(condition)
+            # raw_snapshot is noload elsewhere; refresh it on already-loaded grants too.
+            .execution_options(populate_existing=True)
+        )
+        grants = list(result.scalars().all())
+        if cacheable:
+            for grant in grants:
+                # Shared across requests: detach it so no session can expire or refresh it.
+                if grant.raw_snapshot is not None:
+                    self.db.expunge(grant.raw_snapshot)
+                self.db.expunge(grant)
+                self.cache.put_grant(grant, generation, version)
+        return grants
+
+    async def _cached_grants(self, ids: Sequence[UUID]) -> list[Grant]:
+        """Grants in ``ids`` order, loading only those not in the grant cache."""
+        found = {}
+        for grant_id in ids:
+            grant = self.cache.get_grant(grant_id)
+            if grant is not None:
+                found[grant_id] = grant
+        missing = [grant_id for grant_id in ids if grant_id not in found]
+        if missing:
+            loaded = await self._load_grants(
+                Grant.id == any_(literal(missing, ARRAY(PG_UUID(as_uuid=True))))
+            )
+            found.update((g.id, g) for g in loaded)
+        return [found[grant_id] for grant_id in ids if grant_id in found]
+
+    async def get_raw_history(self, grant_id: UUID) -> list[GrantRawSnapshot]:
+        """Every stored upstream payload of a grant, newest first."""
+        result = await self.db.execute(
+            select(GrantRawSnapshot)
+            .where(GrantRawSnapshot.grant_id == grant_id)
+            .order_by(GrantRawSnapshot.version.desc())
+        )
+        return list(result.scalars().all())
+
+    async def get_grants_by_ids(
+        self, ids: Sequence[UUID], fields: Optional[Sequence[str]] = None
+    ) -> list[Grant]:
+        """Fetch many grants in one ``id = ANY(:ids)`` round-trip, in no particular order."""
+        if not ids:
+            return []
+        columns = [getattr(Grant, name) for name in (fields or GRANT_FIELDS)]
+        result = await self.db.execute(
+            select(Grant)
+            .options(load_only(*columns))
+            .where(Grant.id == any_(literal(list(ids), ARRAY(PG_UUID(as_uuid=True)))))
+        )
+        return list(result.scalars().all())
+
+    async def recommend(
+        self, index: RecommendationIndex, text: str, limit: int
+    ) -> list[tuple[Grant, float]]:
+        """Live grants most similar to ``text``, best first, with their scores."""
+        # Over-fetch: grants that closed since the index was built are dropped here.
+        matches = index.top_k(text, limit * 2 + 10)
+        grants = await self.get_grants_by_ids([grant_id for grant_id, _ in matches])
+        live = {g.id: g for g in grants if g.status in LIVE_STATUSES}
+        return [(live[grant_id], score) for grant_id, score in matches if grant_id in live][:limit]
+
+    async def get_changes(self, since: tuple[int, UUID], limit: int = 500) -> dict:
+        """Grants changed and removed after ``since``, in (change_xid, id) order.
+
+        Only transactions older than the current snapshot's xmin are returned,
+        so a change that commits late can never slip behind a handed-out token.
+        """
+        xmin_result = await self.db.execute(
+            text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        )
+        horizon = xmin_result.scalar()
+
+        live = select(
+            Grant.change_xid.label("xid"),
+            Grant.id.label("id"),
+            false().label("deleted"),
+            null().label("source_id"),
+            null().label("deleted_at"),
+        ).where(
+            tuple_(Grant.change_xid, Grant.id) > tuple_(*since),
+            Grant.change_xid < horizon,
+        )
+        removed = select(
+            GrantTombstone.change_xid,
+            GrantTombstone.grant_id,
+            true(),
+            GrantTombstone.source_id,
+            GrantTombstone.deleted_at,
+        ).where(
+            tuple_(GrantTombstone.change_xid, GrantTombstone.grant_id) > tuple_(*since),
+            GrantTombstone.change_xid < horizon,
+        )
+        feed = union_all(live, removed).subquery()
+        result = await self.db.execute(
+            select(feed).order_by(feed.c.xid, feed.c.id).limit(limit + 1)
+        )
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        changed_ids = [row.id for row in rows if not row.deleted]
+        grants = {g.id: g for g in await self.get_grants_by_ids(changed_ids)}
+
+        if has_more:
+            next_key = (rows[-1].xid, rows[-1].id)
+        else:
+            next_key = max(since, (horizon, UUID(int=0)))
+        return {
+            "data": [grants[i] for i in changed_ids if i in grants],
+            "deleted": [
+                {"id": row.id, "source_id": row.source_id, "deleted_at": row.deleted_at}
+                for row in rows
+                if row.deleted
+            ],
+            "next_token": f"{next_key[0]}.{next_key[1]}",
+            "has_more": has_more,
+        }
 
     async def get_scrape_log(self, log_id: UUID) -> Optional[ScrapeLog]:
         result = await self.db.execute(select(ScrapeLog).where(ScrapeLog.id == log_id))
         return result.scalar_one_or_none()
 
+    async def list_scrape_logs(
+        self,
+        source_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> list[ScrapeLog]:
+        """Most recent sync runs first. ``since`` prunes to the partitions that can match."""
+        query = select(ScrapeLog)
+        if source_name:
+            query = query.join(ScrapeSource, ScrapeSource.id == ScrapeLog.source_id).where(
+                ScrapeSource.name == source_name
+            )
+        if since:
+            query = query.where(ScrapeLog.started_at >= since)
+        result = await self.db.execute(
+            query.order_by(ScrapeLog.started_at.desc(), ScrapeLog.id.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
     async def get_scrape_source_by_name(self, name: str) -> Optional[ScrapeSource]:
         result = await self.db.execute(
             select(ScrapeSource).where(ScrapeSource.name == name)
@@ -110,3 +690,53 @@ class GrantService:
         await self.db.commit()
         await self.db.refresh(log)
         return log
+
+    async def create_saved_search(self, **criteria) -> SavedSearch:
+        """Store a saved search and post it in the percolator index."""
+        search = SavedSearch(**criteria)
+        self.db.add(search)
+        await self.db.flush()
+        await index_search(self.db, search)
+        await self.db.commit()
+        await self.db.refresh(search)
+        return search
+
+    async def get_saved_search(self, search_id: UUID) -> Optional[SavedSearch]:
+        result = await self.db.execute(select(SavedSearch).where(SavedSearch.id == search_id))
+        return result.scalar_one_or_none()
+
+    async def list_saved_searches(self, owner: str) -> list[SavedSearch]:
+        result = await self.db.execute(
+            select(SavedSearch)
+            .where(SavedSearch.owner == owner)
+            .order_by(SavedSearch.created_at, SavedSearch.id)
+        )
+        return list(result.scalars().all())
+
+    async def delete_saved_search(self, search_id: UUID) -> bool:
+        """Delete a saved search with its postings and matches; False if it did not exist."""
+        result = await self.db.execute(
+            delete(SavedSearch).where(SavedSearch.id == search_id).returning(SavedSearch.id)
+        )
+        deleted = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        return deleted
+
+    async def list_search_matches(
+        self,
+        search_id: UUID,
+        since: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> list[SavedSearchMatch]:
+        """A saved search's matches with their grants, newest first."""
+        query = (
+            select(SavedSearchMatch)
+            .options(joinedload(SavedSearchMatch.grant))
+            .where(SavedSearchMatch.search_id == search_id)
+        )
+        if since:
+            query = query.where(SavedSearchMatch.matched_at >= since)
+        result = await self.db.execute(
+            query.order_by(SavedSearchMatch.matched_at.desc(), SavedSearchMatch.grant_id).limit(limit)
+        )
+        return list(result.scalars().all())
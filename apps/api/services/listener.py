@@ -0,0 +1,83 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from sqlalchemy.engine import make_url
+from config import settings
+import asyncio
+import asyncpg
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PgListener:
+    """A single shared LISTEN connection per process, fanned out to in-process queues.
+
+    Subscribers receive raw NOTIFY payloads; ``None`` is pushed when the
+    connection drops, or when a subscriber falls a full queue behind, so
+    consumers can end their streams and let clients retry.
+    """
+
+    def __init__(self, database_url: str, queue_size: int = 256):
+        url = make_url(database_url).set(drivername="postgresql")
+        self._dsn = url.render_as_string(hide_password=False)
+        self._queue_size = queue_size
+        self._conn: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    @asynccontextmanager
+    async def subscription(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        async with self._lock:
+            await self._ensure_connection()
+            if channel not in self._subscribers:
+                await self._conn.add_listener(channel, self._dispatch)
+                self._subscribers[channel] = set()
+            self._subscribers[channel].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.get(channel, set()).discard(queue)
+
+    async def close(self):
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                await self._conn.close()
+            self._conn = None
+            self._subscribers.clear()
+
+    async def _ensure_connection(self):
+        if self._conn is not None and not self._conn.is_closed():
+            return
+        self._subscribers.clear()
+        self._conn = await asyncpg.connect(self._dsn)
+        self._conn.add_termination_listener(self._on_terminated)
+
+    def _dispatch(self, conn, pid, channel: str, payload: str):
+        for queue in list(self._subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # It has missed an event: end its subscription as if the
+                # connection dropped, so it resubscribes and resyncs.
+                logger.warning(f"[listener] Dropping slow subscriber on '{channel}'")
+                self._subscribers[channel].discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    def _on_terminated(self, conn):
+        logger.warning("[listener] LISTEN connection lost")
+        for queues in self._subscribers.values():
+            for queue in queues:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+        self._subscribers.clear()
+        self._conn = None
+
+
+listener = PgListener(settings.DATABASE_URL)
+
+
+def get_listener() -> PgListener:
+    return listener
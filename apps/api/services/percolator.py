@@ -0,0 +1,268 @@
+"""Saved-search percolation: match changed grants against stored searches.
+
+Instead of running every saved search over the catalogue, each search is
+posted in ``saved_search_terms`` under the keys of one criterion it requires,
+the most selective one it has:
+
+- ``k:<gram>``: a keyword's first character trigram (the keyword itself when
+  shorter), one posting per keyword since any keyword may match;
+- ``c:<category>`` per category;
+- ``d:<YYYY-MM>`` per month of a closed deadline window;
+- ``a:<decade>`` per power of ten an amount window overlaps;
+- ``s:<source>`` per source;
+- ``*`` for searches with none of these.
+
+A grant yields every key it could satisfy (all 1- to 3-grams of its title,
+its category, deadline month, amount decades and source, and ``*``), so
+the searches posted under those keys are its only candidates; each is then
+checked against the grant exactly.
+
+Grants are taken from the change feed after this consumer's cursor in
+``change_cursors``, so a run evaluates what was created or changed since
+the previous run, whoever wrote it, and its cost grows with changed grants
+times candidate searches. Only live grants are matched: closing or withdrawing
+a grant changes it too, but nobody can apply to it any more.
+"""
+from datetime import date
+from typing import Optional, Sequence
+from uuid import UUID
+import logging
+import math
+
+from sqlalchemy import Text, any_, delete, func, literal, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.grant import LIVE_STATUSES, ChangeCursor, Grant, SavedSearch, SavedSearchMatch, SavedSearchTerm
+
+logger = logging.getLogger(__name__)
+
+CURSOR_NAME = "saved_searches"
+GRAM_SIZE = 3
+# Amounts are bucketed by decade, 0 (below 10 yen) to MAX_DECADE (10^15 and up).
+MAX_DECADE = 15
+# Longer deadline windows are not posted by month.
+MAX_DEADLINE_MONTHS = 24
+# Changed grants evaluated per transaction
+BATCH_SIZE = 500
+# Match rows per INSERT
+INSERT_CHUNK = 10000
+
+UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+MATCH_COLUMNS = (
+    Grant.id, Grant.change_xid, Grant.title, Grant.source, Grant.category,
+    Grant.amount_min, Grant.amount_max, Grant.application_deadline,
+)
+
+
+def _decade(amount: int) -> int:
+    return min(MAX_DECADE, max(0, int(math.log10(amount)) if amount >= 1 else 0))
+
+
+def _decades(low: Optional[int], high: Optional[int]) -> range:
+    if low is not None and high is not None and low > high:
+        low, high = high, low
+    return range(
+        0 if low is None else _decade(low),
+        (MAX_DECADE if high is None else _decade(high)) + 1,
+    )
+
+
+def _months(start: date, end: date) -> list[str]:
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def search_terms(search: SavedSearch) -> set[str]:
+    """Posting keys for ``search``; every matching grant yields at least one of them."""
+    if search.keywords:
+        return {f"k:{k.lower()[:GRAM_SIZE]}" for k in search.keywords}
+    if search.categories:
+        return {f"c:{c}" for c in search.categories}
+    if search.deadline_from and search.deadline_to:
+        months = _months(search.deadline_from, search.deadline_to)
+        if len(months) <= MAX_DEADLINE_MONTHS:
+            return {f"d:{m}" for m in months}
+    if search.amount_min is not None or search.amount_max is not None:
+        return {f"a:{d}" for d in _decades(search.amount_min, search.amount_max)}
+    if search.sources:
+        return {f"s:{s}" for s in search.sources}
+    return {"*"}
+
+
+def grant_terms(grant) -> set[str]:
+    """Every key a search matching ``grant`` could be posted under."""
+    title = (grant.title or "").lower()
+    terms = {"*", f"s:{grant.source}"}
+    terms.update(
+        f"k:{title[i:i + n]}" for n in range(1, GRAM_SIZE + 1) for i in range(len(title) - n + 1)
+    )
+    if grant.category:
+        terms.add(f"c:{grant.category}")
+    if grant.application_deadline:
+        terms.add(f"d:{grant.application_deadline:%Y-%m}")
+    if grant.amount_min is not None or grant.amount_max is not None:
+        terms.update(f"a:{d}" for d in _decades(grant.amount_min, grant.amount_max))
+    return terms
+
+
+def matches(search: SavedSearch, grant) -> bool:
+    """Whether ``grant`` satisfies every criterion of ``search``, as the listing filters would."""
+    if search.keywords:
+        title = (grant.title or "").lower()
+        if not any(k.lower() in title for k in search.keywords):
+            return False
+    if search.sources and grant.source not in search.sources:
+        return False
+    if search.categories and grant.category not in search.categories:
+        return False
+    if search.deadline_from or search.deadline_to:
+        deadline = grant.application_deadline
+        if deadline is None:
+            return False
+        if search.deadline_from and deadline < search.deadline_from:
+            return False
+        if search.deadline_to and deadline > search.deadline_to:
+            return False
+    if search.amount_min is not None or search.amount_max is not None:
+        # Range overlap, with grant_amount_range's handling of missing and swapped bounds.
+        low, high = grant.amount_min, grant.amount_max
+        if low is None and high is None:
+            return False
+        if low is not None and high is not None and low > high:
+            low, high = high, low
+        if search.amount_max is not None and low is not None and low > search.amount_max:
+            return False
+        if search.amount_min is not None and high is not None and high < search.amount_min:
+            return False
+    return True
+
+
+async def index_search(db: AsyncSession, search: SavedSearch):
+    """(Re)write the postings of ``search``; the caller commits."""
+    await db.execute(delete(SavedSearchTerm).where(SavedSearchTerm.search_id == search.id))
+    await db.execute(
+        pg_insert(SavedSearchTerm),
+        [{"term": term, "search_id": search.id} for term in sorted(search_terms(search))],
+    )
+
+
+class SearchPercolator:
+    """Evaluate grants changed since the last run against the saved-search postings."""
+
+    def __init__(self, db: AsyncSession, batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.stats = {"evaluated": 0, "candidates": 0, "matched": 0}
+
+    async def run(self) -> dict:
+        while await self._run_batch():
+            pass
+        logger.info(f"[percolator] {self.stats}")
+        return self.stats
+
+    async def _run_batch(self) -> bool:
+        """Evaluate one batch and advance the cursor; False once the feed is drained."""
+        # Only transactions older than this snapshot's xmin, as in the change feed,
+        # so a late commit can never fall behind the cursor.
+        horizon = (
+            await self.db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+        ).scalar()
+        cursor = await self._lock_cursor(horizon)
+
+        result = await self.db.execute(
+            select(*MATCH_COLUMNS)
+            .where(
+                tuple_(Grant.change_xid, Grant.id) > tuple_(cursor.change_xid, cursor.grant_id),
+                Grant.change_xid < horizon,
+                Grant.status.in_(LIVE_STATUSES),
+            )
+            .order_by(Grant.change_xid, Grant.id)
+            .limit(self.batch_size)
+        )
+        grants = result.all()
+        if grants:
+            await self._evaluate(grants)
+            last = grants[-1]
+            position = (last.change_xid, last.id)
+        else:
+            position = max(tuple(cursor), (horizon, UUID(int=0)))
+        await self.db.execute(
+            update(ChangeCursor)
+            .where(ChangeCursor.name == CURSOR_NAME)
+            .values(change_xid=position[0], grant_id=position[1])
+        )
+        await self.db.commit()
+        return len(grants) == self.batch_size
+
+    async def _lock_cursor(self, horizon: int):
+        """The cursor row, locked so concurrent runs take turns.
+
+        A first run starts at the current horizon: saved searches alert on
+        grants changed from now on, not on the catalogue that already exists.
+        """
+        await self.db.execute(
+            pg_insert(ChangeCursor)
+            .values(name=CURSOR_NAME, change_xid=horizon, grant_id=UUID(int=0))
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        result = await self.db.execute(
+            select(ChangeCursor.change_xid, ChangeCursor.grant_id)
+            .where(ChangeCursor.name == CURSOR_NAME)
+            .with_for_update()
+        )
+        return result.one()
+
+    async def _evaluate(self, grants: Sequence):
+        terms = {grant.id: grant_terms(grant) for grant in grants}
+        all_terms = set().union(*terms.values())
+        result = await self.db.execute(
+            select(SavedSearchTerm.term, SavedSearchTerm.search_id)
+            .where(SavedSearchTerm.term == any_(literal(sorted(all_terms), ARRAY(Text))))
+        )
+        postings: dict[str, list[UUID]] = {}
+        for term, search_id in result.all():
+            postings.setdefault(term, []).append(search_id)
+
+        candidates = {
+            grant.id: {s for term in terms[grant.id] for s in postings.get(term, ())}
+            for grant in grants
+        }
+        search_ids = set().union(*candidates.values())
+        self.stats["evaluated"] += len(grants)
+        if not search_ids:
+            return
+        result = await self.db.execute(
+            select(SavedSearch).where(SavedSearch.id == any_(literal(list(search_ids), UUID_ARRAY)))
+        )
+        searches = {s.id: s for s in result.scalars()}
+
+        rows: list[tuple[UUID, UUID, str]] = []
+        for grant in grants:
+            self.stats["candidates"] += len(candidates[grant.id])
+            for search_id in candidates[grant.id]:
+                search = searches.get(search_id)
+                if search is not None and matches(search, grant):
+                    rows.append((search_id, grant.id, search.owner))
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await self._insert_matches(rows[start:start + INSERT_CHUNK])
+
+    async def _insert_matches(self, rows: list[tuple[UUID, UUID, str]]):
+        # Three array parameters unnested server-side: one statement per chunk
+        # however many rows, instead of a bind parameter per value.
+        search_ids, grant_ids, owners = zip(*rows)
+        source = select(
+            func.unnest(literal(list(search_ids), UUID_ARRAY)),
+            func.unnest(literal(list(grant_ids), UUID_ARRAY)),
+            func.unnest(literal(list(owners), ARRAY(Text))),
+        )
+        result = await self.db.execute(
+            pg_insert(SavedSearchMatch)
+            .from_select(["search_id", "grant_id", "owner"], source)
+            .on_conflict_do_nothing(index_elements=["search_id", "grant_id"])
+        )
+        self.stats["matched"] += result.rowcount
@@ -0,0 +1,218 @@
+"""Profile-based grant recommendations over character n-gram TF-IDF vectors.
+
+Each live grant's title, summary and target audience are vectorized into
+hashed character 2/3-grams (no vocabulary to ship around; CRC32 into
+``N_FEATURES`` buckets), weighted by sublinear TF and smoothed IDF and
+L2-normalized. The matrix is stored column-major (CSC) as plain ``.npy``
+arrays that API workers open with ``mmap_mode="r"``, so every process shares
+the same page-cache copy and loading costs nothing.
+
+Scoring a profile only touches the columns of n-grams the profile contains:
+their row ids and weights are gathered, summed per grant with ``bincount``
+and the best ``k`` picked with ``argpartition``.
+
+The worker rebuilds the index after each sync into a fresh directory and
+then atomically repoints ``CURRENT``; readers pick the new build up on their
+next query.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+from uuid import UUID
+import asyncio
+import json
+import logging
+import os
+import shutil
+import unicodedata
+import zlib
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.grant import LIVE_STATUSES, Grant
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 1 << 20
+NGRAM_SIZES = (2, 3)
+CURRENT_FILE = "CURRENT"
+
+
+def normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+def features(text: str) -> Counter:
+    """Hashed character n-gram counts of ``text``."""
+    text = normalize(text)
+    counts: Counter = Counter()
+    for n in NGRAM_SIZES:
+        counts.update(
+            zlib.crc32(text[i:i + n].encode()) & (N_FEATURES - 1)
+            for i in range(len(text) - n + 1)
+        )
+    return counts
+
+
+def document_text(title: Optional[str], summary: Optional[str], target_audience: Optional[str]) -> str:
+    return " ".join(part for part in (title, summary, target_audience) if part)
+
+
+def build_index(docs: Sequence[tuple[UUID, str]], directory: str) -> str:
+    """Vectorize ``docs`` (grant id, text) and publish them as the current index.
+
+    Returns the path of the new build.
+    """
+    rows, cols, counts = [], [], []
+    for row, (_, text) in enumerate(docs):
+        for feature, count in features(text).items():
+            rows.append(row)
+            cols.append(feature)
+            counts.append(count)
+    rows = np.asarray(rows, dtype=np.int32)
+    cols = np.asarray(cols, dtype=np.int32)
+    tf = 1 + np.log(np.asarray(counts, dtype=np.float32))
+
+    n_docs = len(docs)
+    df = np.bincount(cols, minlength=N_FEATURES)
+    idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+    matrix = sparse.csr_matrix((tf * idf[cols], (rows, cols)), shape=(n_docs, N_FEATURES))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix = sparse.diags(1 / norms, format="csr") @ matrix if n_docs else matrix
+    matrix = matrix.tocsc()
+    matrix.sort_indices()
+
+    os.makedirs(directory, exist_ok=True)
+    built_at = datetime.now(timezone.utc)
+    name = f"build-{built_at:%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+    np.save(os.path.join(path, "data.npy"), matrix.data.astype(np.float32))
+    np.save(os.path.join(path, "indices.npy"), matrix.indices.astype(np.int32))
+    np.save(os.path.join(path, "indptr.npy"), matrix.indptr.astype(np.int64))
+    np.save(os.path.join(path, "idf.npy"), idf)
+    ids = np.frombuffer(b"".join(grant_id.bytes for grant_id, _ in docs), dtype=np.uint8)
+    np.save(os.path.join(path, "ids.npy"), ids.reshape(n_docs, 16))
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"built_at": built_at.isoformat(), "grants": n_docs, "nnz": int(matrix.nnz)}, f)
+
+    pointer = os.path.join(directory, CURRENT_FILE)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(name)
+    os.replace(pointer + ".tmp", pointer)
+    _remove_old_builds(directory, keep={name})
+    return path
+
+
+def _remove_old_builds(directory: str, keep: set[str], retain: int = 1):
+    """Delete superseded builds, keeping the ``retain`` newest besides ``keep``.
+
+    The previous build survives one more cycle for readers that resolved
+    ``CURRENT`` just before it moved; open memory maps outlive deletion anyway.
+    """
+    builds = sorted(
+        (entry for entry in os.listdir(directory) if entry.startswith("build-") and entry not in keep),
+        reverse=True,
+    )
+    for entry in builds[retain:]:
+        shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+class RecommendationIndex:
+    """A read-only, memory-mapped index build."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = self._load("data.npy")
+        self.indices = self._load("indices.npy")
+        self.indptr = self._load("indptr.npy")
+        self.idf = self._load("idf.npy")
+        self.ids = self._load("ids.npy")
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.built_at = datetime.fromisoformat(meta["built_at"])
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, name), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return self.ids.shape[0]
+
+    def top_k(self, text: str, k: int) -> list[tuple[UUID, float]]:
+        """Grants most similar to ``text`` by cosine similarity, best first; zero scores dropped."""
+        query = features(text)
+        if not query or not len(self):
+            return []
+        cols = np.fromiter(query.keys(), dtype=np.int64, count=len(query))
+        weights = (1 + np.log(np.fromiter(query.values(), dtype=np.float32, count=len(query))))
+        weights *= self.idf[cols]
+        weights /= np.linalg.norm(weights)
+
+        starts, ends = self.indptr[cols], self.indptr[cols + 1]
+        rows = np.concatenate([self.indices[s:e] for s, e in zip(starts, ends)])
+        contributions = np.concatenate(
+            [self.data[s:e] * w for s, e, w in zip(starts, ends, weights)]
+        )
+        if not len(rows):
+            return []
+        scores = np.bincount(rows, weights=contributions, minlength=len(self))
+
+        k = min(k, len(self))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (UUID(bytes=self.ids[i].tobytes()), float(scores[i]))
+            for i in top
+            if scores[i] > 0
+        ]
+
+
+class RecommendationIndexStore:
+    """Hands out the current build, reopening it when the worker publishes a new one."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._index: Optional[RecommendationIndex] = None
+        self._stamp: Optional[tuple[int, int]] = None
+
+    def current(self) -> Optional[RecommendationIndex]:
+        pointer = os.path.join(self.directory, CURRENT_FILE)
+        try:
+            stat = os.stat(pointer)
+        except FileNotFoundError:
+            return None
+        # os.replace gives every publish a new inode, so a stat is enough to notice it.
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            with open(pointer) as f:
+                name = f.read().strip()
+            self._index = RecommendationIndex(os.path.join(self.directory, name))
+            self._stamp = stamp
+        return self._index
+
+
+async def rebuild_index(db: AsyncSession, directory: str) -> int:
+    """Rebuild the index from every live grant; returns the number of grants indexed."""
+    result = await db.execute(
+        select(Grant.id, Grant.title, Grant.summary, Grant.target_audience)
+        .where(Grant.status.in_(LIVE_STATUSES))
+        .order_by(Grant.id)
+    )
+    docs = [(row.id, document_text(row.title, row.summary, row.target_audience)) for row in result]
+    await asyncio.to_thread(build_index, docs, directory)
+    logger.info(f"[recommend] indexed {len(docs)} grants")
+    return len(docs)
+
+
+recommendation_index = RecommendationIndexStore(settings.RECOMMEND_INDEX_DIR)
+
+
+def get_recommendation_index() -> RecommendationIndexStore:
+    return recommendation_index
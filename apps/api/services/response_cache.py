@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Union
+from fastapi import Request, Response
+from pydantic import BaseModel
+from config import settings
+from middleware.profiling import span
+import brotli
+import gzip
+import hashlib
+
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    "br": lambda body: brotli.compress(body, quality=5),
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+}
+
+
+class CachedBody:
+    """A serialized JSON body plus its lazily compressed variants."""
+
+    def __init__(self, version: int, etag: str, body: bytes):
+        self.version = version
+        self.etag = etag
+        self.encoded: dict[str, bytes] = {"identity": body}
+
+    @property
+    def size(self) -> int:
+        return sum(len(b) for b in self.encoded.values())
+
+    def encode(self, encoding: str) -> bytes:
+        if encoding not in self.encoded:
+            self.encoded[encoding] = ENCODERS[encoding](self.encoded["identity"])
+        return self.encoded[encoding]
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses, invalidated when the data version moves."""
+
+    def __init__(self, max_entries: int, max_bytes: int, min_compress_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_compress_bytes = min_compress_bytes
+        self._entries: OrderedDict[str, CachedBody] = OrderedDict()
+        self._version: Optional[int] = None
+        self._bytes = 0
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}"
+
+    @staticmethod
+    def etag_for(version: int, key: str) -> str:
+        return '"' + hashlib.sha256(f"{version}:{key}".encode()).hexdigest()[:32] + '"'
+
+    def get(self, key: str, version: int) -> Optional[CachedBody]:
+        if self._version is not None and version < self._version:
+            return None  # read from a lagging replica; the cached entries are newer
+        self._sync_version(version)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedBody):
+        if self._version is not None and entry.version < self._version:
+            return  # built from a snapshot that a concurrent request already saw superseded
+        self._sync_version(entry.version)
+        self._drop(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def choose_encoding(self, request: Request, body: bytes) -> str:
+        if len(body) < self.min_compress_bytes:
+            return "identity"
+        accepted = set()
+        for part in request.headers.get("accept-encoding", "").split(","):
+            name, _, params = part.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding in ENCODERS:
+            if encoding in accepted:
+                return encoding
+        return "identity"
+
+    def render(self, request: Request, entry: CachedBody) -> Response:
+        encoding = self.choose_encoding(request, entry.encoded["identity"])
+        before = entry.size
+        body = entry.encode(encoding)
+        self._bytes += entry.size - before
+        self._evict()
+
+        headers = {
+            "ETag": _variant_etag(entry.etag, encoding),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def _sync_version(self, version: int):
+        # Every entry was built from an older snapshot once the version moves
+        # forward; callers never pass an older one.
+        if self._version is None or version > self._version:
+            self.clear()
+            self._version = version
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+
+def _variant_etag(etag: str, encoding: str) -> str:
+    # Each content-coding is its own representation, so it gets its own strong tag.
+    if encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _matching_etag(request: Request, etag: str) -> Optional[str]:
+    """Return the variant of ``etag`` named by ``If-None-Match``, if any."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    variants = {_variant_etag(etag, enc) for enc in ("identity", *ENCODERS)}
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in variants:
+            return candidate
+    return None
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    min_compress_bytes=settings.RESPONSE_CACHE_MIN_COMPRESS_BYTES,
+)
+
+
+async def cached_json_response(
+    request: Request,
+    version: int,
+    build: Callable[[], Awaitable[Union[BaseModel, bytes]]],
+) -> Response:
+    """Answer a GET from the cache, with 304s for matching ``If-None-Match``.
+
+    ``build`` is only awaited on a miss; its model is serialized once (or its
+    bytes used as the body, when already encoded) and reused with its
+    compressed variants until the data version changes.
+    """
+    key = response_cache.key_for(request)
+    etag = response_cache.etag_for(version, key)
+    matched = _matching_etag(request, etag)
+    if matched:
+        return Response(
+            status_code=304,
+            headers={"ETag": matched, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"},
+        )
+
+    entry = response_cache.get(key, version)
+    if entry is None:
+        model = await build()
+        with span("serialize"):
+            body = model if isinstance(model, bytes) else model.model_dump_json().encode()
+            entry = CachedBody(version, etag, body)
+        response_cache.put(key, entry)
+    return response_cache.render(request, entry)
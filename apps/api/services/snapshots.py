@@ -0,0 +1,283 @@
+"""Read-optimized snapshots of the grant catalogue, published after each sync.
+
+The worker streams every grant out of Postgres into two files:
+
+- ``grants.sqlite``: the ``grants`` table (dates as ISO text) with indexes on
+  status/deadline, source and category, plus ``grants_fts``, an FTS5 index
+  over title, summary, organization and target audience. The trigram
+  tokenizer is used so Japanese text is searchable without word segmentation
+  (queries need at least three characters); older SQLite builds fall back to
+  ``unicode61``.
+- ``grants.parquet``: the same rows with columnar types, zstd compressed,
+  one row group per fetched batch.
+
+Both are written into a fresh ``build-*`` directory next to a ``meta.json``
+(data version, build time, size and SHA-256 of each file) and published by
+atomically repointing ``CURRENT``, as the recommendation index is. The
+SHA-256 is the file's ETag, so clients re-download only what changed. A sync
+that changed nothing (same data version) keeps the current snapshot.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.grant import DataVersion, Grant
+from schemas.grant import GRANT_FIELDS
+from services.recommender import CURRENT_FILE, _remove_old_builds
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per server-side cursor batch (and per Parquet row group)
+BATCH_SIZE = 10000
+
+FORMATS = {
+    "sqlite": ("grants.sqlite", "application/vnd.sqlite3"),
+    "parquet": ("grants.parquet", "application/vnd.apache.parquet"),
+}
+
+PARQUET_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("source", pa.string()),
+    ("title", pa.string()),
+    ("organization", pa.string()),
+    ("category", pa.string()),
+    ("summary", pa.string()),
+    ("target_audience", pa.string()),
+    ("amount_min", pa.int64()),
+    ("amount_max", pa.int64()),
+    ("application_start", pa.date32()),
+    ("application_deadline", pa.date32()),
+    ("detail_url", pa.string()),
+    ("guideline_url", pa.string()),
+    ("status", pa.string()),
+    ("canonical_id", pa.string()),
+    ("last_synced_at", pa.timestamp("us", tz="UTC")),
+])
+
+SQLITE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE grants (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    organization TEXT NOT NULL,
+    category TEXT,
+    summary TEXT,
+    target_audience TEXT,
+    amount_min INTEGER,
+    amount_max INTEGER,
+    application_start TEXT,
+    application_deadline TEXT,
+    detail_url TEXT,
+    guideline_url TEXT,
+    status TEXT NOT NULL,
+    canonical_id TEXT,
+    last_synced_at TEXT NOT NULL
+);
+"""
+SQLITE_INDEXES = """
+CREATE INDEX ix_grants_status_deadline ON grants (status, application_deadline);
+CREATE INDEX ix_grants_source ON grants (source);
+CREATE INDEX ix_grants_category ON grants (category);
+"""
+FTS_COLUMNS = ("title", "summary", "organization", "target_audience")
+FTS_TOKENIZER = "trigram" if sqlite3.sqlite_version_info >= (3, 34) else "unicode61"
+
+
+def _sqlite_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+class SnapshotWriter:
+    """Appends batches of grant rows to both snapshot files under ``path``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.sqlite = sqlite3.connect(
+            os.path.join(path, FORMATS["sqlite"][0]), check_same_thread=False
+        )
+        # A throwaway file until it is published: no journal, no fsync per commit.
+        self.sqlite.execute("PRAGMA journal_mode = OFF")
+        self.sqlite.execute("PRAGMA synchronous = OFF")
+        self.sqlite.executescript(SQLITE_SCHEMA)
+        self.parquet = pq.ParquetWriter(
+            os.path.join(path, FORMATS["parquet"][0]), PARQUET_SCHEMA, compression="zstd"
+        )
+
+    def write(self, rows: list[dict]):
+        for row in rows:
+            row["id"] = str(row["id"])
+            if row["canonical_id"] is not None:
+                row["canonical_id"] = str(row["canonical_id"])
+        self.sqlite.executemany(
+            f"INSERT INTO grants ({', '.join(GRANT_FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(GRANT_FIELDS))})",
+            [tuple(_sqlite_value(row[field]) for field in GRANT_FIELDS) for row in rows],
+        )
+        self.sqlite.commit()
+        self.parquet.write_table(pa.Table.from_pylist(rows, schema=PARQUET_SCHEMA))
+        self.rows += len(rows)
+
+    def finish(self, meta: dict):
+        """Index the SQLite file and close both; indexes are built once, after the load."""
+        db = self.sqlite
+        db.executescript(SQLITE_INDEXES)
+        db.execute(
+            f"CREATE VIRTUAL TABLE grants_fts USING fts5({', '.join(FTS_COLUMNS)}, "
+            f"content='grants', content_rowid='rowid', tokenize='{FTS_TOKENIZER}')"
+        )
+        db.execute("INSERT INTO grants_fts (grants_fts) VALUES ('rebuild')")
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+        db.commit()
+        db.execute("ANALYZE")
+        db.execute("PRAGMA journal_mode = DELETE")
+        db.close()
+        self.parquet.close()
+
+    def abort(self):
+        self.sqlite.close()
+        self.parquet.close()
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _publish(directory: str, name: str, meta: dict):
+    """Checksum the finished files, write ``meta.json`` and repoint ``CURRENT``."""
+    path = os.path.join(directory, name)
+    meta["files"] = {}
+    for fmt, (filename, _) in FORMATS.items():
+        file_path = os.path.join(path, filename)
+        meta["files"][fmt] = {
+            "name": filename,
+            "size": os.path.getsize(file_path),
+            "sha256": _sha256(file_path),
+        }
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    pointer = os.path.join(directory, CURRENT_FILE)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(name)
+    os.replace(pointer + ".tmp", pointer)
+    _remove_old_builds(directory, keep={name})
+
+
+@dataclass
+class Snapshot:
+    path: str
+    version: int
+    built_at: datetime
+    grants: int
+    files: dict[str, dict]
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(
+            path=path,
+            version=meta["version"],
+            built_at=datetime.fromisoformat(meta["built_at"]),
+            grants=meta["grants"],
+            files=meta["files"],
+        )
+
+    def file_path(self, fmt: str) -> str:
+        return os.path.join(self.path, self.files[fmt]["name"])
+
+    def etag(self, fmt: str) -> str:
+        return f'"{self.files[fmt]["sha256"]}"'
+
+
+class SnapshotStore:
+    """Hands out the current snapshot, rereading its metadata when a new one is published."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._snapshot: Optional[Snapshot] = None
+        self._stamp: Optional[tuple[int, int]] = None
+
+    def current(self) -> Optional[Snapshot]:
+        pointer = os.path.join(self.directory, CURRENT_FILE)
+        try:
+            stat = os.stat(pointer)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            with open(pointer) as f:
+                name = f.read().strip()
+            self._snapshot = Snapshot.load(os.path.join(self.directory, name))
+            self._stamp = stamp
+        return self._snapshot
+
+
+async def export_snapshot(
+    db: AsyncSession, directory: str, batch_size: int = BATCH_SIZE
+) -> Optional[Snapshot]:
+    """Build and publish a snapshot of every grant; None when the data has not changed.
+
+    Rows come through a server-side cursor and are appended batch by batch,
+    so memory stays flat however large the catalogue is.
+    """
+    # Read before the rows: a write racing the export can only make the
+    # snapshot newer than its version, and the next sync rebuilds it.
+    result = await db.execute(select(DataVersion.version).where(DataVersion.name == "grants"))
+    version = result.scalar() or 0
+    store = SnapshotStore(directory)
+    current = store.current()
+    if current is not None and current.version == version:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    built_at = datetime.now(timezone.utc)
+    name = f"build-{built_at:%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+    writer = await asyncio.to_thread(SnapshotWriter, path)
+    try:
+        result = await db.stream(
+            select(*(getattr(Grant, field) for field in GRANT_FIELDS))
+            .order_by(Grant.id)
+            .execution_options(yield_per=batch_size)
+        )
+        try:
+            async for partition in result.mappings().partitions():
+                await asyncio.to_thread(writer.write, [dict(row) for row in partition])
+        finally:
+            await result.close()
+        # Ends the read transaction, releasing the server-side cursor.
+        await db.commit()
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+    meta = {"version": version, "built_at": built_at.isoformat(), "grants": writer.rows}
+    await asyncio.to_thread(writer.finish, dict(meta))
+    await asyncio.to_thread(_publish, directory, name, meta)
+    logger.info(f"[snapshots] exported {writer.rows} grants (version {version})")
+    return store.current()
+
+
+snapshot_store = SnapshotStore(settings.SNAPSHOT_DIR)
+
+
+def get_snapshot_store() -> SnapshotStore:
+    return snapshot_store
@@ -14,8 +14,10 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from models.grant import Base, Grant, ScrapeSource, ScrapeLog
-from database import get_db
+from database import get_db, get_read_db, get_read_session_factory
 from main import app
+from services.response_cache import response_cache
+from services.listener import PgListener, get_listener
 
 
 # Use sqlite for tests or in-memory postgres mock
@@ -48,24 +50,49 @@ async def db_session(engine):
     session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     async with session_factory() as session:
         yield session
-        # Clean up after each test
-        for table in reversed(Base.metadata.sorted_tables):
-            await session.execute(text(f"DELETE FROM {table.name}"))
+        # Clean up after each test (TRUNCATE skips the row-level tombstone trigger)
+        tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+        await session.execute(text(f"TRUNCATE {tables} CASCADE"))
         await session.commit()
 
 
 @pytest_asyncio.fixture
-async def client(db_session):
+async def client(engine, db_session):
     async def override_get_db():
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_read_session_factory] = lambda: async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    test_listener = PgListener(TEST_DATABASE_URL)
+    app.dependency_overrides[get_listener] = lambda: test_listener
+    response_cache.clear()
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
     app.dependency_overrides.clear()
+    await test_listener.close()
+
+
+@pytest_asyncio.fixture
+async def scrape_log(db_session):
+    """A running sync log for the JGrants source."""
+    source = ScrapeSource(
+        name="JGrants API",
+        type="api",
+        url="https://api.jgrants-portal.go.jp/exp/v1/public/subsidies",
+        schedule_cron="0 6 * * *",
+    )
+    db_session.add(source)
+    await db_session.flush()
+    log = ScrapeLog(source_id=source.id)
+    db_session.add(log)
+    await db_session.commit()
+    return log
 
 
 @pytest_asyncio.fixture
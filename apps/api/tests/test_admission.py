@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from main import app
+from routers import grants as grants_router
+from middleware.admission import AdmissionController, AdmissionMiddleware, ClassLimits, route_class
+
+
+def _controller(rate=1000.0, burst=1000.0, concurrency=10, queue=10, queue_timeout=1.0):
+    limits = ClassLimits(rate, burst, concurrency, queue)
+    return AdmissionController(
+        {"search": limits, "detail": limits, "export": limits, "sync": limits},
+        queue_timeout=queue_timeout,
+        retry_after=1.0,
+        max_clients=100,
+    )
+
+
+class TestRouteClass:
+    def test_classes(self):
+        assert route_class("GET", "/api/v1/grants") == "search"
+        assert route_class("GET", "/api/v1/grants/export") == "export"
+        assert route_class("GET", "/api/v1/snapshots/latest") == "export"
+        assert route_class("GET", "/api/v1/grants/0b7e9c1e-0000-0000-0000-000000000000") == "detail"
+        assert route_class("POST", "/api/v1/grants/sync") == "sync"
+        assert route_class("GET", "/api/v1/sync/stream/abc") is None
+        assert route_class("GET", "/health") is None
+        assert route_class("GET", "/metrics") is None
+
+
+class _GatedApp:
+    """Answers 200 once ``gate`` is set, so tests control how long requests are in flight."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.entered = 0
+
+    async def __call__(self, scope, receive, send):
+        self.entered += 1
+        await self.gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+class _BackgroundApp:
+    """Answers 200 straight away, then keeps working until ``gate`` is set (a background task)."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.finished = False
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 202, "headers": []})
+        await send({"type": "http.response.body", "body": b"started"})
+        await self.gate.wait()
+        self.finished = True
+
+
+async def _wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+@pytest.mark.asyncio
+class TestConcurrencyLimit:
+    async def test_queue_then_shed(self):
+        controller = _controller(concurrency=1, queue=1)
+        inner = _GatedApp()
+        transport = ASGITransport(app=AdmissionMiddleware(inner, controller))
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            first = asyncio.create_task(ac.get("/api/v1/grants"))
+            await _wait_for(lambda: inner.entered == 1)
+            queued = asyncio.create_task(ac.get("/api/v1/grants"))
+            await _wait_for(lambda: controller.concurrency["search"].waiting == 1)
+
+            shed = await ac.get("/api/v1/grants")
+            assert shed.status_code == 503
+            assert shed.headers["retry-after"] == "1"
+
+            # Other classes have their own limits.
+            detail = asyncio.create_task(ac.get("/api/v1/grants/some-id"))
+            await _wait_for(lambda: inner.entered == 2)
+
+            inner.gate.set()
+            assert [r.status_code for r in await asyncio.gather(first, queued, detail)] == [200] * 3
+
+        assert controller.counters["search"] == {
+            "admitted": 2, "queued": 1, "rate_limited": 0, "queue_full": 1, "queue_timeout": 0,
+        }
+        assert controller.concurrency["search"].active == 0
+
+    async def test_queue_timeout(self):
+        controller = _controller(concurrency=1, queue=5, queue_timeout=0.05)
+        inner = _GatedApp()
+        transport = ASGITransport(app=AdmissionMiddleware(inner, controller))
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            first = asyncio.create_task(ac.post("/api/v1/grants/sync"))
+            await _wait_for(lambda: inner.entered == 1)
+            resp = await ac.post("/api/v1/grants/sync")
+            assert resp.status_code == 503
+            inner.gate.set()
+            assert (await first).status_code == 200
+        assert controller.counters["sync"]["queue_timeout"] == 1
+        assert controller.concurrency["sync"].waiting == 0
+
+    async def _background_call(self, controller, inner, method, path):
+        scope = {
+            "type": "http", "method": method, "path": path,
+            "client": ("127.0.0.1", 1), "headers": [],
+        }
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        call = asyncio.create_task(AdmissionMiddleware(inner, controller)(scope, None, send))
+        await _wait_for(lambda: len(sent) == 2)
+        assert not inner.finished
+        return call
+
+    async def test_slot_released_once_response_is_sent(self):
+        controller = _controller(concurrency=1, queue=0)
+        inner = _BackgroundApp()
+        call = await self._background_call(controller, inner, "GET", "/api/v1/grants/export")
+        assert controller.concurrency["export"].active == 0
+
+        inner.gate.set()
+        await call
+        assert controller.concurrency["export"].active == 0
+        assert not controller.concurrency["export"].saturated
+
+    async def test_sync_slot_held_until_background_work_finishes(self):
+        controller = _controller(concurrency=1, queue=0)
+        inner = _BackgroundApp()
+        call = await self._background_call(controller, inner, "POST", "/api/v1/grants/sync")
+        assert controller.concurrency["sync"].active == 1
+
+        inner.gate.set()
+        await call
+        assert controller.concurrency["sync"].active == 0
+        assert not controller.concurrency["sync"].saturated
+
+    async def test_second_sync_refused_while_first_runs(self, client, scrape_log, monkeypatch):
+        gate, started = asyncio.Event(), asyncio.Event()
+
+        async def run_sync(source, log_id):
+            started.set()
+            await gate.wait()
+
+        monkeypatch.setattr(grants_router, "_run_sync", run_sync)
+        controller = _controller(concurrency=1, queue=0)
+        transport = ASGITransport(app=AdmissionMiddleware(app, controller))
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            first = asyncio.create_task(ac.post("/api/v1/grants/sync", json={"source": "jgrants"}))
+            await asyncio.wait_for(started.wait(), 5)
+
+            resp = await asyncio.wait_for(
+                ac.post("/api/v1/grants/sync", json={"source": "jgrants"}), 5
+            )
+            assert resp.status_code == 503
+
+            gate.set()
+            assert (await first).status_code == 202
+        assert controller.counters["sync"]["queue_full"] == 1
+        assert controller.concurrency["sync"].active == 0
+
+
+@pytest_asyncio.fixture
+async def admitted_client(client):
+    """The test app (with the ``client`` fixture's overrides) behind a tight search rate limit."""
+    controller = _controller(rate=0.01, burst=2)
+    transport = ASGITransport(app=AdmissionMiddleware(app, controller))
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac, controller
+
+
+@pytest.mark.asyncio
+class TestRateLimit:
+    async def test_per_client_bucket(self, admitted_client, seed_grants):
+        ac, controller = admitted_client
+        assert (await ac.get("/api/v1/grants")).status_code == 200
+        assert (await ac.get("/api/v1/grants/stats?group_by=category")).status_code == 200
+
+        resp = await ac.get("/api/v1/grants")
+        assert resp.status_code == 429
+        assert 60 <= int(resp.headers["retry-after"]) <= 100
+        assert resp.json()["detail"] == "Too many requests"
+
+        # Details and health checks are not charged to the search bucket.
+        assert (await ac.get(f"/api/v1/grants/{seed_grants[0].id}")).status_code == 200
+        assert (await ac.get("/health")).status_code == 200
+
+        # Buckets are per client address.
+        assert list(controller.buckets["search"]) == ["127.0.0.1"]
+
+    async def test_metrics_expose_counters(self, client, monkeypatch):
+        controller = _controller()
+        controller.counters["sync"]["rate_limited"] = 3
+        monkeypatch.setattr("main.admission", controller)
+        resp = await client.get("/metrics")
+        assert resp.status_code == 200
+        assert 'grantdraft_admission_requests_total{class="sync",outcome="rate_limited"} 3' in resp.text
+        assert 'grantdraft_admission_in_flight{class="search"} 0' in resp.text
+        assert "grantdraft_db_pool_checked_out" in resp.text
@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from bench.compare import compare
+from bench.load import percentile, run_load, summarize
+from bench.seed import reset, seed
+from models.grant import Grant, GrantRawSnapshot
+
+
+class TestPercentiles:
+    def test_interpolates(self):
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([5], 99) == 5
+        assert percentile([], 50) is None
+
+    def test_summarize(self):
+        stats = summarize([(0.010, 2, True), (0.020, 2, True), (0.030, 5, False)])
+        assert stats["requests"] == 3
+        assert stats["errors"] == 1
+        assert stats["p50_ms"] == 20.0
+        assert stats["queries_per_request"] == 3.0
+
+    def test_compare_reports_relative_change(self):
+        def run(p50):
+            overall = {"p50_ms": p50, "p95_ms": 1, "p99_ms": 1, "queries_per_request": 1}
+            return {"overall": overall, "scenarios": {}}
+
+        rows = compare(run(10.0), run(15.0))
+        assert ["overall", "p50_ms", "10.0", "15.0", "+50.0%"] in rows
+
+
+@pytest.mark.asyncio
+class TestBenchHarness:
+    async def test_seed_writes_grants_and_snapshots(self, db_session):
+        today = date(2026, 10, 19)
+        ids = await seed(db_session, 300, raw_bytes=512, batch_size=128, today=today)
+        assert len(set(ids)) == 300
+
+        grants = (await db_session.execute(select(Grant))).scalars().all()
+        assert len(grants) == 300
+        for grant in grants:
+            if grant.application_deadline and grant.application_deadline < today:
+                assert grant.status == "closed"
+        assert {g.source for g in grants} == {"jgrants", "erad"}
+        snapshots = await db_session.execute(select(func.count()).select_from(GrantRawSnapshot))
+        assert snapshots.scalar() == 300
+
+        # A second run continues the numbering instead of colliding.
+        await seed(db_session, 10, raw_bytes=64, today=today)
+        await reset(db_session)
+        assert (await db_session.execute(select(func.count()).select_from(Grant))).scalar() == 0
+
+    async def test_load_reports_every_scenario(self, client, db_session):
+        ids = await seed(db_session, 200, raw_bytes=256)
+        report = await run_load(client, ids, requests=60, concurrency=1, warmup=5)
+
+        assert report["overall"]["requests"] == 60
+        assert report["overall"]["errors"] == 0
+        assert report["overall"]["queries_per_request"] > 0
+        assert report["scenarios"]["detail"]["p50_ms"] > 0
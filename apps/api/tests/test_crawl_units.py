@@ -0,0 +1,270 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from config import settings
+from models.grant import CrawlUnit, Grant, ScrapeLog, ScrapeSource
+from workers.scraper.crawl import (
+    CrawlQueue,
+    PartitionedScraper,
+    RetryUnit,
+    pause_budget,
+    serve,
+    try_take_token,
+)
+
+
+@pytest_asyncio.fixture
+async def sessions(engine):
+    """A second and third session, standing in for other worker processes."""
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as first, factory() as second:
+        yield first, second
+
+
+@pytest.mark.asyncio
+class TestCrawlQueue:
+    async def test_concurrent_claims_skip_locked_units(self, db_session, sessions):
+        log_id = uuid4()
+        await CrawlQueue(db_session).enqueue(log_id, "jgrants", [{"page": i} for i in range(3)])
+        # Planning the same unit again is a no-op.
+        await CrawlQueue(db_session).enqueue(log_id, "jgrants", [{"page": 0}])
+
+        first, second = (CrawlQueue(s, worker=f"w{i}") for i, s in enumerate(sessions))
+        claimed = await asyncio.gather(first.claim(log_id), second.claim(log_id))
+        assert len({unit.id for unit in claimed}) == 2
+        assert {unit.leased_by for unit in claimed} == {"w0", "w1"}
+
+        third = await first.claim(log_id)
+        assert third.id not in {unit.id for unit in claimed}
+        assert await second.claim(log_id) is None
+
+    async def test_expired_lease_is_reclaimed_and_stale_holder_ignored(self, db_session, sessions):
+        log_id = uuid4()
+        crashed, survivor = (CrawlQueue(s, worker=f"w{i}") for i, s in enumerate(sessions))
+        await crashed.enqueue(log_id, "jgrants", [{"page": 0}])
+        unit = await crashed.claim(log_id)
+        assert await survivor.claim(log_id) is None
+
+        await db_session.execute(
+            update(CrawlUnit).values(lease_expires_at=func.now() - text("interval '1 second'"))
+        )
+        await db_session.commit()
+        reclaimed = await survivor.claim(log_id)
+        assert reclaimed.id == unit.id and reclaimed.attempts == 2
+
+        # The first holder comes back too late; its result is discarded.
+        assert not await crashed.complete(unit, {"records_found": 9}, [{"page": 1}])
+        assert await survivor.complete(reclaimed, {"records_found": 3}, [{"page": 1}])
+        summary = await survivor.summary(log_id)
+        assert summary["done"] == 1 and summary["pending"] == 1
+        assert summary["records_found"] == 3
+
+    async def test_failures_retry_until_out_of_attempts(self, db_session):
+        log_id = uuid4()
+        queue = CrawlQueue(db_session, max_attempts=2)
+        await queue.enqueue(log_id, "jgrants", [{"page": 0}])
+
+        await queue.fail(await queue.claim(log_id), "boom")
+        unit = await queue.claim(log_id)
+        assert unit.attempts == 2
+        await queue.fail(unit, "boom again")
+        assert await queue.claim(log_id) is None
+        summary = await queue.summary(log_id)
+        assert summary["failed"] == 1 and summary["pending"] == 0
+
+    async def test_renew_extends_only_a_held_lease(self, db_session, sessions):
+        log_id = uuid4()
+        holder, other = (CrawlQueue(s, worker=f"w{i}", lease_sec=60) for i, s in enumerate(sessions))
+        await holder.enqueue(log_id, "jgrants", [{"page": 0}])
+        unit = await holder.claim(log_id)
+
+        assert await holder.renew(unit, 600)
+        expires = (await db_session.execute(
+            select(CrawlUnit.lease_expires_at - func.now()).where(CrawlUnit.id == unit.id)
+        )).scalar()
+        assert expires.total_seconds() > 600
+        assert not await other.renew(unit)
+
+    async def test_release_does_not_spend_an_attempt(self, db_session):
+        log_id = uuid4()
+        queue = CrawlQueue(db_session, max_attempts=1)
+        await queue.enqueue(log_id, "jgrants", [{"page": 0}])
+        await queue.release(await queue.claim(log_id))
+        assert (await queue.claim(log_id)).attempts == 1
+
+
+@pytest.mark.asyncio
+class TestRateBudget:
+    async def test_burst_then_wait_for_refill(self, db_session, engine):
+        name = f"test-{uuid4().hex[:8]}"
+        assert await try_take_token(engine, name, rate=0.5, burst=2) == 0
+        assert await try_take_token(engine, name, rate=0.5, burst=2) == 0
+        wait = await try_take_token(engine, name, rate=0.5, burst=2)
+        assert 1.5 < wait <= 2.0
+
+
+class _PagedScraper(PartitionedScraper):
+    """Serves ``PAGES[keyword][n]`` as unit (keyword, n); a full page plans the next one."""
+
+    SOURCE = "test"
+    RATE_PER_SEC = 1000.0
+    RATE_BURST = 1000.0
+    PAGE_SIZE = 2
+    PAGES = {
+        "a": [["a1", "a2"], ["a3", "a4"], ["a5"]],
+        "b": [["b1", "b2"], ["b3"]],
+        "c": [["c1", "shared"]],
+        "d": [["shared"]],
+    }
+
+    def __init__(self, db, source_name="Test Source", delay=0.0, throttle_once=(), fail=(), crash=(), **kwargs):
+        super().__init__(db, source_name, **kwargs)
+        self.delay = delay
+        self.throttle_once = set(throttle_once)
+        self.fail = set(fail)
+        self.crash = set(crash)
+        self.fetched = []
+
+    def plan(self) -> list[dict]:
+        return [{"keyword": k, "page": 0} for k in self.PAGES]
+
+    async def fetch_unit(self, client, params):
+        await asyncio.sleep(self.delay)
+        key = (params["keyword"], params["page"])
+        if key in self.throttle_once:
+            self.throttle_once.discard(key)
+            raise RetryUnit()
+        if key in self.crash:
+            raise asyncio.CancelledError()  # the process is killed mid-crawl
+        if key in self.fail:
+            raise RuntimeError("upstream error")
+        self.fetched.append(key)
+        items = self.PAGES[params["keyword"]][params["page"]]
+        follow_ups = []
+        if len(items) == self.PAGE_SIZE and params["page"] + 1 < len(self.PAGES[params["keyword"]]):
+            follow_ups = [{"keyword": params["keyword"], "page": params["page"] + 1}]
+        return items, follow_ups
+
+    def parse(self, raw_data: list) -> list[dict]:
+        return [
+            {"source": "test", "source_id": f"test_{name}", "title": name, "organization": "org", "status": "open"}
+            for name in raw_data
+        ]
+
+
+@pytest.mark.asyncio
+class TestPartitionedCrawl:
+    async def test_sync_shared_with_a_helper_worker(self, db_session, engine, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "RECOMMEND_INDEX_DIR", str(tmp_path))
+        db_session.add(ScrapeSource(
+            name="Test Source", type="api", url="https://example.test", schedule_cron="0 6 * * *"
+        ))
+        await db_session.commit()
+
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        stop = asyncio.Event()
+        async with factory() as helper_session:
+            helper = _PagedScraper(helper_session, delay=0.05)
+            helper_task = asyncio.create_task(serve(helper_session, {"test": helper}, idle_sec=0.05, stop=stop))
+            coordinator = _PagedScraper(db_session, delay=0.05, throttle_once=[("b", 1)])
+            stats = await coordinator.run()
+            stop.set()
+            await helper_task
+
+        assert stats["pages_fetched"] == 7
+        assert stats["records_found"] == 11
+        # "shared" is listed under two keywords but is one grant.
+        assert (stats["records_created"], stats["records_updated"]) == (10, 0)
+        grants = (await db_session.execute(select(func.count()).select_from(Grant))).scalar()
+        assert grants == 10
+
+        units = (await db_session.execute(select(CrawlUnit))).scalars().all()
+        assert {u.status for u in units} == {"done"}
+        assert len({u.leased_by for u in units}) == 2
+
+        log = (await db_session.execute(select(ScrapeLog))).scalar_one()
+        assert log.status == "success"
+        assert log.records_found == 11
+        assert (log.records_created, log.records_updated) == (10, 0)
+
+        # A second sync finds every grant already there.
+        stats = await _PagedScraper(db_session).run()
+        assert (stats["records_created"], stats["records_updated"]) == (0, 10)
+
+    async def test_leases_outlast_a_throttle_pause(self, db_session, engine, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "RECOMMEND_INDEX_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "CRAWL_LEASE_SEC", 0.2)
+        db_session.add(ScrapeSource(
+            name="Test Source", type="api", url="https://example.test", schedule_cron="0 6 * * *"
+        ))
+        await db_session.commit()
+        # The upstream throttled: no token for three leases' worth of time.
+        rate, burst = _PagedScraper.RATE_PER_SEC, _PagedScraper.RATE_BURST
+        await try_take_token(engine, _PagedScraper.SOURCE, rate, burst)
+        await pause_budget(engine, _PagedScraper.SOURCE, rate, 0.6)
+
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        stop = asyncio.Event()
+        async with factory() as helper_session:
+            helper = _PagedScraper(helper_session)
+            helper_task = asyncio.create_task(serve(helper_session, {"test": helper}, idle_sec=0.05, stop=stop))
+            coordinator = _PagedScraper(db_session)
+            stats = await coordinator.run()
+            stop.set()
+            await helper_task
+
+        assert stats["pages_fetched"] == 7
+        assert len(coordinator.fetched) + len(helper.fetched) == 7
+        units = (await db_session.execute(select(CrawlUnit))).scalars().all()
+        assert {(u.status, u.attempts) for u in units} == {("done", 1)}
+
+    async def test_resume_fetches_only_unfinished_pages(self, db_session, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "RECOMMEND_INDEX_DIR", str(tmp_path))
+        db_session.add(ScrapeSource(
+            name="Test Source", type="api", url="https://example.test", schedule_cron="0 6 * * *"
+        ))
+        await db_session.commit()
+
+        # c0 fails every attempt, then the worker dies while fetching b1.
+        first = _PagedScraper(db_session, fail=[("c", 0)], crash=[("b", 1)])
+        with pytest.raises(asyncio.CancelledError):
+            await first.run()
+        await db_session.rollback()
+        log_id = first.log.id
+        assert sorted(first.fetched) == [("a", 0), ("a", 1), ("b", 0), ("d", 0)]
+
+        # The dead worker's lease runs out.
+        await db_session.execute(
+            update(CrawlUnit)
+            .where(CrawlUnit.status == "leased")
+            .values(lease_expires_at=func.now() - text("interval '1 second'"))
+        )
+        await db_session.commit()
+
+        resumed = _PagedScraper(db_session, log_id=log_id, resume=True)
+        stats = await resumed.run()
+        assert sorted(resumed.fetched) == [("a", 2), ("b", 1), ("c", 0)]
+        assert stats["pages_fetched"] == 7
+        assert stats["records_found"] == 11
+
+        units = (await db_session.execute(select(CrawlUnit))).scalars().all()
+        assert {u.status for u in units} == {"done"}
+        assert len(units) == 7
+        log = (await db_session.execute(select(ScrapeLog))).scalar_one()
+        assert (log.id, log.status, log.error_message) == (log_id, "success", None)
+        assert (await db_session.execute(select(func.count()).select_from(Grant))).scalar() == 10
+
+    async def test_resume_requires_an_existing_log(self, db_session):
+        scraper = _PagedScraper(db_session, log_id=uuid4(), resume=True)
+        with pytest.raises(ValueError):
+            await scraper.run()
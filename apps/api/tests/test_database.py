@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database import ReplicaRouter
+from tests.conftest import TEST_DATABASE_URL
+
+UNREACHABLE_URL = "postgresql+asyncpg://grantdraft:x@127.0.0.1:1/grantdraft_test"
+
+
+@pytest.mark.asyncio
+class TestReplicaRouter:
+    @pytest.fixture
+    def primary(self, engine):
+        return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def test_no_replicas_uses_primary(self, primary):
+        router = ReplicaRouter(primary, [], max_lag=5, check_interval=0)
+        assert await router.session_factory() is primary
+
+    async def test_healthy_replica_is_used(self, primary):
+        router = ReplicaRouter(primary, [TEST_DATABASE_URL], max_lag=5, check_interval=0)
+        factory = await router.session_factory()
+        assert factory is router.replicas[0]
+        async with factory() as session:
+            assert await session.scalar(text("SELECT 1")) == 1
+        await router.dispose()
+
+    async def test_unreachable_replica_falls_back(self, primary):
+        router = ReplicaRouter(primary, [UNREACHABLE_URL], max_lag=5, check_interval=0)
+        assert await router.session_factory() is primary
+        await router.dispose()
+
+    async def test_lagging_replica_falls_back(self, primary):
+        router = ReplicaRouter(primary, [TEST_DATABASE_URL], max_lag=5, check_interval=60)
+        router._lag[0] = 30.0
+        router._checked_at[0] = float("inf")
+        assert await router.session_factory() is primary
+        await router.dispose()
+
+    async def test_round_robin_skips_unhealthy(self, primary):
+        router = ReplicaRouter(
+            primary, [UNREACHABLE_URL, TEST_DATABASE_URL], max_lag=5, check_interval=60
+        )
+        assert await router.session_factory() is router.replicas[1]
+        assert await router.session_factory() is router.replicas[1]
+        await router.dispose()
+
+    async def test_unresponsive_replica_times_out_to_primary(self, primary):
+        # Accepts connections but never answers the startup handshake.
+        server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        url = f"postgresql+asyncpg://grantdraft:x@127.0.0.1:{port}/grantdraft_test"
+        router = ReplicaRouter(primary, [url], max_lag=5, check_interval=60, check_timeout=0.2)
+        started = time.monotonic()
+        assert await router.session_factory() is primary
+        assert time.monotonic() - started < 2
+        server.close()
+        await router.dispose()
+
+    async def test_replica_without_wal_receiver_falls_back(self, primary, monkeypatch):
+        router = ReplicaRouter(primary, [TEST_DATABASE_URL], max_lag=5, check_interval=0)
+
+        async def not_streaming(factory):
+            return None
+
+        monkeypatch.setattr(router, "_query_lag", not_streaming)
+        assert await router.session_factory() is primary
+        await router.dispose()
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from models.grant import Grant, GrantFingerprint
+from workers.scraper.dedup import Deduplicator
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+async def _groups(db_session) -> dict[str, str]:
+    """source_id -> source_id of its canonical grant (itself when canonical)."""
+    result = await db_session.execute(select(Grant.id, Grant.source_id, Grant.canonical_id))
+    rows = result.all()
+    names = {grant_id: source_id for grant_id, source_id, _ in rows}
+    return {source_id: names[canonical_id or grant_id] for grant_id, source_id, canonical_id in rows}
+
+
+async def _listed(db_session, resp) -> list[str]:
+    result = await db_session.execute(select(Grant.id, Grant.source_id))
+    names = {str(grant_id): source_id for grant_id, source_id in result.all()}
+    return [names[g["id"]] for g in resp.json()["data"]]
+
+
+@pytest_asyncio.fixture
+async def duplicates(db_session):
+    """One call listed by both sources (plus a reworded copy) and an unrelated grant."""
+    for days, source, source_id, title, organization in [
+        (0, "jgrants", "jg_call", "令和8年度 研究開発支援事業", "文部科学省"),
+        (1, "erad", "erad_call", "令和8年度研究開発支援事業（公募）", "文部科学省"),
+        (2, "jgrants", "jg_call_copy", "令和８年度 研究開発支援事業", "文部科学省"),
+        (3, "erad", "erad_other", "国際共同研究プログラム", "日本学術振興会"),
+    ]:
+        db_session.add(Grant(
+            source=source, source_id=source_id, title=title, organization=organization,
+            status="open", created_at=CREATED + timedelta(days=days),
+        ))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+class TestDeduplicator:
+    async def test_groups_duplicates_under_oldest(self, db_session, duplicates):
+        stats = await Deduplicator(db_session).run()
+        assert stats == {"fingerprinted": 4, "regrouped": 2}
+        assert await _groups(db_session) == {
+            "jg_call": "jg_call",
+            "erad_call": "jg_call",
+            "jg_call_copy": "jg_call",
+            "erad_other": "erad_other",
+        }
+
+        # Nothing changed: nothing is hashed or written again.
+        assert await Deduplicator(db_session).run() == {"fingerprinted": 0, "regrouped": 0}
+
+    async def test_renamed_grants_are_regrouped(self, db_session, duplicates):
+        await Deduplicator(db_session).run()
+
+        # The group's canonical grant is renamed away: the rest regroup under the next oldest.
+        await db_session.execute(
+            update(Grant).where(Grant.source_id == "jg_call").values(title="地域産業振興補助金")
+        )
+        await db_session.commit()
+        stats = await Deduplicator(db_session).run()
+        assert stats == {"fingerprinted": 1, "regrouped": 2}
+        assert await _groups(db_session) == {
+            "jg_call": "jg_call",
+            "erad_call": "erad_call",
+            "jg_call_copy": "erad_call",
+            "erad_other": "erad_other",
+        }
+        fingerprints = await db_session.execute(select(GrantFingerprint.grant_id))
+        assert len(fingerprints.scalars().all()) == 4
+
+
+@pytest.mark.asyncio
+class TestCollapseDuplicates:
+    async def test_lists_first_matching_member_of_each_group(self, client, db_session, duplicates):
+        await Deduplicator(db_session).run()
+
+        resp = await client.get("/api/v1/grants?collapse_duplicates=true&sort=created")
+        assert await _listed(db_session, resp) == ["jg_call", "erad_other"]
+
+        # The canonical grant closes: its open duplicates still represent the group.
+        await db_session.execute(update(Grant).where(Grant.source_id == "jg_call").values(status="closed"))
+        await db_session.commit()
+        resp = await client.get("/api/v1/grants?collapse_duplicates=true&status=open&sort=created")
+        assert await _listed(db_session, resp) == ["erad_call", "erad_other"]
+        assert resp.json()["pagination"]["total"] == 2
+
+        resp = await client.get("/api/v1/grants?collapse_duplicates=true&source=jgrants&sort=created")
+        assert await _listed(db_session, resp) == ["jg_call"]
+        resp = await client.get(
+            "/api/v1/grants?collapse_duplicates=true&source=jgrants&status=open&sort=created"
+        )
+        assert await _listed(db_session, resp) == ["jg_call_copy"]
+
+    async def test_stats_count_one_grant_per_group(self, client, db_session, duplicates):
+        await Deduplicator(db_session).run()
+        await db_session.execute(update(Grant).where(Grant.source_id == "jg_call").values(status="closed"))
+        await db_session.commit()
+
+        resp = await client.get("/api/v1/grants/stats?group_by=source&collapse_duplicates=true")
+        assert {b["key"]: b["count"] for b in resp.json()["data"]} == {"jgrants": 1, "erad": 1}
+        resp = await client.get(
+            "/api/v1/grants/stats?group_by=source&collapse_duplicates=true&status=open"
+        )
+        assert {b["key"]: b["count"] for b in resp.json()["data"]} == {"erad": 2}
@@ -0,0 +1,173 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, update
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from config import settings
+from models.grant import (
+    Grant,
+    GrantArchive,
+    GrantRawSnapshot,
+    GrantRawSnapshotArchive,
+    GrantTombstone,
+    ScrapeSource,
+)
+from workers.scraper.base import ListingScraper
+from workers.scraper.maintenance import GrantArchiver
+
+TODAY = date(2026, 10, 19)
+
+
+def _at(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+class _ListingScraper(ListingScraper):
+    SOURCE = "jgrants"
+
+    def __init__(self, db, source_ids):
+        super().__init__(db, "JGrants API")
+        self.source_ids = source_ids
+
+    async def fetch(self) -> list:
+        return self.source_ids
+
+    def parse(self, raw_data: list) -> list[dict]:
+        return [
+            {"source": "jgrants", "source_id": s, "title": s, "organization": "org", "status": "open"}
+            for s in raw_data
+        ]
+
+
+async def _statuses(db_session) -> dict[str, str]:
+    result = await db_session.execute(select(Grant.source_id, Grant.status))
+    return dict(result.all())
+
+
+@pytest_asyncio.fixture
+async def listing(db_session, tmp_path, monkeypatch):
+    """Five live JGrants grants, a closed one and an e-Rad one, last synced a day ago."""
+    monkeypatch.setattr(settings, "RECOMMEND_INDEX_DIR", str(tmp_path))
+    db_session.add(ScrapeSource(
+        name="JGrants API", type="api", url="https://example.test", schedule_cron="0 6 * * *"
+    ))
+    for source_id, source, status in [
+        *((f"jgrants_{n}", "jgrants", "open") for n in "abcde"),
+        ("jgrants_closed", "jgrants", "closed"),
+        ("erad_x", "erad", "open"),
+    ]:
+        db_session.add(Grant(
+            source=source, source_id=source_id, title=source_id, organization="org", status=status,
+        ))
+    await db_session.commit()
+    await db_session.execute(
+        update(Grant).values(last_synced_at=func.now() - timedelta(days=1))
+    )
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+class TestReconcile:
+    async def test_unseen_live_grants_are_withdrawn(self, db_session, listing):
+        stats = await _ListingScraper(db_session, [f"jgrants_{n}" for n in "abcd"]).run()
+        assert stats["records_withdrawn"] == 1
+        assert await _statuses(db_session) == {
+            **{f"jgrants_{n}": "open" for n in "abcd"},
+            "jgrants_e": "withdrawn",
+            "jgrants_closed": "closed",
+            "erad_x": "open",
+        }
+
+        # Listed again: back to the status upstream reports.
+        await _ListingScraper(db_session, [f"jgrants_{n}" for n in "abcde"]).run()
+        assert (await _statuses(db_session))["jgrants_e"] == "open"
+
+    async def test_withdrawn_grants_past_deadline_stay_withdrawn(self, db_session, listing):
+        await db_session.execute(
+            update(Grant)
+            .where(Grant.source_id == "jgrants_e")
+            .values(status="withdrawn", application_deadline=TODAY - timedelta(days=30))
+        )
+        await db_session.commit()
+        withdrawn_at = (
+            await db_session.execute(select(Grant.updated_at).where(Grant.source_id == "jgrants_e"))
+        ).scalar()
+
+        await _ListingScraper(db_session, [f"jgrants_{n}" for n in "abcd"]).run()
+        result = await db_session.execute(
+            select(Grant.status, Grant.updated_at).where(Grant.source_id == "jgrants_e")
+        )
+        assert result.one() == ("withdrawn", withdrawn_at)
+
+    async def test_mostly_empty_listing_withdraws_nothing(self, db_session, listing):
+        stats = await _ListingScraper(db_session, ["jgrants_a"]).run()
+        assert stats["records_withdrawn"] == 0
+        assert "withdrawn" not in (await _statuses(db_session)).values()
+
+
+@pytest.mark.asyncio
+class TestGrantArchiver:
+    async def test_moves_long_closed_and_withdrawn_grants(self, db_session):
+        old, recent = _at(TODAY - timedelta(days=200)), _at(TODAY - timedelta(days=10))
+        grants = {
+            "withdrawn_old": Grant(status="withdrawn", updated_at=old),
+            "withdrawn_recent": Grant(status="withdrawn", updated_at=recent),
+            "closed_old": Grant(status="closed", application_deadline=old.date(), raw_data_hash="h1"),
+            "closed_undated_old": Grant(status="closed", updated_at=old),
+            "closed_recent": Grant(status="closed", application_deadline=recent.date()),
+            "open_past_deadline": Grant(status="open", application_deadline=old.date()),
+        }
+        for source_id, grant in grants.items():
+            grant.source, grant.source_id, grant.title, grant.organization = "jgrants", source_id, source_id, "org"
+            db_session.add(grant)
+        await db_session.flush()
+        db_session.add(GrantRawSnapshot(
+            grant_id=grants["closed_old"].id, content_hash="h1", version=1, payload=b"x"
+        ))
+        await db_session.commit()
+        archived_ids = {grants[s].id for s in ("withdrawn_old", "closed_old", "closed_undated_old")}
+
+        stats = await GrantArchiver(db_session, after_days=90, batch_size=2, today=TODAY).run()
+        assert stats == {"archived": 3}
+
+        remaining = await db_session.execute(select(Grant.source_id))
+        assert set(remaining.scalars()) == {"withdrawn_recent", "closed_recent", "open_past_deadline"}
+        archive = (await db_session.execute(select(GrantArchive))).scalars().all()
+        assert {a.id for a in archive} == archived_ids
+        assert all(a.archived_at is not None and a.title == a.source_id for a in archive)
+        snapshots = (await db_session.execute(select(GrantRawSnapshotArchive))).scalars().all()
+        assert [(s.grant_id, s.payload) for s in snapshots] == [(grants["closed_old"].id, b"x")]
+        assert (await db_session.execute(select(func.count()).select_from(GrantRawSnapshot))).scalar() == 0
+        tombstones = await db_session.execute(select(GrantTombstone.grant_id))
+        assert set(tombstones.scalars()) == archived_ids
+
+        assert await GrantArchiver(db_session, after_days=90, today=TODAY).run() == {"archived": 0}
+
+    async def test_duplicates_of_archived_grants_are_regrouped(self, db_session):
+        old = _at(TODAY - timedelta(days=200))
+        grants = {}
+        for days, source_id, status in [
+            (0, "canonical", "closed"),
+            (1, "duplicate_1", "open"),
+            (2, "duplicate_2", "open"),
+            (3, "duplicate_closed", "closed"),
+        ]:
+            grants[source_id] = Grant(
+                source="jgrants", source_id=source_id, title=source_id, organization="org",
+                status=status, application_deadline=old.date(), created_at=old + timedelta(days=days),
+            )
+            db_session.add(grants[source_id])
+        await db_session.flush()
+        for source_id in ("duplicate_1", "duplicate_2", "duplicate_closed"):
+            grants[source_id].canonical_id = grants["canonical"].id
+        await db_session.commit()
+
+        assert await GrantArchiver(db_session, after_days=90, today=TODAY).run() == {"archived": 2}
+        result = await db_session.execute(select(Grant.source_id, Grant.canonical_id))
+        assert dict(result.all()) == {"duplicate_1": None, "duplicate_2": grants["duplicate_1"].id}
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import time
+from contextlib import suppress
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text, update
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from config import settings
+from events import GRANTS_CHANGED_CHANNEL, grants_changed_payload
+from models.grant import Grant, ScrapeSource
+from services import grant_cache as grant_cache_module
+from services import grant_service
+from services.grant_cache import LRU, GrantCache
+from services.listener import PgListener
+from services.response_cache import CachedBody, ResponseCache
+from tests.conftest import TEST_DATABASE_URL
+from workers.scraper.base import ListingScraper
+
+
+class TestLRU:
+    def test_evicts_least_recently_used(self):
+        lru = LRU(max_entries=2, ttl=60)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        assert lru.get("a") == 1
+        lru.put("c", 3)
+        assert lru.get("b") is None
+        assert lru.get("a") == 1 and lru.get("c") == 3
+
+    def test_entries_expire(self, monkeypatch):
+        lru = LRU(max_entries=2, ttl=10)
+        lru.put("a", 1)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert lru.get("a") is None
+        assert len(lru) == 0
+
+
+class TestResponseCache:
+    def _cache(self):
+        return ResponseCache(max_entries=10, max_bytes=10_000, min_compress_bytes=1000)
+
+    def test_newer_version_clears_entries(self):
+        cache = self._cache()
+        cache.put("k", CachedBody(5, '"a"', b"{}"))
+        assert cache.get("k", 5) is not None
+        assert cache.get("k", 6) is None
+        cache.put("k", CachedBody(5, '"a"', b"{}"))
+        assert cache.get("k", 6) is None
+
+    def test_older_version_misses_without_clearing(self):
+        cache = self._cache()
+        cache.put("k", CachedBody(5, '"a"', b"{}"))
+        assert cache.get("k", 4) is None
+        assert cache.get("k", 5) is not None
+
+
+class TestGrantCacheInvalidation:
+    def _active(self):
+        cache = GrantCache(max_grants=10, max_listings=10, ttl=60)
+        cache.active = True
+        return cache
+
+    def test_inactive_cache_stores_nothing(self):
+        cache = GrantCache(max_grants=10, max_listings=10, ttl=60)
+        cache.put_version(3, cache.generation)
+        assert cache.get_version() is None
+
+    def test_evicts_named_grants_and_every_listing(self):
+        cache = self._active()
+        kept, changed = Grant(id=uuid4()), Grant(id=uuid4())
+        for grant in (kept, changed):
+            cache.put_grant(grant, cache.generation, 1)
+        cache.put_listing("page-1", {"ids": []}, cache.generation, 1)
+        cache.put_version(1, cache.generation)
+
+        cache.apply(grants_changed_payload([changed.id], 2))
+        assert cache.get_grant(kept.id) is kept
+        assert cache.get_grant(changed.id) is None
+        assert cache.get_listing("page-1") is None
+        assert cache.get_version() is None
+
+        cache.apply(grants_changed_payload(None, 3))
+        assert cache.get_grant(kept.id) is None
+
+    def test_rejects_results_read_before_an_invalidation(self):
+        cache = self._active()
+        generation = cache.generation
+        cache.invalidate([], 5)
+        cache.put_version(5, generation)
+        assert cache.get_version() is None
+
+    def test_rejects_results_older_than_announced_version(self):
+        cache = self._active()
+        cache.invalidate([], 5)
+        cache.put_version(4, cache.generation)
+        assert cache.get_version() is None
+        cache.put_version(5, cache.generation)
+        assert cache.get_version() == 5
+
+    def test_oversized_id_lists_become_full_invalidation(self):
+        payload = json.loads(grants_changed_payload([uuid4() for _ in range(500)], 1))
+        assert payload["ids"] is None
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def _announce(db_session, cache, ids):
+    generation = cache.generation
+    version = (await db_session.execute(select(func.next_grants_version()))).scalar()
+    payload = grants_changed_payload(ids, version)
+    await db_session.execute(select(func.pg_notify(GRANTS_CHANGED_CHANNEL, payload)))
+    await db_session.commit()
+    await _wait_for(lambda: cache.generation != generation)
+
+
+@pytest_asyncio.fixture
+async def followed_cache(monkeypatch):
+    """A grant cache used by every GrantService, following grants_changed on its own listener."""
+    cache = GrantCache(max_grants=100, max_listings=100, ttl=60)
+    listener = PgListener(TEST_DATABASE_URL)
+    monkeypatch.setattr(grant_service, "grant_cache", cache)
+    monkeypatch.setattr(grant_cache_module, "RESUBSCRIBE_DELAY_SEC", 0.05)
+    task = asyncio.create_task(cache.follow(listener))
+    await _wait_for(lambda: cache.active)
+    yield cache
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+    await listener.close()
+
+
+@pytest.mark.asyncio
+class TestGrantCacheEndpoints:
+    async def test_detail_served_from_cache_until_announced(
+        self, client, db_session, seed_grants, followed_cache
+    ):
+        grant_id = seed_grants[0].id
+        resp = await client.get(f"/api/v1/grants/{grant_id}")
+        assert resp.json()["title"] == "研究開発支援事業"
+        assert followed_cache.get_grant(grant_id) is not None
+
+        await db_session.execute(update(Grant).where(Grant.id == grant_id).values(title="改題"))
+        await db_session.commit()
+        resp = await client.get(f"/api/v1/grants/{grant_id}")
+        assert resp.json()["title"] == "研究開発支援事業"
+
+        await _announce(db_session, followed_cache, [grant_id])
+        resp = await client.get(f"/api/v1/grants/{grant_id}")
+        assert resp.json()["title"] == "改題"
+
+    async def test_listing_ids_cached_until_any_change(
+        self, client, db_session, seed_grants, followed_cache
+    ):
+        first = await client.get("/api/v1/grants?limit=100&sort=title")
+        total = first.json()["pagination"]["total"]
+        assert len(followed_cache.listings) == 1
+
+        # A hit on another representation of the same page reuses the id list and grants.
+        fields = await client.get("/api/v1/grants?limit=100&sort=title&fields=title")
+        assert [g["title"] for g in fields.json()["data"]] == [g["title"] for g in first.json()["data"]]
+
+        new = Grant(source="jgrants", source_id="jgrants_cache_1", title="新規", organization="庁", status="open")
+        db_session.add(new)
+        await db_session.commit()
+        resp = await client.get("/api/v1/grants?limit=100&sort=title")
+        assert resp.json()["pagination"]["total"] == total
+
+        await _announce(db_session, followed_cache, [new.id])
+        resp = await client.get("/api/v1/grants?limit=100&sort=title")
+        assert resp.json()["pagination"]["total"] == total + 1
+        assert str(new.id) in [g["id"] for g in resp.json()["data"]]
+
+    async def test_lost_subscription_clears_cache(
+        self, client, db_session, seed_grants, followed_cache
+    ):
+        grant_id = seed_grants[0].id
+        await client.get(f"/api/v1/grants/{grant_id}")
+        await db_session.execute(update(Grant).where(Grant.id == grant_id).values(title="改題"))
+        await db_session.commit()
+
+        generation = followed_cache.generation
+        await db_session.execute(text(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query LIKE 'LISTEN %'"
+        ))
+        await _wait_for(lambda: followed_cache.generation > generation + 1 and followed_cache.active)
+
+        resp = await client.get(f"/api/v1/grants/{grant_id}")
+        assert resp.json()["title"] == "改題"
+
+
+class _FakeScraper(ListingScraper):
+    COMMIT_BATCH_SIZE = 2
+
+    def __init__(self, db, items):
+        super().__init__(db, "JGrants API")
+        self.items = items
+
+    async def fetch(self) -> list:
+        return self.items
+
+    def parse(self, raw_data: list) -> list[dict]:
+        return raw_data
+
+
+@pytest.mark.asyncio
+class TestScraperAnnouncements:
+    async def test_each_batch_commit_announces_its_grants(self, db_session, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "RECOMMEND_INDEX_DIR", str(tmp_path))
+        db_session.add(ScrapeSource(
+            name="JGrants API", type="api", url="https://example.test", schedule_cron="0 6 * * *"
+        ))
+        await db_session.commit()
+        items = [
+            {
+                "source": "jgrants",
+                "source_id": f"jgrants_batch_{i}",
+                "title": f"補助金 {i} 号",
+                "organization": f"機関 {i}",
+                "status": "open",
+            }
+            for i in range(3)
+        ]
+
+        listener = PgListener(TEST_DATABASE_URL)
+        try:
+            async with listener.subscription(GRANTS_CHANGED_CHANNEL) as queue:
+                stats = await _FakeScraper(db_session, items).run()
+                await asyncio.sleep(0.2)
+                events = []
+                while not queue.empty():
+                    events.append(json.loads(queue.get_nowait()))
+        finally:
+            await listener.close()
+
+        assert stats["records_created"] == 3
+        assert [len(e["ids"]) for e in events] == [2, 1]
+        versions = [e["version"] for e in events]
+        assert versions == sorted(versions) and versions[0] > 0
+        rows = await db_session.execute(select(Grant.id).where(Grant.source_id.like("jgrants_batch_%")))
+        assert {str(i) for i in rows.scalars()} == {i for e in events for i in e["ids"]}
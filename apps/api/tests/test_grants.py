@@ -1,5 +1,45 @@
+import asyncio
+import csv
+import io
+import json
+import math
+
 import pytest
 import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from config import settings
+from models.grant import DataVersion, Grant, GrantRawSnapshot
+from payloads import canonical_json, compress_payload, content_hash, decompress_payload
+from workers.scraper.base import ListingScraper
+
+
+class _PassthroughScraper(ListingScraper):
+    async def fetch(self) -> list:
+        return []
+
+    def parse(self, raw_data: list) -> list[dict]:
+        return raw_data
+
+
+async def _store_raw(db_session, grant, payload, version=1):
+    encoded = canonical_json(payload)
+    grant.raw_data_hash = content_hash(encoded)
+    db_session.add(
+        GrantRawSnapshot(
+            grant_id=grant.id,
+            content_hash=grant.raw_data_hash,
+            version=version,
+            payload=compress_payload(encoded),
+        )
+    )
+    await db_session.commit()
 
 
 @pytest.mark.asyncio
@@ -69,6 +109,108 @@ class TestGrantsAPI:
         assert data["pagination"]["total"] == 0
         assert data["data"] == []
 
+    async def test_filter_by_deadline_window(self, client, seed_grants):
+        """Deadline filters should be inclusive on both ends."""
+        resp = await client.get(
+            "/api/v1/grants?deadline_from=2026-05-31&deadline_to=2026-06-30"
+        )
+        assert resp.status_code == 200
+        titles = {g["title"] for g in resp.json()["data"]}
+        assert titles == {"科学技術振興機構 研究助成", "研究開発支援事業"}
+
+    async def test_filter_by_amount_min(self, client, seed_grants):
+        """amount_min should match grants whose range reaches at least that much."""
+        resp = await client.get("/api/v1/grants?amount_min=12000000")
+        assert resp.status_code == 200
+        titles = {g["title"] for g in resp.json()["data"]}
+        assert titles == {"科学技術振興機構 研究助成", "国際共同研究プログラム"}
+
+    async def test_filter_by_amount_overlap(self, client, seed_grants):
+        """An amount window should match any grant range overlapping it."""
+        resp = await client.get("/api/v1/grants?amount_min=4000000&amount_max=6000000")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["pagination"]["total"] == 4
+        assert "設備導入支援補助金" not in {g["title"] for g in data["data"]}
+
+    async def test_filter_by_category(self, client, seed_grants):
+        """Category filter should match exactly."""
+        resp = await client.get("/api/v1/grants?category=research&status=open")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["pagination"]["total"] == 2
+        assert all(g["category"] == "research" for g in data["data"])
+
+    async def test_collapse_duplicates(self, client, db_session, seed_grants):
+        """Grants pointing at a canonical grant should be hidden when collapsing."""
+        seed_grants[2].canonical_id = seed_grants[0].id
+        await db_session.commit()
+
+        resp = await client.get("/api/v1/grants")
+        assert resp.json()["pagination"]["total"] == 5
+
+        resp = await client.get("/api/v1/grants?collapse_duplicates=true")
+        data = resp.json()
+        assert data["pagination"]["total"] == 4
+        assert str(seed_grants[2].id) not in {g["id"] for g in data["data"]}
+
+    async def test_stats_by_source(self, client, seed_grants):
+        """Stats should count grants per group from the rollups."""
+        resp = await client.get("/api/v1/grants/stats?group_by=source")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["group_by"] == "source"
+        assert data["data"] == [
+            {"key": "jgrants", "count": 3, "amount_max_total": 18000000},
+            {"key": "erad", "count": 2, "amount_max_total": 35000000},
+        ]
+
+    async def test_stats_with_filters(self, client, seed_grants):
+        """Listing filters the rollup is keyed by should narrow the counts."""
+        resp = await client.get("/api/v1/grants/stats?group_by=category&status=open")
+        counts = {b["key"]: b["count"] for b in resp.json()["data"]}
+        assert counts == {"research": 2, "equipment": 1}
+
+    async def test_stats_deadline_month(self, client, seed_grants):
+        resp = await client.get("/api/v1/grants/stats?group_by=deadline_month&source=erad")
+        counts = {b["key"]: b["count"] for b in resp.json()["data"]}
+        assert counts == {"2026-05": 1, "2025-12": 1}
+
+    async def test_stats_live_fallback(self, client, seed_grants):
+        """Filters outside the rollup should still be answered, via GROUP BY."""
+        resp = await client.get("/api/v1/grants/stats?group_by=source&keyword=研究")
+        counts = {b["key"]: b["count"] for b in resp.json()["data"]}
+        assert counts == {"jgrants": 1, "erad": 2}
+
+    async def test_stats_follow_writes(self, client, db_session, seed_grants):
+        """Rollups should track inserts, updates and deletes."""
+        seed_grants[0].status = "closed"
+        seed_grants[1].category = "research"
+        await db_session.commit()
+        await db_session.delete(seed_grants[4])
+        await db_session.commit()
+
+        for dimension in ("category", "organization", "source", "deadline_month"):
+            resp = await client.get(f"/api/v1/grants/stats?group_by={dimension}&status=open")
+            rollup = {b["key"]: b["count"] for b in resp.json()["data"]}
+            live_resp = await client.get(
+                f"/api/v1/grants/stats?group_by={dimension}&status=open&amount_min=0"
+            )
+            live = {b["key"]: b["count"] for b in live_resp.json()["data"]}
+            assert rollup == live, dimension
+        assert rollup == {"2026-05": 1}
+
+    async def test_stats_invalid_dimension(self, client):
+        resp = await client.get("/api/v1/grants/stats?group_by=title")
+        assert resp.status_code == 422
+
+    async def test_inverted_ranges_rejected(self, client):
+        """from > to should be rejected rather than silently returning nothing."""
+        resp = await client.get("/api/v1/grants?amount_min=10&amount_max=5")
+        assert resp.status_code == 422
+        resp = await client.get("/api/v1/grants?deadline_from=2026-02-01&deadline_to=2026-01-01")
+        assert resp.status_code == 422
+
     async def test_pagination(self, client, seed_grants):
         """Pagination should work correctly."""
         resp = await client.get("/api/v1/grants?limit=2&page=1")
@@ -90,6 +232,42 @@ class TestGrantsAPI:
         resp3 = await client.get("/api/v1/grants?limit=2&page=3")
         data3 = resp3.json()
         assert len(data3["data"]) == 1
+        assert data3["pagination"]["has_more"] is False
+        assert data["pagination"]["has_more"] is True
+
+    async def test_count_none_reports_has_more_only(self, client, seed_grants):
+        resp = await client.get("/api/v1/grants?limit=2&count=none")
+        assert resp.status_code == 200
+        pagination = resp.json()["pagination"]
+        assert len(resp.json()["data"]) == 2
+        assert pagination["total"] is None and pagination["total_pages"] is None
+        assert pagination["has_more"] is True
+
+        resp = await client.get("/api/v1/grants?limit=2&page=3&count=none")
+        assert len(resp.json()["data"]) == 1
+        assert resp.json()["pagination"]["has_more"] is False
+
+        resp = await client.get("/api/v1/grants?count=approximate")
+        assert resp.status_code == 422
+
+    async def test_count_estimate(self, client, seed_grants, monkeypatch):
+        # Small results are counted exactly.
+        resp = await client.get("/api/v1/grants?keyword=研究&count=estimate")
+        exact = (await client.get("/api/v1/grants?keyword=研究")).json()["pagination"]["total"]
+        assert resp.json()["pagination"]["total"] == exact
+        assert resp.json()["pagination"]["estimated"] is False
+
+        monkeypatch.setattr(settings, "LISTING_EXACT_COUNT_BELOW", 0)
+        resp = await client.get("/api/v1/grants?keyword=研究&count=estimate&limit=1")
+        pagination = resp.json()["pagination"]
+        assert pagination["estimated"] is True
+        assert pagination["total"] >= 1
+        assert pagination["total_pages"] == pagination["total"]
+
+        # Filters the rollups are keyed by are always answered exactly.
+        resp = await client.get("/api/v1/grants?source=erad&count=estimate")
+        assert resp.json()["pagination"]["total"] == 2
+        assert resp.json()["pagination"]["estimated"] is False
 
     async def test_sort_by_deadline_asc(self, client, seed_grants):
         """Sort by deadline ascending should work."""
@@ -143,3 +321,472 @@ class TestGrantsAPI:
         assert "sources" in data["meta"]
         assert data["meta"]["sources"].get("jgrants", 0) == 3
         assert data["meta"]["sources"].get("erad", 0) == 2
+
+    async def test_list_grants_etag(self, client, seed_grants):
+        """Listing should carry a strong ETag and answer If-None-Match with 304."""
+        resp = await client.get("/api/v1/grants?status=open")
+        assert resp.status_code == 200
+        etag = resp.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+
+        resp2 = await client.get(
+            "/api/v1/grants?status=open", headers={"If-None-Match": etag}
+        )
+        assert resp2.status_code == 304
+        assert resp2.content == b""
+
+    async def test_etag_differs_by_query(self, client, seed_grants):
+        """Different query parameters should produce different ETags."""
+        resp1 = await client.get("/api/v1/grants?status=open")
+        resp2 = await client.get("/api/v1/grants?status=closed")
+        assert resp1.headers["etag"] != resp2.headers["etag"]
+
+    async def test_etag_changes_after_write(self, client, db_session, seed_grants):
+        """A write to grants should bump the data version and invalidate the cache."""
+        resp = await client.get("/api/v1/grants")
+        etag = resp.headers["etag"]
+
+        seed_grants[0].title = "更新された研究開発支援事業"
+        await db_session.commit()
+
+        resp2 = await client.get("/api/v1/grants", headers={"If-None-Match": etag})
+        assert resp2.status_code == 200
+        assert resp2.headers["etag"] != etag
+        titles = [g["title"] for g in resp2.json()["data"]]
+        assert "更新された研究開発支援事業" in titles
+
+    async def test_compressed_response(self, client, seed_grants):
+        """Large bodies should be served compressed when the client accepts it."""
+        resp = await client.get("/api/v1/grants", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["etag"].endswith('-gzip"')
+        assert len(resp.json()["data"]) == 5
+
+    async def test_grant_detail_etag(self, client, seed_grants):
+        """Detail responses should also support conditional GET."""
+        grant_id = str(seed_grants[0].id)
+        resp = await client.get(f"/api/v1/grants/{grant_id}")
+        assert resp.status_code == 200
+        resp2 = await client.get(
+            f"/api/v1/grants/{grant_id}",
+            headers={"If-None-Match": resp.headers["etag"]},
+        )
+        assert resp2.status_code == 304
+
+    async def test_list_grants_fields(self, client, seed_grants):
+        """fields= should narrow each item to the requested keys plus id."""
+        resp = await client.get("/api/v1/grants?fields=title,amount_max")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert len(data["data"]) == 5
+        for grant in data["data"]:
+            assert set(grant) == {"id", "title", "amount_max"}
+        assert data["pagination"]["total"] == 5
+
+    async def test_list_grants_unknown_field(self, client, seed_grants):
+        """Unknown fields (including raw_data) should be rejected."""
+        resp = await client.get("/api/v1/grants?fields=title,raw_data")
+        assert resp.status_code == 422
+
+    async def test_list_grants_excludes_raw_data(self, client, db_session, seed_grants):
+        """Listing should not return raw_data; the detail endpoint should."""
+        await _store_raw(db_session, seed_grants[0], {"id": "1", "outline": "詳細"})
+
+        resp = await client.get("/api/v1/grants")
+        for grant in resp.json()["data"]:
+            assert "raw_data" not in grant
+
+        resp2 = await client.get(f"/api/v1/grants/{seed_grants[0].id}")
+        assert resp2.json()["raw_data"] == {"id": "1", "outline": "詳細"}
+
+    async def test_raw_history(self, client, db_session, seed_grants):
+        """Each distinct payload should be kept as a version; the detail shows the latest."""
+        await _store_raw(db_session, seed_grants[0], {"outline": "旧"}, version=1)
+        await _store_raw(db_session, seed_grants[0], {"outline": "新"}, version=2)
+
+        resp = await client.get(f"/api/v1/grants/{seed_grants[0].id}")
+        assert resp.json()["raw_data"] == {"outline": "新"}
+
+        resp = await client.get(f"/api/v1/grants/{seed_grants[0].id}/raw")
+        assert resp.status_code == 200
+        history = resp.json()
+        assert [h["version"] for h in history] == [2, 1]
+        assert history[1]["raw_data"] == {"outline": "旧"}
+
+    async def test_raw_history_reverted_payload_is_newest(self, client, db_session, seed_grants):
+        """A payload that changes back should become the newest version again."""
+        grant = seed_grants[0]
+        scraper = _PassthroughScraper(db_session, "JGrants API")
+        item = {
+            "source": grant.source, "source_id": grant.source_id, "title": grant.title,
+            "organization": grant.organization, "status": grant.status,
+        }
+        for outline in ("A", "B", "A"):
+            await scraper.write([{**item, "raw_data": {"outline": outline}}])
+
+        resp = await client.get(f"/api/v1/grants/{grant.id}/raw")
+        history = [(h["version"], h["raw_data"]["outline"]) for h in resp.json()]
+        assert history == [(3, "A"), (2, "B")]
+
+    async def test_raw_history_not_found(self, client):
+        resp = await client.get("/api/v1/grants/00000000-0000-0000-0000-000000000000/raw")
+        assert resp.status_code == 404
+
+    async def test_batch_lookup_keeps_order(self, client, seed_grants):
+        """Batch lookup should return grants in input order and report misses."""
+        missing_id = "00000000-0000-0000-0000-000000000000"
+        ids = [str(seed_grants[3].id), missing_id, str(seed_grants[0].id)]
+        resp = await client.get(f"/api/v1/grants/batch?ids={','.join(ids)}")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [g["id"] for g in data["data"]] == [ids[0], ids[2]]
+        assert data["missing"] == [missing_id]
+
+    async def test_batch_lookup_fields(self, client, seed_grants):
+        """Batch lookup should honour fields= projections."""
+        ids = ",".join(str(g.id) for g in seed_grants[:2])
+        resp = await client.get(f"/api/v1/grants/batch?ids={ids}&fields=title")
+        assert resp.status_code == 200
+        for grant in resp.json()["data"]:
+            assert set(grant) == {"id", "title"}
+
+    async def test_batch_lookup_post(self, client, seed_grants):
+        """POST /grants/batch should accept ids in the body."""
+        ids = [str(g.id) for g in reversed(seed_grants)]
+        resp = await client.post("/api/v1/grants/batch", json={"ids": ids})
+        assert resp.status_code == 200
+        assert [g["id"] for g in resp.json()["data"]] == ids
+
+    async def test_batch_lookup_post_fields(self, client, seed_grants):
+        """POST /grants/batch should honour fields= projections."""
+        ids = [str(g.id) for g in seed_grants[:2]]
+        resp = await client.post("/api/v1/grants/batch", json={"ids": ids, "fields": ["title"]})
+        assert resp.status_code == 200
+        assert [set(g) for g in resp.json()["data"]] == [{"id", "title"}] * 2
+
+    async def test_batch_lookup_invalid_id(self, client):
+        """Malformed ids should be rejected."""
+        resp = await client.get("/api/v1/grants/batch?ids=not-a-uuid")
+        assert resp.status_code == 422
+
+    async def test_batch_lookup_too_many_ids(self, client):
+        """Requests above the batch limit should be rejected."""
+        from uuid import uuid4
+
+        ids = [str(uuid4()) for _ in range(201)]
+        resp = await client.post("/api/v1/grants/batch", json={"ids": ids})
+        assert resp.status_code == 422
+
+    async def test_export_ndjson(self, client, seed_grants):
+        """NDJSON export should stream one grant per line with listing filters."""
+        resp = await client.get(
+            "/api/v1/grants/export?format=ndjson&source=erad&amount_min=1"
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert len(lines) == 2
+        assert all(g["source"] == "erad" for g in lines)
+        assert "raw_data" not in lines[0]
+
+    async def test_export_csv(self, client, seed_grants):
+        """CSV export should have a header row and one row per grant."""
+        resp = await client.get("/api/v1/grants/export?format=csv")
+        assert resp.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(resp.text)))
+        assert len(rows) == 5
+        assert {r["title"] for r in rows} == {g.title for g in seed_grants}
+
+    async def test_export_invalid_format(self, client):
+        """Unsupported formats should be rejected."""
+        resp = await client.get("/api/v1/grants/export?format=xml")
+        assert resp.status_code == 422
+
+    async def test_changes_full_then_incremental(self, client, db_session, seed_grants):
+        """The change feed should return everything first, then only new changes."""
+        resp = await client.get("/api/v1/grants/changes")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert len(data["data"]) == 5
+        assert data["has_more"] is False
+        token = data["next_token"]
+
+        resp2 = await client.get(f"/api/v1/grants/changes?since={token}")
+        assert resp2.json()["data"] == []
+
+        seed_grants[1].status = "closed"
+        await db_session.commit()
+
+        resp3 = await client.get(f"/api/v1/grants/changes?since={token}")
+        changed = resp3.json()["data"]
+        assert [g["id"] for g in changed] == [str(seed_grants[1].id)]
+        assert changed[0]["status"] == "closed"
+
+    async def test_changes_ignores_sync_touches(self, client, db_session, seed_grants):
+        """Refreshing last_synced_at alone should not appear in the feed."""
+        from sqlalchemy import update, func
+        from models.grant import Grant
+
+        token = (await client.get("/api/v1/grants/changes")).json()["next_token"]
+        await db_session.execute(update(Grant).values(last_synced_at=func.now()))
+        await db_session.commit()
+
+        resp = await client.get(f"/api/v1/grants/changes?since={token}")
+        assert resp.json()["data"] == []
+
+    async def test_changes_tombstones(self, client, db_session, seed_grants):
+        """Deleted grants should be reported as tombstones."""
+        token = (await client.get("/api/v1/grants/changes")).json()["next_token"]
+        removed = seed_grants[4]
+        await db_session.delete(removed)
+        await db_session.commit()
+
+        resp = await client.get(f"/api/v1/grants/changes?since={token}")
+        data = resp.json()
+        assert data["data"] == []
+        assert [t["id"] for t in data["deleted"]] == [str(removed.id)]
+        assert data["deleted"][0]["source_id"] == "jgrants_test_3"
+
+    async def test_changes_pagination(self, client, seed_grants):
+        """Paging with limit should walk the feed without gaps or repeats."""
+        seen = []
+        token = None
+        while True:
+            url = "/api/v1/grants/changes?limit=2"
+            if token:
+                url += f"&since={token}"
+            data = (await client.get(url)).json()
+            seen.extend(g["id"] for g in data["data"])
+            token = data["next_token"]
+            if not data["has_more"]:
+                break
+        assert sorted(seen) == sorted(str(g.id) for g in seed_grants)
+
+    async def test_changes_invalid_token(self, client):
+        """Malformed tokens should be rejected."""
+        resp = await client.get("/api/v1/grants/changes?since=garbage")
+        assert resp.status_code == 422
+
+    async def test_sync_stream_finished_log(self, client, db_session, scrape_log):
+        """A finished sync should yield a single snapshot event and close."""
+        scrape_log.status = "success"
+        scrape_log.records_found = 12
+        await db_session.commit()
+
+        resp = await client.get(f"/api/v1/sync/stream/{scrape_log.id}")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = [
+            json.loads(line[len("data: "):])
+            for line in resp.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        assert len(events) == 1
+        assert events[0]["status"] == "success"
+        assert events[0]["records_found"] == 12
+
+    async def test_sync_stream_relays_notifications(self, client, db_session, scrape_log):
+        """Progress NOTIFYs for the log should be relayed until a terminal status."""
+        import asyncio
+        from uuid import uuid4
+        from sqlalchemy import select, func
+        from events import SCRAPE_PROGRESS_CHANNEL, scrape_progress_payload
+
+        request = asyncio.create_task(client.get(f"/api/v1/sync/stream/{scrape_log.id}"))
+        await asyncio.sleep(0.5)
+
+        for log_id, status, phase in [
+            (uuid4(), "running", "writing"),
+            (scrape_log.id, "running", "writing"),
+            (scrape_log.id, "success", "done"),
+        ]:
+            payload = scrape_progress_payload(log_id, status, phase, records_created=3)
+            await db_session.execute(select(func.pg_notify(SCRAPE_PROGRESS_CHANNEL, payload)))
+            await db_session.commit()
+
+        resp = await asyncio.wait_for(request, timeout=10)
+        events = [
+            json.loads(line[len("data: "):])
+            for line in resp.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        assert [e["status"] for e in events] == ["running", "running", "success"]
+        assert all(e["log_id"] == str(scrape_log.id) for e in events)
+        assert events[1]["phase"] == "writing"
+
+    async def test_sync_all_stream_waits_for_every_source(
+        self, client, db_session, engine, scrape_log, tmp_path, monkeypatch
+    ):
+        """An "all" sync's stream should stay open until e-Rad has finished as well."""
+        from models.grant import ScrapeLog
+        from routers import grants as grants_router
+        import workers.scraper.erad as erad_module
+        import workers.scraper.jgrants as jgrants_module
+
+        monkeypatch.setattr(settings, "RECOMMEND_INDEX_DIR", str(tmp_path))
+        monkeypatch.setattr(
+            grants_router,
+            "async_session",
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        )
+        erad_started, erad_gate = asyncio.Event(), asyncio.Event()
+
+        class _ERad(_PassthroughScraper):
+            async def fetch(self) -> list:
+                erad_started.set()
+                await erad_gate.wait()
+                return []
+
+        monkeypatch.setattr(jgrants_module, "JGrantsScraper", _PassthroughScraper)
+        monkeypatch.setattr(erad_module, "ERadScraper", _ERad)
+
+        request = asyncio.create_task(client.get(f"/api/v1/sync/stream/{scrape_log.id}"))
+        await asyncio.sleep(0.5)
+        sync = asyncio.create_task(grants_router._run_sync("all", scrape_log.id))
+        await asyncio.wait_for(erad_started.wait(), timeout=5)
+        await asyncio.sleep(0.5)
+
+        status = await db_session.scalar(select(ScrapeLog.status).where(ScrapeLog.id == scrape_log.id))
+        assert status == "running"
+        assert not request.done()
+
+        erad_gate.set()
+        await asyncio.wait_for(sync, timeout=10)
+        resp = await asyncio.wait_for(request, timeout=10)
+        events = [
+            json.loads(line[len("data: "):])
+            for line in resp.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        assert events[-1]["status"] == "success"
+        assert all(e["status"] == "running" for e in events[:-1])
+        assert "waiting" in [e["phase"] for e in events]
+
+    async def test_sync_stream_not_found(self, client):
+        """Unknown sync logs should 404."""
+        resp = await client.get("/api/v1/sync/stream/00000000-0000-0000-0000-000000000000")
+        assert resp.status_code == 404
+
+    async def test_sync_logs_filters_by_source_and_since(self, client, db_session, scrape_log):
+        """Sync logs should come back newest first, filtered by source and start time."""
+        from datetime import datetime, timedelta, timezone
+        from models.grant import ScrapeLog, ScrapeSource
+
+        erad = ScrapeSource(
+            name="e-Rad公募一覧", type="scrape", url="https://www.e-rad.go.jp", schedule_cron="0 7 * * *"
+        )
+        db_session.add(erad)
+        await db_session.flush()
+        now = datetime.now(timezone.utc)
+        old = ScrapeLog(source_id=scrape_log.source_id, started_at=now - timedelta(days=400))
+        erad_log = ScrapeLog(source_id=erad.id, started_at=now - timedelta(hours=1))
+        db_session.add_all([old, erad_log])
+        await db_session.commit()
+
+        resp = await client.get("/api/v1/sync/logs")
+        assert resp.status_code == 200
+        assert [log["id"] for log in resp.json()] == [
+            str(scrape_log.id), str(erad_log.id), str(old.id)
+        ]
+
+        resp = await client.get("/api/v1/sync/logs?source=jgrants")
+        assert [log["id"] for log in resp.json()] == [str(scrape_log.id), str(old.id)]
+
+        since = (now - timedelta(days=1)).isoformat()
+        resp = await client.get("/api/v1/sync/logs", params={"source": "jgrants", "since": since})
+        assert [log["id"] for log in resp.json()] == [str(scrape_log.id)]
+
+    async def test_sync_logs_rejects_unknown_source(self, client):
+        resp = await client.get("/api/v1/sync/logs?source=nope")
+        assert resp.status_code == 422
+
+    @pytest.mark.parametrize("query", ["", "?fields=title,amount_max,application_deadline", "?sort=amount&order=desc"])
+    async def test_fast_serialization_matches_default(self, client, seed_grants, monkeypatch, query):
+        """The orjson row path should produce the same bytes as the pydantic path."""
+        from config import settings
+        from services.response_cache import response_cache
+
+        default = await client.get(f"/api/v1/grants{query}")
+        response_cache.clear()
+        monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+        fast = await client.get(f"/api/v1/grants{query}")
+
+        assert fast.status_code == 200
+        assert fast.content == default.content
+        assert fast.headers["etag"] == default.headers["etag"]
+
+    async def test_fast_serialization_export(self, client, seed_grants, monkeypatch):
+        from config import settings
+
+        default = await client.get("/api/v1/grants/export")
+        monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+        fast = await client.get("/api/v1/grants/export")
+        assert fast.content == default.content
+
+
+class TestPayloads:
+    def test_floats_keep_their_stored_encoding(self):
+        """Content hashes of stored payloads depend on the exact float formatting."""
+        payload = {"b": 1e16, "a": 0.1, "c": float("nan"), "d": float("inf"), "e": "補助金"}
+        encoded = canonical_json(payload)
+        assert encoded == '{"a":0.1,"b":1e+16,"c":NaN,"d":Infinity,"e":"補助金"}'.encode()
+
+        decoded = decompress_payload(compress_payload(encoded))
+        assert decoded["b"] == 1e16 and math.isnan(decoded["c"]) and decoded["d"] == math.inf
+        assert canonical_json(decoded) == encoded
+
+
+async def _grants_version(session) -> int:
+    result = await session.execute(select(DataVersion.version).where(DataVersion.name == "grants"))
+    return result.scalar()
+
+
+@pytest.mark.asyncio
+class TestWriteTriggers:
+    async def test_version_bumped_once_per_transaction_at_commit(self, engine, db_session, seed_grants):
+        """Writers should not hold the data_versions row while their transaction runs."""
+        before = await _grants_version(db_session)
+        await db_session.commit()
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as first, session_factory() as second:
+            for grant in seed_grants[:2]:
+                await first.execute(update(Grant).where(Grant.id == grant.id).values(title="改称"))
+            assert await _grants_version(first) == before
+
+            # Would wait on the first transaction if it had bumped per statement.
+            await asyncio.wait_for(
+                second.execute(update(Grant).where(Grant.id == seed_grants[2].id).values(title="改称")),
+                timeout=5,
+            )
+            await asyncio.wait_for(second.commit(), timeout=5)
+            await first.commit()
+            assert await _grants_version(first) == before + 2
+
+    async def test_concurrent_writers_in_one_group_do_not_block(self, client, engine, db_session):
+        """Writers touching the same rollup groups in opposite orders should both commit."""
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        def grant(source_id, organization):
+            return Grant(
+                source="jgrants", source_id=source_id, title=source_id, organization=organization,
+                category="research", amount_max=1000, status="open",
+            )
+
+        async with session_factory() as first, session_factory() as second:
+            for session, source_id, organization in [
+                (first, "a1", "文部科学省"),
+                (second, "b1", "経済産業省"),
+                (first, "a2", "経済産業省"),
+                (second, "b2", "文部科学省"),
+            ]:
+                session.add(grant(source_id, organization))
+                await asyncio.wait_for(session.flush(), timeout=5)
+            await asyncio.wait_for(first.commit(), timeout=5)
+            await asyncio.wait_for(second.commit(), timeout=5)
+
+        resp = await client.get("/api/v1/grants/stats?group_by=organization&category=research")
+        assert resp.json()["data"] == [
+            {"key": "文部科学省", "count": 2, "amount_max_total": 2000},
+            {"key": "経済産業省", "count": 2, "amount_max_total": 2000},
+        ]
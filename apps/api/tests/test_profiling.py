@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from config import settings
+from main import app
+from middleware.profiling import ProfilingMiddleware, disable_query_hooks, enable_query_hooks
+
+
+def _timings(header: str) -> dict[str, str]:
+    entries = {}
+    for entry in header.split(", "):
+        name, _, params = entry.partition(";")
+        entries[name] = params
+    return entries
+
+
+@pytest_asyncio.fixture
+async def profiled_client(client):
+    """The test app (with the ``client`` fixture's overrides) behind the profiling middleware."""
+    enable_query_hooks()
+    transport = ASGITransport(app=ProfilingMiddleware(app))
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+    disable_query_hooks()
+
+
+@pytest.mark.asyncio
+class TestProfiling:
+    async def test_server_timing_reports_queries_and_serialization(self, profiled_client, seed_grants):
+        resp = await profiled_client.get("/api/v1/grants")
+        assert resp.status_code == 200
+
+        timings = _timings(resp.headers["server-timing"])
+        queries = int(timings["db"].split('desc="')[1].split(" ")[0])
+        assert queries >= 2
+        assert sum(1 for name in timings if name.startswith("sql-")) == queries
+        assert "serialize" in timings
+        assert "total" in timings
+
+    async def test_no_header_without_middleware(self, client, seed_grants):
+        resp = await client.get("/api/v1/grants")
+        assert "server-timing" not in resp.headers
+
+    async def test_slow_queries_logged_with_params_and_plan(
+        self, profiled_client, seed_grants, monkeypatch, caplog
+    ):
+        monkeypatch.setattr(settings, "PROFILING_SLOW_QUERY_MS", 0.0)
+        monkeypatch.setattr(settings, "PROFILING_EXPLAIN_SLOW", True)
+        grant = seed_grants[0]
+
+        with caplog.at_level(logging.WARNING, logger="middleware.profiling"):
+            resp = await profiled_client.get(f"/api/v1/grants/{grant.id}")
+        assert resp.status_code == 200
+        assert resp.json()["id"] == str(grant.id)
+
+        slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow query")]
+        detail = next(m for m in slow if "FROM grants" in m)
+        assert f"GET /api/v1/grants/{grant.id}" in detail
+        assert str(grant.id) in detail
+        assert "Execution Time" in detail
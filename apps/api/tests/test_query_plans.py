@@ -0,0 +1,108 @@
+import json
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from models.grant import Grant
+from services.grant_service import SORT_COLUMNS, GrantService
+
+SEED_ROWS = 20000
+
+# (filters, sort, order) combinations that must be served by an ordered index
+# scan: every sort option the listing accepts, in both orders.
+FILTERS = [
+    {},
+    {"status": "open"},
+    {"status": "closing_soon"},
+    {"status": "closed"},
+    {"source": "erad"},
+    {"status": "open", "source": "jgrants"},
+    {"keyword": "研究"},
+    {"status": "open", "keyword": "支援"},
+]
+SORTS = [(sort, order) for sort in SORT_COLUMNS for order in ("asc", "desc")]
+COMBINATIONS = [(f, s, o) for f in FILTERS for s, o in SORTS]
+
+
+def _plan_nodes(plan: dict):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _plan_indexes(plan: dict):
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _plan_indexes(child)
+
+
+async def _explain(db_session, query) -> dict:
+    sql = str(
+        query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    result = await db_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+@pytest_asyncio.fixture
+async def large_dataset(db_session):
+    """Seed a sizable, skewed catalogue and refresh planner statistics."""
+    await db_session.execute(text(f"""
+        INSERT INTO grants (
+            id, source, source_id, title, organization, status,
+            application_deadline, amount_max, created_at
+        )
+        SELECT
+            gen_random_uuid(),
+            CASE WHEN i % 3 = 0 THEN 'erad' ELSE 'jgrants' END,
+            'plan_' || i,
+            '研究開発支援事業 ' || i,
+            '機関 ' || (i % 50),
+            CASE WHEN i % 10 < 6 THEN 'closed' WHEN i % 10 < 9 THEN 'open' ELSE 'closing_soon' END,
+            CASE WHEN i % 20 = 0 THEN NULL ELSE DATE '2026-01-01' + (i % 700) END,
+            CASE WHEN i % 7 = 0 THEN NULL ELSE (i % 1000) * 10000 END,
+            now() - (i || ' minutes')::interval
+        FROM generate_series(1, {SEED_ROWS}) AS i
+    """))
+    await db_session.commit()
+    await db_session.execute(text("ANALYZE grants"))
+
+
+@pytest.mark.asyncio
+class TestListingQueryPlans:
+    @pytest.mark.parametrize("filters,sort,order", COMBINATIONS)
+    async def test_listing_uses_ordered_index_scan(
+        self, db_session, large_dataset, filters, sort, order
+    ):
+        query = GrantService.list_query(
+            select(Grant.id), sort=sort, order=order, **filters
+        ).limit(20)
+        nodes = list(_plan_nodes(await _explain(db_session, query)))
+
+        assert {"Index Scan", "Index Only Scan"} & set(nodes), nodes
+        assert "Sort" not in nodes and "Incremental Sort" not in nodes, nodes
+
+    async def test_amount_range_uses_gist_index(self, db_session, large_dataset):
+        query = GrantService.apply_filters(select(Grant.id), amount_min=9_985_000)
+        indexes = set(_plan_indexes(await _explain(db_session, query)))
+        assert "idx_grants_amount_range" in indexes, indexes
+
+    async def test_deadline_window_uses_index(self, db_session, large_dataset):
+        query = GrantService.apply_filters(
+            select(Grant.id),
+            deadline_from=date(2026, 3, 1),
+            deadline_to=date(2026, 3, 3),
+        )
+        indexes = set(_plan_indexes(await _explain(db_session, query)))
+        assert indexes & {
+            "idx_grants_deadline_id", "idx_grants_deadline_desc_id", "idx_grants_live_deadline_id",
+        }, indexes
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+
+from main import app
+from services.recommender import (
+    RecommendationIndexStore,
+    build_index,
+    get_recommendation_index,
+    rebuild_index,
+)
+
+
+class TestRecommendationIndex:
+    def test_ranks_by_similarity(self, tmp_path):
+        ids = [uuid4() for _ in range(3)]
+        build_index(
+            [
+                (ids[0], "中小企業のものづくり設備投資補助金"),
+                (ids[1], "大学の基礎研究助成"),
+                (ids[2], "ものづくり企業の海外展開支援"),
+            ],
+            str(tmp_path),
+        )
+        index = RecommendationIndexStore(str(tmp_path)).current()
+        assert len(index) == 3
+
+        results = index.top_k("ものづくり 設備投資", 2)
+        assert [grant_id for grant_id, _ in results] == [ids[0], ids[2]]
+        assert 0 < results[1][1] < results[0][1] <= 1.0001
+        assert index.top_k("", 5) == []
+        assert index.top_k("xyz", 5) == []
+
+    def test_store_picks_up_new_builds(self, tmp_path):
+        store = RecommendationIndexStore(str(tmp_path))
+        assert store.current() is None
+
+        first = uuid4()
+        build_index([(first, "研究開発")], str(tmp_path))
+        assert store.current().top_k("研究", 1)[0][0] == first
+
+        second = uuid4()
+        for _ in range(3):
+            build_index([(second, "研究開発")], str(tmp_path))
+        assert store.current().top_k("研究", 1)[0][0] == second
+        assert len([p for p in tmp_path.iterdir() if p.name.startswith("build-")]) == 2
+
+
+@pytest_asyncio.fixture
+async def recommend_store(tmp_path):
+    store = RecommendationIndexStore(str(tmp_path))
+    app.dependency_overrides[get_recommendation_index] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_recommendation_index, None)
+
+
+@pytest.mark.asyncio
+class TestRecommendEndpoint:
+    async def test_returns_live_grants_by_score(self, client, db_session, seed_grants, recommend_store):
+        live = [g for g in seed_grants if g.status in ("open", "closing_soon")]
+        assert await rebuild_index(db_session, recommend_store.directory) == len(live)
+
+        resp = await client.post("/api/v1/grants/recommend", json={"text": "基礎研究の助成金", "limit": 5})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["index_built_at"]
+        scores = [item["score"] for item in body["data"]]
+        assert scores == sorted(scores, reverse=True)
+        target = next(g for g in seed_grants if g.source_id == "erad_test_1")
+        assert body["data"][0]["id"] == str(target.id)
+        assert {item["status"] for item in body["data"]} <= {"open", "closing_soon"}
+
+    async def test_drops_grants_closed_since_build(self, client, db_session, seed_grants, recommend_store):
+        await rebuild_index(db_session, recommend_store.directory)
+        target = next(g for g in seed_grants if g.source_id == "erad_test_1")
+        target.status = "closed"
+        await db_session.commit()
+
+        resp = await client.post("/api/v1/grants/recommend", json={"text": "基礎研究の助成金"})
+        assert resp.status_code == 200
+        assert str(target.id) not in [item["id"] for item in resp.json()["data"]]
+
+    async def test_unavailable_without_index(self, client, recommend_store):
+        resp = await client.post("/api/v1/grants/recommend", json={"text": "研究"})
+        assert resp.status_code == 503
+
+    async def test_validates_request(self, client, recommend_store):
+        resp = await client.post("/api/v1/grants/recommend", json={"text": ""})
+        assert resp.status_code == 422
+        resp = await client.post("/api/v1/grants/recommend", json={"text": "研究", "limit": 500})
+        assert resp.status_code == 422
@@ -0,0 +1,148 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import update
+
+from models.grant import Grant, SavedSearch
+from services.percolator import SearchPercolator, grant_terms, matches, search_terms
+
+
+def _grant(**fields):
+    defaults = dict(
+        title="地域産業 研究開発補助金", source="jgrants", category="research",
+        amount_min=1_000_000, amount_max=5_000_000, application_deadline=date(2026, 6, 30),
+    )
+    return SimpleNamespace(**{**defaults, **fields})
+
+
+def _search(**fields):
+    defaults = dict(
+        keywords=[], sources=[], categories=[], amount_min=None, amount_max=None,
+        deadline_from=None, deadline_to=None,
+    )
+    return SavedSearch(**{**defaults, **fields})
+
+
+class TestPostings:
+    SEARCHES = [
+        _search(keywords=["研究開発"]),
+        _search(keywords=["IT", "研"]),
+        _search(categories=["research", "equipment"], sources=["jgrants"]),
+        _search(deadline_from=date(2026, 5, 1), deadline_to=date(2026, 7, 31)),
+        _search(deadline_from=date(2026, 1, 1)),
+        _search(amount_min=3_000_000),
+        _search(amount_min=10, amount_max=2_000_000),
+        _search(sources=["jgrants"]),
+        _search(),
+    ]
+
+    def test_every_matching_search_is_a_candidate(self):
+        for grant in (_grant(), _grant(amount_min=None), _grant(amount_min=9_000_000, amount_max=100)):
+            keys = grant_terms(grant)
+            for search in self.SEARCHES:
+                assert matches(search, grant)
+                assert search_terms(search) & keys, search_terms(search)
+
+    def test_non_matching_criteria(self):
+        assert not matches(_search(keywords=["設備"]), _grant())
+        assert not matches(_search(sources=["erad"]), _grant())
+        assert not matches(_search(deadline_to=date(2026, 6, 1)), _grant())
+        assert not matches(_search(deadline_from=date(2026, 1, 1)), _grant(application_deadline=None))
+        assert not matches(_search(amount_min=6_000_000), _grant())
+        assert not matches(_search(amount_max=10), _grant(amount_min=None, amount_max=None))
+
+    def test_postings_use_the_most_selective_criterion(self):
+        assert search_terms(_search(keywords=["研究開発"], sources=["jgrants"])) == {"k:研究開"}
+        assert search_terms(_search(deadline_from=date(2026, 11, 5), deadline_to=date(2027, 1, 2))) == {
+            "d:2026-11", "d:2026-12", "d:2027-01",
+        }
+        assert search_terms(_search(amount_min=10_000, amount_max=99_999)) == {"a:4"}
+
+
+async def _grant_row(db_session, source_id, **fields):
+    grant = Grant(
+        source="jgrants", source_id=source_id, organization="経済産業省", status="open", **fields
+    )
+    db_session.add(grant)
+    await db_session.commit()
+    return grant
+
+
+@pytest.mark.asyncio
+class TestSavedSearchAPI:
+    async def test_create_list_delete(self, client):
+        resp = await client.post("/api/v1/searches", json={
+            "owner": "user-1", "name": "研究", "keywords": [" 研究 ", "", "研究"], "sources": ["jgrants"],
+        })
+        assert resp.status_code == 201
+        search = resp.json()
+        assert search["keywords"] == ["研究"]
+
+        resp = await client.get("/api/v1/searches?owner=user-1")
+        assert [s["id"] for s in resp.json()] == [search["id"]]
+        assert (await client.get("/api/v1/searches?owner=user-2")).json() == []
+
+        assert (await client.delete(f"/api/v1/searches/{search['id']}")).status_code == 204
+        assert (await client.delete(f"/api/v1/searches/{search['id']}")).status_code == 404
+        assert (await client.get(f"/api/v1/searches/{search['id']}/matches")).status_code == 404
+
+    async def test_rejects_inverted_ranges(self, client):
+        resp = await client.post("/api/v1/searches", json={
+            "owner": "user-1", "name": "x", "amount_min": 10, "amount_max": 5,
+        })
+        assert resp.status_code == 422
+
+    async def test_changed_grants_are_matched_once(self, client, db_session):
+        existing = await _grant_row(db_session, "jgrants_old", title="既存の研究助成", category="research")
+        created = {}
+        for name, criteria in {
+            "research": {"keywords": ["研究"]},
+            "equipment": {"categories": ["equipment"]},
+            "large": {"amount_min": 50_000_000},
+        }.items():
+            resp = await client.post("/api/v1/searches", json={"owner": "user-1", "name": name, **criteria})
+            created[name] = resp.json()["id"]
+
+        # The first run starts the cursor at the present; existing grants are not alerted on.
+        first = await SearchPercolator(db_session).run()
+        assert first["matched"] == 0
+
+        research = await _grant_row(db_session, "jgrants_new_1", title="新しい研究開発支援", category="research")
+        equipment = await _grant_row(
+            db_session, "jgrants_new_2", title="設備導入補助", category="equipment",
+            amount_min=10_000_000, amount_max=80_000_000,
+        )
+        await db_session.execute(update(Grant).where(Grant.id == existing.id).values(category="equipment"))
+        await db_session.commit()
+
+        stats = await SearchPercolator(db_session, batch_size=2).run()
+        assert stats["evaluated"] == 3
+        assert stats["matched"] == 5
+
+        async def matched(name):
+            resp = await client.get(f"/api/v1/searches/{created[name]}/matches")
+            assert resp.status_code == 200
+            return {m["grant"]["id"] for m in resp.json()}
+
+        assert await matched("research") == {str(research.id), str(existing.id)}
+        assert await matched("equipment") == {str(equipment.id), str(existing.id)}
+        assert await matched("large") == {str(equipment.id)}
+
+        # Nothing changed since: nothing is evaluated again.
+        again = await SearchPercolator(db_session).run()
+        assert again == {"evaluated": 0, "candidates": 0, "matched": 0}
+
+    async def test_closed_and_withdrawn_grants_are_not_matched(self, client, db_session):
+        grant = await _grant_row(db_session, "jgrants_closing", title="研究開発支援", category="research")
+        withdrawn = await _grant_row(db_session, "jgrants_gone", title="研究助成", category="research")
+        await SearchPercolator(db_session).run()
+        resp = await client.post("/api/v1/searches", json={"owner": "user-1", "name": "研究", "keywords": ["研究"]})
+        search_id = resp.json()["id"]
+
+        await db_session.execute(update(Grant).where(Grant.id == grant.id).values(status="closed"))
+        await db_session.execute(update(Grant).where(Grant.id == withdrawn.id).values(status="withdrawn"))
+        await db_session.commit()
+        stats = await SearchPercolator(db_session).run()
+        assert stats == {"evaluated": 0, "candidates": 0, "matched": 0}
+        assert (await client.get(f"/api/v1/searches/{search_id}/matches")).json() == []
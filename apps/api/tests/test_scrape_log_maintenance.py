@@ -0,0 +1,136 @@
+from datetime import date, datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+from models.grant import Grant, GrantRollup, ScrapeLog, ScrapeLogDaily, ScrapeSource
+from workers.scraper.maintenance import RollupCompactor, ScrapeLogMaintenance
+
+TODAY = date(2026, 10, 19)
+
+
+def _at(year, month, day, hour=0):
+    return datetime(year, month, day, hour, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def source(db_session):
+    source = ScrapeSource(
+        name="JGrants API", type="api", url="https://example.test", schedule_cron="0 6 * * *"
+    )
+    db_session.add(source)
+    await db_session.commit()
+    yield source
+    # Partitions outlive the per-test TRUNCATE; leave only the default one.
+    maintenance = ScrapeLogMaintenance(db_session)
+    for name in (await maintenance.partitions()).values():
+        await db_session.execute(text(f"DROP TABLE {name}"))
+    await db_session.commit()
+
+
+async def _partition_of(db_session, log_id):
+    result = await db_session.execute(
+        text("SELECT tableoid::regclass::text FROM scrape_logs WHERE id = :id"), {"id": log_id}
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+class TestScrapeLogMaintenance:
+    async def test_creates_partitions_and_moves_rows_out_of_default(self, db_session, source):
+        log = ScrapeLog(source_id=source.id, started_at=_at(2026, 10, 5))
+        db_session.add(log)
+        await db_session.commit()
+        assert await _partition_of(db_session, log.id) == "scrape_logs_default"
+
+        stats = await ScrapeLogMaintenance(db_session, months_ahead=2, today=TODAY).run()
+
+        assert stats["created"] == ["scrape_logs_p202610", "scrape_logs_p202611", "scrape_logs_p202612"]
+        assert await _partition_of(db_session, log.id) == "scrape_logs_p202610"
+
+        rerun = await ScrapeLogMaintenance(db_session, months_ahead=2, today=TODAY).run()
+        assert rerun["created"] == []
+
+    async def test_retires_expired_months_into_daily_summary(self, db_session, source):
+        # Create the April partition while it is still current.
+        await ScrapeLogMaintenance(db_session, months_ahead=0, today=date(2026, 4, 1)).run()
+        db_session.add_all([
+            ScrapeLog(
+                source_id=source.id, started_at=_at(2026, 3, 30, 1), finished_at=_at(2026, 3, 30, 2),
+                status="success", records_found=10, records_created=4, records_updated=1,
+            ),
+            ScrapeLog(
+                source_id=source.id, started_at=_at(2026, 4, 2, 1), finished_at=_at(2026, 4, 2, 1),
+                status="success", records_found=5, records_created=1, records_updated=2,
+            ),
+            ScrapeLog(source_id=source.id, started_at=_at(2026, 4, 2, 9), status="failed"),
+            ScrapeLog(source_id=source.id, started_at=_at(2026, 5, 1), status="success"),
+        ])
+        await db_session.commit()
+
+        stats = await ScrapeLogMaintenance(db_session, retention_months=5, today=TODAY).run()
+
+        assert stats["dropped"] == ["scrape_logs_p202604"]
+        remaining = (await db_session.execute(select(ScrapeLog.started_at))).scalars().all()
+        assert remaining == [_at(2026, 5, 1)]
+
+        result = await db_session.execute(select(ScrapeLogDaily).order_by(ScrapeLogDaily.day))
+        daily = result.scalars().all()
+        assert [(d.day, d.runs, d.succeeded, d.failed) for d in daily] == [
+            (date(2026, 3, 30), 1, 1, 0),
+            (date(2026, 4, 2), 2, 1, 1),
+        ]
+        assert daily[0].records_found == 10 and daily[0].duration_sec == 3600
+        assert daily[1].records_created == 1 and daily[1].records_updated == 2
+
+
+async def _rollup(db_session, dimension):
+    result = await db_session.execute(
+        select(GrantRollup.key, func.sum(GrantRollup.grant_count), func.sum(GrantRollup.amount_max_sum))
+        .where(GrantRollup.dimension == dimension)
+        .group_by(GrantRollup.key)
+        .having(func.sum(GrantRollup.grant_count) != 0)
+    )
+    return {key: (int(count), int(total)) for key, count, total in result.all()}
+
+
+@pytest.mark.asyncio
+class TestRollupCompactor:
+    async def test_folds_deltas_into_one_row_per_group(self, db_session, seed_grants):
+        seed_grants[0].status = "closed"
+        seed_grants[1].category = "research"
+        await db_session.commit()
+        await db_session.delete(seed_grants[4])
+        await db_session.commit()
+        db_session.add(Grant(
+            source="erad", source_id="erad_test_3", title="追加", organization="JST",
+            category="research", amount_max=1000, status="open",
+        ))
+        await db_session.commit()
+        before = {d: await _rollup(db_session, d) for d in ("category", "source", "deadline_month")}
+
+        stats = await RollupCompactor(db_session).run()
+        assert stats["folded_rows"] > stats["groups"] > 0
+        assert {d: await _rollup(db_session, d) for d in before} == before
+
+        rows = await db_session.execute(
+            select(func.count(), func.count(func.distinct(func.row(
+                GrantRollup.dimension, GrantRollup.key, GrantRollup.source,
+                GrantRollup.status, GrantRollup.category, GrantRollup.canonical,
+            ))))
+            .select_from(GrantRollup)
+            .where(GrantRollup.grant_count != 0)
+        )
+        total, groups = rows.one()
+        assert total == groups
+        empty = await db_session.execute(
+            select(func.count()).select_from(GrantRollup).where(GrantRollup.grant_count == 0)
+        )
+        assert empty.scalar() == 0
+        assert await RollupCompactor(db_session).run() == {"folded_rows": 0, "groups": 0}
@@ -0,0 +1,87 @@
+import sqlite3
+
+import pyarrow.parquet as pq
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+
+from main import app
+from models.grant import Grant
+from services.snapshots import SnapshotStore, export_snapshot, get_snapshot_store
+
+
+@pytest_asyncio.fixture
+async def snapshot_store(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    app.dependency_overrides[get_snapshot_store] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_snapshot_store, None)
+
+
+@pytest.mark.asyncio
+class TestExportSnapshot:
+    async def test_writes_sqlite_and_parquet(self, db_session, seed_grants, snapshot_store):
+        snapshot = await export_snapshot(db_session, snapshot_store.directory, batch_size=2)
+        assert snapshot.grants == len(seed_grants)
+
+        table = pq.read_table(snapshot.file_path("parquet"))
+        assert table.num_rows == len(seed_grants)
+        assert pq.ParquetFile(snapshot.file_path("parquet")).num_row_groups == 3
+        assert str(table.schema.field("application_deadline").type) == "date32[day]"
+        assert sorted(table.column("id").to_pylist()) == sorted(str(g.id) for g in seed_grants)
+
+        db = sqlite3.connect(snapshot.file_path("sqlite"))
+        try:
+            rows = db.execute(
+                "SELECT g.title, g.application_deadline FROM grants_fts "
+                "JOIN grants g ON g.rowid = grants_fts.rowid WHERE grants_fts MATCH ?",
+                ("研究開発",),
+            ).fetchall()
+            assert rows == [("研究開発支援事業", "2026-06-30")]
+            meta = dict(db.execute("SELECT key, value FROM meta"))
+            assert meta["grants"] == str(len(seed_grants))
+        finally:
+            db.close()
+
+    async def test_republishes_only_when_data_changed(self, db_session, seed_grants, snapshot_store):
+        first = await export_snapshot(db_session, snapshot_store.directory)
+        assert await export_snapshot(db_session, snapshot_store.directory) is None
+
+        await db_session.execute(
+            update(Grant).where(Grant.id == seed_grants[0].id).values(title="改称された事業")
+        )
+        await db_session.commit()
+        second = await export_snapshot(db_session, snapshot_store.directory)
+        assert second.version > first.version
+        assert second.etag("sqlite") != first.etag("sqlite")
+        assert snapshot_store.current().path == second.path
+
+
+@pytest.mark.asyncio
+class TestSnapshotEndpoint:
+    async def test_serves_latest_with_etag(self, client, db_session, seed_grants, snapshot_store):
+        resp = await client.get("/api/v1/snapshots/latest")
+        assert resp.status_code == 503
+
+        snapshot = await export_snapshot(db_session, snapshot_store.directory)
+        resp = await client.get("/api/v1/snapshots/latest?format=parquet")
+        assert resp.status_code == 200
+        assert resp.headers["etag"] == snapshot.etag("parquet")
+        assert resp.headers["content-type"] == "application/vnd.apache.parquet"
+        assert resp.headers["x-snapshot-version"] == str(snapshot.version)
+        with open(snapshot.file_path("parquet"), "rb") as f:
+            assert resp.content == f.read()
+
+        resp = await client.get(
+            "/api/v1/snapshots/latest", headers={"If-None-Match": snapshot.etag("sqlite")}
+        )
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+        resp = await client.get(
+            "/api/v1/snapshots/latest", headers={"If-None-Match": snapshot.etag("parquet")}
+        )
+        assert resp.status_code == 200
+        assert resp.content.startswith(b"SQLite format 3")
+
+        assert (await client.get("/api/v1/snapshots/latest?format=csv")).status_code == 422
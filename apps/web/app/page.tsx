@@ -35,14 +35,19 @@ export default function DashboardPage() {
   // Load status counts for stats cards (unfiltered)
   const loadStatusCounts = useCallback(async () => {
     try {
-      const openResult = await fetchGrants({ status: "open", limit: 1 });
+      const openResult = await fetchGrants({
+        status: "open",
+        limit: 1,
+        count: "estimate",
+      });
       const closingSoonResult = await fetchGrants({
         status: "closing_soon",
         limit: 1,
+        count: "estimate",
       });
       setStatusCounts({
-        open: openResult.pagination.total,
-        closing_soon: closingSoonResult.pagination.total,
+        open: openResult.pagination.total ?? 0,
+        closing_soon: closingSoonResult.pagination.total ?? 0,
       });
     } catch (error) {
       console.error("Failed to fetch status counts:", error);
@@ -84,8 +89,8 @@ export default function DashboardPage() {
           {data && (
             <Pagination
               page={data.pagination.page}
-              totalPages={data.pagination.total_pages}
-              total={data.pagination.total}
+              totalPages={data.pagination.total_pages ?? 0}
+              total={data.pagination.total ?? 0}
               limit={data.pagination.limit}
               onPageChange={handlePageChange}
             />
@@ -55,6 +55,7 @@ export function GrantFilters({ filters, onFilterChange }: GrantFiltersProps) {
         <option value="closing_soon">締切間近</option>
         <option value="closed">募集終了</option>
         <option value="upcoming">公募予定</option>
+        <option value="withdrawn">掲載終了</option>
       </select>
       <select
         className="h-10 rounded-md border border-gray-200 bg-white px-3 py-2 text-sm focus:outline-none focus:ring-2 focus:ring-gray-950"
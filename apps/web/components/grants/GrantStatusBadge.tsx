@@ -22,6 +22,10 @@ const STATUS_CONFIG: Record<
     label: "公募予定",
     className: "bg-blue-100 text-blue-800 border-blue-200",
   },
+  withdrawn: {
+    label: "掲載終了",
+    className: "bg-gray-100 text-gray-500 border-gray-200 line-through",
+  },
 };
 
 export function GrantStatusBadge({ status }: { status: string }) {
@@ -2,7 +2,7 @@
 
 import { useState } from "react";
 import { Button } from "@/components/ui/button";
-import { triggerSync } from "@/lib/api";
+import { syncStreamUrl, triggerSync } from "@/lib/api";
 import { RefreshCw } from "lucide-react";
 
 interface SyncButtonProps {
@@ -12,15 +12,30 @@ interface SyncButtonProps {
 export function SyncButton({ onSyncComplete }: SyncButtonProps) {
   const [syncing, setSyncing] = useState(false);
 
+  const [written, setWritten] = useState(0);
+
   const handleSync = async () => {
     setSyncing(true);
+    setWritten(0);
     try {
-      await triggerSync("all");
-      // Wait a bit for background sync to start processing
-      setTimeout(() => {
+      const { scrape_log_id } = await triggerSync("all");
+      // Live progress pushed by the API until the sync finishes
+      const source = new EventSource(syncStreamUrl(scrape_log_id));
+      const finish = () => {
+        source.close();
         onSyncComplete?.();
         setSyncing(false);
-      }, 3000);
+      };
+      source.addEventListener("progress", (e) => {
+        const event = JSON.parse((e as MessageEvent).data);
+        setWritten(event.records_written ?? 0);
+        if (event.status === "success" || event.status === "failed") {
+          finish();
+        }
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) finish();
+      };
     } catch (error) {
       console.error("Sync failed:", error);
       setSyncing(false);
@@ -35,7 +50,7 @@ export function SyncButton({ onSyncComplete }: SyncButtonProps) {
       disabled={syncing}
     >
       <RefreshCw className={`h-4 w-4 mr-2 ${syncing ? "animate-spin" : ""}`} />
-      {syncing ? "同期中..." : "データ同期"}
+      {syncing ? `同期中... (${written}件)` : "データ同期"}
     </Button>
   );
 }
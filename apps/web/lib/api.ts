@@ -1,4 +1,9 @@
-import { GrantFilters, GrantListResponse, GrantDetail } from "./types";
+import {
+  GrantFilters,
+  GrantListResponse,
+  GrantDetail,
+  GrantBatchResponse,
+} from "./types";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -22,6 +27,18 @@ export async function fetchGrantDetail(id: string): Promise<GrantDetail> {
   return res.json();
 }
 
+export async function fetchGrantsBatch(
+  ids: string[]
+): Promise<GrantBatchResponse> {
+  const res = await fetch(`${API_BASE}/api/v1/grants/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ ids }),
+  });
+  if (!res.ok) throw new Error(`API error: ${res.status}`);
+  return res.json();
+}
+
 export async function triggerSync(
   source: string
 ): Promise<{ scrape_log_id: string; message: string }> {
@@ -33,3 +50,7 @@ export async function triggerSync(
   if (!res.ok) throw new Error(`API error: ${res.status}`);
   return res.json();
 }
+
+export function syncStreamUrl(logId: string): string {
+  return `${API_BASE}/api/v1/sync/stream/${logId}`;
+}
@@ -12,7 +12,8 @@ export interface Grant {
   application_deadline: string | null;
   detail_url: string | null;
   guideline_url: string | null;
-  status: "open" | "closing_soon" | "closed" | "upcoming";
+  status: "open" | "closing_soon" | "closed" | "upcoming" | "withdrawn";
+  canonical_id: string | null;
   last_synced_at: string;
 }
 
@@ -25,10 +26,13 @@ export interface GrantDetail extends Grant {
 export interface GrantListResponse {
   data: Grant[];
   pagination: {
-    total: number;
+    // null with count=none; the planner's estimate when `estimated`
+    total: number | null;
     page: number;
     limit: number;
-    total_pages: number;
+    total_pages: number | null;
+    has_more: boolean;
+    estimated: boolean;
   };
   meta: {
     sources: Record<string, number>;
@@ -36,12 +40,24 @@ export interface GrantListResponse {
   };
 }
 
+export interface GrantBatchResponse {
+  data: Grant[];
+  missing: string[];
+}
+
 export interface GrantFilters {
   status?: string;
   source?: string;
   keyword?: string;
+  deadline_from?: string;
+  deadline_to?: string;
+  amount_min?: number;
+  amount_max?: number;
+  category?: string;
+  collapse_duplicates?: boolean;
   sort?: string;
   order?: string;
   page?: number;
   limit?: number;
+  count?: "exact" | "estimate" | "none";
 }
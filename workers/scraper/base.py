@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 import logging
+import sqlite3
+import time
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, text
@@ -14,7 +17,19 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "apps", "api"))
 sys.path.insert(0, "/app")
 
-from models.grant import Grant, ScrapeSource, ScrapeLog
+from models.grant import LIVE_STATUSES, Grant, GrantRawSnapshot, ScrapeSource, ScrapeLog
+from payloads import canonical_json, compress_payload, content_hash
+from events import (
+    GRANTS_CHANGED_CHANNEL,
+    SCRAPE_PROGRESS_CHANNEL,
+    grants_changed_payload,
+    scrape_progress_payload,
+)
+from config import settings
+from services.percolator import SearchPercolator
+from services.recommender import rebuild_index
+from services.snapshots import export_snapshot
+from workers.scraper.dedup import Deduplicator
 
 logger = logging.getLogger(__name__)
 
@@ -22,28 +37,74 @@ logger = logging.getLogger(__name__)
 class BaseScraper(ABC):
     """Base class for all scrapers."""
 
-    def __init__(self, db: AsyncSession, source_name: str):
+    # Minimum seconds between progress events while a sync is running
+    PROGRESS_INTERVAL_SEC = 2.0
+    # Upserts per transaction; each commit announces its grant ids on grants_changed
+    COMMIT_BATCH_SIZE = 100
+    # Grant.source of the records this scraper writes; grants of this source
+    # that a complete sync did not see are withdrawn. None skips reconciliation.
+    SOURCE: Optional[str] = None
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        source_name: str,
+        log_id: Optional[UUID] = None,
+        resume: bool = False,
+        hold_log: bool = False,
+    ):
         self.db = db
         self.source_name = source_name
+        self.log_id = log_id
+        # Continue the interrupted or failed sync ``log_id`` instead of starting one
+        self.resume = resume
+        # Leave the log running when done, for the caller to finish with release_log()
+        self.hold_log = hold_log
+        self._outcome: Optional[tuple[str, Optional[str]]] = None
+        self.log: Optional[ScrapeLog] = None
         self.stats = {
             "records_found": 0,
             "records_created": 0,
             "records_updated": 0,
+            "pages_fetched": 0,
+            "records_withdrawn": 0,
         }
+        # Whether collect() saw the whole upstream listing, so absence means removal
+        self.crawl_complete = False
+        self._last_progress = 0.0
+        # Grants written since the last commit
+        self._pending_ids: list[UUID] = []
 
     async def run(self) -> dict:
-        """Main execution flow: fetch -> parse -> upsert -> log."""
+        """Main execution flow: collect (fetch -> parse -> upsert) -> reconcile -> dedup -> percolate -> index -> log."""
         log = await self._create_log()
+        self.log = log
+        if self.resume:
+            await self._reopen_log(log)
         try:
             # Update expired statuses before syncing
             await self._update_expired_statuses()
 
-            raw_items = await self.fetch()
-            parsed_items = self.parse(raw_items)
-            self.stats["records_found"] = len(parsed_items)
+            await self.report_progress("fetching", force=True)
+            await self.collect()
+
+            await self.report_progress("reconciling", force=True)
+            await self._reconcile()
+
+            await self.report_progress("deduplicating", force=True)
+            dedup_stats = await Deduplicator(self.db).run()
+            if dedup_stats["regrouped"]:
+                await self._notify_grants_changed(None)
+                await self.db.commit()
+
+            await self.report_progress("matching", force=True)
+            await SearchPercolator(self.db).run()
+
+            await self.report_progress("indexing", force=True)
+            await self._rebuild_recommendations()
 
-            for item in parsed_items:
-                await self.upsert(item)
+            await self.report_progress("exporting", force=True)
+            await self._export_snapshot()
 
             await self._complete_log(log, "success")
             logger.info(f"[{self.source_name}] Completed: {self.stats}")
@@ -54,24 +115,46 @@ class BaseScraper(ABC):
         return self.stats
 
     @abstractmethod
-    async def fetch(self) -> list:
-        """Fetch raw data from the source."""
+    async def collect(self):
+        """Fetch, parse and write every record of this sync.
+
+        Sets ``crawl_complete`` once the whole upstream listing was seen.
+        """
         ...
 
+    async def write(self, parsed_items: list[dict]):
+        """Upsert parsed records, committing every ``COMMIT_BATCH_SIZE``."""
+        for item in parsed_items:
+            await self.upsert(item)
+            if len(self._pending_ids) >= self.COMMIT_BATCH_SIZE:
+                await self._commit_batch()
+                await self.report_progress("writing")
+        await self._commit_batch()
+
     @abstractmethod
     def parse(self, raw_data: list) -> list[dict]:
         """Parse raw data into grant dicts."""
         ...
 
     async def upsert(self, item: dict):
-        """Insert or update a grant record based on source_id."""
-        # Check if record exists to track created vs updated
+        """Insert or update a grant record based on source_id.
+
+        The raw payload is kept out of the row: the grant stores its hash, and
+        a compressed snapshot is written only when that hash changes. The
+        write is committed with its batch by ``_commit_batch``.
+        """
+        item = dict(item)
+        raw = item.pop("raw_data", None)
+        encoded = canonical_json(raw) if raw is not None else None
+        raw_hash = content_hash(encoded) if encoded is not None else None
+
+        # The stored hash decides whether the payload needs a new snapshot
         existing = await self.db.execute(
-            select(Grant.id).where(Grant.source_id == item.get("source_id"))
+            select(Grant.id, Grant.raw_data_hash).where(Grant.source_id == item.get("source_id"))
         )
-        exists = existing.scalar_one_or_none()
+        current = existing.one_or_none()
 
-        stmt = pg_insert(Grant).values(**item)
+        stmt = pg_insert(Grant).values(**item, raw_data_hash=raw_hash)
         stmt = stmt.on_conflict_do_update(
             index_elements=["source_id"],
             set_={
@@ -86,31 +169,176 @@ class BaseScraper(ABC):
                 "application_deadline": stmt.excluded.application_deadline,
                 "detail_url": stmt.excluded.detail_url,
                 "status": stmt.excluded.status,
-                "raw_data": stmt.excluded.raw_data,
+                "raw_data_hash": stmt.excluded.raw_data_hash,
                 "last_synced_at": func.now(),
                 "updated_at": func.now(),
             },
+        # xmax is 0 only on a freshly inserted row: created vs updated without
+        # racing a concurrent writer of the same source_id.
+        ).returning(Grant.id, text("xmax = 0"))
+        grant_id, inserted = (await self.db.execute(stmt)).one()
+
+        if raw_hash and (current is None or current.raw_data_hash != raw_hash):
+            await self._store_raw_snapshot(grant_id, raw_hash, compress_payload(encoded))
+        self._pending_ids.append(grant_id)
+
+        if inserted:
+            self.stats["records_created"] += 1
+        else:
+            self.stats["records_updated"] += 1
+
+    async def _commit_batch(self):
+        """Commit pending upserts together with their grants_changed notification."""
+        if not self._pending_ids:
+            return
+        await self._notify_grants_changed(self._pending_ids)
+        await self.db.commit()
+        self._pending_ids = []
+
+    async def _notify_grants_changed(self, ids: Optional[list[UUID]]):
+        # Delivered on commit, so API caches evict exactly when the data changes.
+        # Takes this transaction's version now rather than at commit; call it last.
+        result = await self.db.execute(select(func.next_grants_version()))
+        payload = grants_changed_payload(ids, result.scalar())
+        await self.db.execute(select(func.pg_notify(GRANTS_CHANGED_CHANNEL, payload)))
+
+    async def _store_raw_snapshot(self, grant_id: UUID, raw_hash: str, payload: bytes):
+        """Append a payload version.
+
+        Content seen before for this grant is not stored again; its snapshot
+        takes the next version instead, so a payload that reverts (A, B, A)
+        is the newest in the history again.
+        """
+        next_version = (
+            select(func.coalesce(func.max(GrantRawSnapshot.version), 0) + 1)
+            .where(GrantRawSnapshot.grant_id == grant_id)
+            .scalar_subquery()
+        )
+        stmt = pg_insert(GrantRawSnapshot).values(
+            grant_id=grant_id, content_hash=raw_hash, version=next_version, payload=payload
         )
-        await self.db.execute(stmt)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["grant_id", "content_hash"],
+                set_={"version": stmt.excluded.version, "created_at": func.now()},
+            )
+        )
+
+    async def report_progress(self, phase: str, force: bool = False):
+        """Persist counters on the ScrapeLog and NOTIFY listeners, at most every interval."""
+        if not self.log:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.PROGRESS_INTERVAL_SEC:
+            return
+        self._last_progress = now
+
+        self.log.records_found = self.stats["records_found"]
+        self.log.records_created = self.stats["records_created"]
+        self.log.records_updated = self.stats["records_updated"]
+        await self._notify_progress(self.log.status, phase)
         await self.db.commit()
 
-        if exists:
-            self.stats["records_updated"] += 1
-        else:
-            self.stats["records_created"] += 1
+    async def _notify_progress(self, status: str, phase: Optional[str]):
+        # Delivered on commit, so listeners never see counters ahead of the data.
+        payload = scrape_progress_payload(
+            self.log.id,
+            status,
+            phase,
+            pages_fetched=self.stats["pages_fetched"],
+            records_found=self.stats["records_found"],
+            records_created=self.stats["records_created"],
+            records_updated=self.stats["records_updated"],
+            records_written=self.stats["records_created"] + self.stats["records_updated"],
+        )
+        await self.db.execute(
+            select(func.pg_notify(SCRAPE_PROGRESS_CHANNEL, payload))
+        )
 
     async def _update_expired_statuses(self):
-        """Update status to 'closed' for grants past their deadline."""
-        await self.db.execute(
+        """Update status to 'closed' for grants past their deadline.
+
+        Withdrawn grants keep their status: the archiver dates them by
+        ``updated_at``, which closing them would reset.
+        """
+        result = await self.db.execute(
             update(Grant)
             .where(Grant.application_deadline < func.current_date())
-            .where(Grant.status != "closed")
+            .where(Grant.status.notin_(("closed", "withdrawn")))
             .values(status="closed", updated_at=func.now())
+            .returning(Grant.id)
+        )
+        closed = list(result.scalars().all())
+        if closed:
+            await self._notify_grants_changed(closed)
+        await self.db.commit()
+
+    async def _reconcile(self):
+        """Withdraw live grants of this source that the sync did not see.
+
+        Every upsert stamps ``last_synced_at``, so the grants a complete
+        crawl saw are exactly those stamped since the sync started; the rest
+        are gone upstream. Skipped after an incomplete crawl, and when the
+        unseen share of live grants exceeds ``RECONCILE_MAX_WITHDRAWN_FRACTION``
+        (a broken crawl is likelier than the upstream emptying).
+        """
+        if self.SOURCE is None or self.log is None:
+            return
+        if not self.crawl_complete or not self.stats["records_found"]:
+            logger.warning(f"[{self.source_name}] Crawl incomplete, not reconciling")
+            return
+        live = (Grant.source == self.SOURCE) & Grant.status.in_(LIVE_STATUSES)
+        unseen = Grant.last_synced_at < self.log.started_at
+        result = await self.db.execute(
+            select(func.count(), func.count().filter(unseen)).where(live)
+        )
+        total, missing = result.one()
+        if missing > total * settings.RECONCILE_MAX_WITHDRAWN_FRACTION:
+            logger.warning(
+                f"[{self.source_name}] {missing} of {total} live grants unseen, not withdrawing them"
+            )
+            await self.db.commit()
+            return
+        result = await self.db.execute(
+            update(Grant)
+            .where(live, unseen)
+            .values(status="withdrawn", updated_at=func.now())
+            .returning(Grant.id)
         )
+        withdrawn = list(result.scalars().all())
+        if withdrawn:
+            await self._notify_grants_changed(withdrawn)
+            logger.info(f"[{self.source_name}] Withdrew {len(withdrawn)} grants no longer listed upstream")
         await self.db.commit()
+        self.stats["records_withdrawn"] = len(withdrawn)
+
+    async def _rebuild_recommendations(self):
+        """Republish the recommendation index; a failure here must not fail the sync."""
+        try:
+            await rebuild_index(self.db, settings.RECOMMEND_INDEX_DIR)
+        except OSError as e:
+            logger.warning(f"[{self.source_name}] Recommendation index not rebuilt: {e}")
+
+    async def _export_snapshot(self):
+        """Republish the catalogue snapshots, if enabled; a failure here must not fail the sync."""
+        if not settings.SNAPSHOTS_ENABLED:
+            return
+        try:
+            await export_snapshot(self.db, settings.SNAPSHOT_DIR)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"[{self.source_name}] Snapshot not exported: {e}")
 
     async def _create_log(self) -> ScrapeLog:
-        """Create a scrape log entry."""
+        """Create a scrape log entry, or adopt the one the API created for this sync."""
+        if self.log_id:
+            existing = await self.db.execute(select(ScrapeLog).where(ScrapeLog.id == self.log_id))
+            log = existing.scalar_one_or_none()
+            if log:
+                return log
+            if self.resume:
+                raise ValueError(f"Scrape log {self.log_id} not found, nothing to resume")
+            logger.warning(f"Scrape log {self.log_id} not found, creating a new one")
+
         source = await self.db.execute(
             select(ScrapeSource).where(ScrapeSource.name == self.source_name)
         )
@@ -125,14 +353,57 @@ class BaseScraper(ABC):
         await self.db.refresh(log)
         return log
 
+    async def _reopen_log(self, log: ScrapeLog):
+        """Mark a resumed sync as running again."""
+        log.status = "running"
+        log.finished_at = None
+        log.error_message = None
+        await self._notify_progress("running", "resuming")
+        await self.db.commit()
+
     async def _complete_log(self, log: ScrapeLog, status: str, error: str = None):
-        """Update the scrape log with final status."""
+        """Update the scrape log with final status.
+
+        A held log only gets its counters: it stays running, and progress
+        streams stay open, until ``release_log`` (a sync of several sources
+        reporting on one log).
+        """
         if not log:
             return
-        log.finished_at = datetime.utcnow()
-        log.status = status
         log.records_found = self.stats["records_found"]
         log.records_created = self.stats["records_created"]
         log.records_updated = self.stats["records_updated"]
+        if self.hold_log:
+            self._outcome = (status, error)
+            await self._notify_progress(log.status, "waiting")
+            await self.db.commit()
+            return
+        log.finished_at = datetime.utcnow()
+        log.status = status
         log.error_message = error
+        await self._notify_progress(status, "done")
         await self.db.commit()
+
+    async def release_log(self):
+        """Finish a held log with the outcome this scraper's run had."""
+        if self._outcome is None:
+            return
+        self.hold_log = False
+        await self._complete_log(self.log, *self._outcome)
+
+
+class ListingScraper(BaseScraper):
+    """A scraper that fetches the whole upstream listing in one go."""
+
+    async def collect(self):
+        raw_items = await self.fetch()
+        parsed_items = self.parse(raw_items)
+        self.stats["records_found"] = len(parsed_items)
+        await self.report_progress("writing", force=True)
+        await self.write(parsed_items)
+        self.crawl_complete = True
+
+    @abstractmethod
+    async def fetch(self) -> list:
+        """Fetch raw data from the source."""
+        ...
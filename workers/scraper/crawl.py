@@ -0,0 +1,424 @@
+"""Crawls split into leased work units that any number of workers share.
+
+A ``PartitionedScraper`` describes its crawl as units (for JGrants, one
+search page per keyword and offset). The process that starts a sync plans
+the first units into ``crawl_units`` and works through them like any other
+worker; ``python -m workers.scraper.run --crawl-worker`` starts more workers
+that claim units of whichever sync is running. A claim takes a time-limited
+lease with ``FOR UPDATE SKIP LOCKED``, so workers never wait on each other
+and a crashed worker's unit is simply claimed again once its lease expires.
+Finishing a unit records its counters and may enqueue follow-up units (the
+remaining pages); the sync's ScrapeLog is the sum over its units, except
+that created and updated grants are counted once each, however many units
+wrote them.
+
+The units are also the sync's checkpoint: every page written is a ``done``
+unit, so ``python -m workers.scraper.run --resume <log_id>`` picks an
+interrupted or failed sync up again, fetching only the pages it had not
+finished.
+
+Every upstream request, from any worker, first takes a token from the
+upstream's bucket in ``rate_budgets``, so adding workers speeds a sync up
+only until the configured upstream rate is reached. A worker waiting for a
+token keeps renewing its unit's lease, so a long throttle pause does not
+hand the unit to another worker.
+"""
+from abc import abstractmethod
+from datetime import timedelta
+from typing import Optional
+from uuid import UUID, uuid4
+import asyncio
+import logging
+import os
+import socket
+
+import httpx
+from sqlalchemy import and_, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config import settings
+from models.grant import CrawlUnit, Grant
+from workers.scraper.base import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks on units other workers are still processing
+POLL_INTERVAL_SEC = 1.0
+
+COUNTERS = ("pages_fetched", "records_found", "records_created", "records_updated")
+
+# Refill the bucket for the time since the last take, capped at the burst size.
+REFILL_SQL = text("""
+    INSERT INTO rate_budgets (name, tokens, updated_at)
+    VALUES (:name, :burst, clock_timestamp())
+    ON CONFLICT (name) DO UPDATE
+    SET tokens = LEAST(
+            :burst,
+            rate_budgets.tokens
+            + EXTRACT(EPOCH FROM clock_timestamp() - rate_budgets.updated_at) * :rate
+        ),
+        updated_at = clock_timestamp()
+    RETURNING tokens
+""")
+
+
+class RetryUnit(Exception):
+    """Hand the unit back without counting an attempt, e.g. when the upstream throttles."""
+
+
+def worker_name() -> str:
+    """Lease holder name: host and pid, plus a suffix telling apart queues within a process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+
+
+async def try_take_token(engine: AsyncEngine, name: str, rate: float, burst: float) -> float:
+    """Take one token from ``name``'s bucket; 0 when granted, else seconds until one is due.
+
+    Runs in its own short transaction so the bucket row is locked only for
+    the take itself, never across a worker's writes.
+    """
+    async with engine.begin() as conn:
+        tokens = (await conn.execute(REFILL_SQL, {"name": name, "rate": rate, "burst": burst})).scalar()
+        if tokens >= 1:
+            await conn.execute(
+                text("UPDATE rate_budgets SET tokens = tokens - 1 WHERE name = :name"), {"name": name}
+            )
+            return 0.0
+    return (1 - tokens) / rate
+
+
+async def pause_budget(engine: AsyncEngine, name: str, rate: float, seconds: float):
+    """Hold every worker back from ``name`` for ``seconds`` (after the upstream throttled us)."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                UPDATE rate_budgets
+                SET tokens = LEAST(tokens, :tokens), updated_at = clock_timestamp()
+                WHERE name = :name
+            """),
+            {"name": name, "tokens": 1 - rate * seconds},
+        )
+
+
+class CrawlQueue:
+    """Plan, claim and settle the crawl units of syncs."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        worker: Optional[str] = None,
+        lease_sec: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.db = db
+        self.worker = worker or worker_name()
+        self.lease = timedelta(seconds=lease_sec or settings.CRAWL_LEASE_SEC)
+        self.max_attempts = max_attempts or settings.CRAWL_MAX_ATTEMPTS
+
+    async def enqueue(self, scrape_log_id: UUID, source: str, units: list[dict]):
+        """Add units to a sync; units it already has are left alone."""
+        await self._insert(scrape_log_id, source, units)
+        await self.db.commit()
+
+    async def _insert(self, scrape_log_id: UUID, source: str, units: list[dict]):
+        if units:
+            await self.db.execute(
+                pg_insert(CrawlUnit)
+                .values([{"scrape_log_id": scrape_log_id, "source": source, "params": p} for p in units])
+                .on_conflict_do_nothing(index_elements=["scrape_log_id", "source", "params"])
+            )
+
+    async def claim(self, scrape_log_id: Optional[UUID] = None) -> Optional[CrawlUnit]:
+        """Lease the oldest claimable unit, of one sync or of any."""
+        candidate = (
+            select(CrawlUnit.id)
+            .where(
+                or_(
+                    CrawlUnit.status == "pending",
+                    and_(CrawlUnit.status == "leased", CrawlUnit.lease_expires_at < func.now()),
+                ),
+                CrawlUnit.attempts < self.max_attempts,
+            )
+            .order_by(CrawlUnit.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if scrape_log_id is not None:
+            candidate = candidate.where(CrawlUnit.scrape_log_id == scrape_log_id)
+        stmt = (
+            update(CrawlUnit)
+            .where(CrawlUnit.id == candidate.scalar_subquery())
+            .values(
+                status="leased",
+                leased_by=self.worker,
+                lease_expires_at=func.now() + self.lease,
+                attempts=CrawlUnit.attempts + 1,
+            )
+            .returning(CrawlUnit)
+        )
+        result = await self.db.execute(
+            select(CrawlUnit).from_statement(stmt).execution_options(populate_existing=True)
+        )
+        unit = result.scalar_one_or_none()
+        await self.db.commit()
+        if unit is not None:
+            # Detached: rolling back a failed unit's writes must not expire it.
+            self.db.expunge(unit)
+        return unit
+
+    async def complete(self, unit: CrawlUnit, counters: dict, follow_ups: list[dict]) -> bool:
+        """Record a finished unit and plan its follow-ups; False if the lease was lost meanwhile."""
+        result = await self.db.execute(
+            self._settle(unit).values(
+                status="done", finished_at=func.now(), lease_expires_at=None, **counters
+            )
+        )
+        if not result.rowcount:
+            await self.db.rollback()
+            logger.warning(f"[crawl] Lease on unit {unit.id} expired before it finished")
+            return False
+        # Same transaction: a unit is never done without its follow-ups planned.
+        await self._insert(unit.scrape_log_id, unit.source, follow_ups)
+        await self.db.commit()
+        return True
+
+    async def renew(self, unit: CrawlUnit, extra_sec: float = 0.0) -> bool:
+        """Extend a held lease to a full term from now plus ``extra_sec``; False if it was lost."""
+        result = await self.db.execute(
+            self._settle(unit).values(
+                lease_expires_at=func.now() + self.lease + timedelta(seconds=extra_sec)
+            )
+        )
+        await self.db.commit()
+        return bool(result.rowcount)
+
+    async def release(self, unit: CrawlUnit):
+        """Put a unit back for any worker, without spending an attempt."""
+        await self.db.execute(
+            self._settle(unit).values(
+                status="pending", leased_by=None, lease_expires_at=None,
+                attempts=CrawlUnit.attempts - 1,
+            )
+        )
+        await self.db.commit()
+
+    async def fail(self, unit: CrawlUnit, error: str):
+        """Give a failed attempt back, or fail the unit for good once out of attempts."""
+        final = unit.attempts >= self.max_attempts
+        await self.db.execute(
+            self._settle(unit).values(
+                status="failed" if final else "pending",
+                leased_by=None,
+                lease_expires_at=None,
+                error_message=error,
+                finished_at=func.now() if final else None,
+            )
+        )
+        await self.db.commit()
+
+    async def reopen(self, scrape_log_id: UUID) -> int:
+        """Give a resumed sync's failed and abandoned units a fresh set of attempts.
+
+        Finished units stay done, so the sync continues from the pages it had
+        not fetched yet. Units still under a live lease are left to their holder.
+        """
+        result = await self.db.execute(
+            update(CrawlUnit)
+            .where(
+                CrawlUnit.scrape_log_id == scrape_log_id,
+                or_(
+                    CrawlUnit.status == "failed",
+                    and_(CrawlUnit.status == "leased", CrawlUnit.lease_expires_at < func.now()),
+                ),
+            )
+            .values(
+                status="pending", attempts=0, leased_by=None, lease_expires_at=None,
+                error_message=None, finished_at=None,
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def expire(self, scrape_log_id: UUID) -> int:
+        """Fail units whose last allowed lease ran out (their worker died on every attempt)."""
+        result = await self.db.execute(
+            update(CrawlUnit)
+            .where(
+                CrawlUnit.scrape_log_id == scrape_log_id,
+                CrawlUnit.status == "leased",
+                CrawlUnit.lease_expires_at < func.now(),
+                CrawlUnit.attempts >= self.max_attempts,
+            )
+            .values(status="failed", error_message="lease expired", finished_at=func.now())
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def summary(self, scrape_log_id: UUID) -> dict:
+        """Unit counts by status and summed counters of a sync's finished units."""
+        result = await self.db.execute(
+            select(
+                CrawlUnit.status,
+                func.count(),
+                *(func.coalesce(func.sum(getattr(CrawlUnit, c)), 0) for c in COUNTERS),
+            )
+            .where(CrawlUnit.scrape_log_id == scrape_log_id)
+            .group_by(CrawlUnit.status)
+        )
+        summary = {"pending": 0, "leased": 0, "done": 0, "failed": 0, **{c: 0 for c in COUNTERS}}
+        for status, count, *sums in result.all():
+            summary[status] = count
+            for name, value in zip(COUNTERS, sums):
+                summary[name] += int(value)
+        await self.db.commit()
+        return summary
+
+    def _settle(self, unit: CrawlUnit):
+        # Only the current lease holder may settle a unit.
+        return update(CrawlUnit).where(
+            CrawlUnit.id == unit.id,
+            CrawlUnit.status == "leased",
+            CrawlUnit.leased_by == self.worker,
+        )
+
+
+class PartitionedScraper(BaseScraper):
+    """A scraper whose fetch is split into crawl units that any worker can process."""
+
+    # Also the key of this scraper's units in crawl_units and of its rate budget
+    SOURCE: str
+    RATE_PER_SEC = 1.0
+    RATE_BURST = 1.0
+
+    @abstractmethod
+    def plan(self) -> list[dict]:
+        """Parameters of the units a sync starts with."""
+        ...
+
+    @abstractmethod
+    async def fetch_unit(self, client: httpx.AsyncClient, params: dict) -> tuple[list, list[dict]]:
+        """Fetch one unit: its raw records and the parameters of follow-up units."""
+        ...
+
+    async def collect(self):
+        queue = CrawlQueue(self.db)
+        if self.resume:
+            reopened = await queue.reopen(self.log.id)
+            logger.info(f"[{self.source_name}] Resuming sync {self.log.id}, {reopened} units reopened")
+        # Planned units a resumed sync already has are left as they are.
+        await queue.enqueue(self.log.id, self.SOURCE, self.plan())
+        await self.report_progress("writing", force=True)
+        while True:
+            await self.work(queue, self.log.id)
+            await queue.expire(self.log.id)
+            summary = await queue.summary(self.log.id)
+            self.stats.update({c: summary[c] for c in COUNTERS})
+            if not summary["pending"] and not summary["leased"]:
+                break
+            # Units other workers hold; a dead worker's unit becomes claimable again.
+            await self.report_progress("writing")
+            await asyncio.sleep(POLL_INTERVAL_SEC)
+        self.crawl_complete = not summary["failed"]
+        if summary["failed"]:
+            logger.warning(f"[{self.source_name}] {summary['failed']} crawl units failed")
+        await self._count_written()
+
+    async def _count_written(self):
+        """Count the sync's created and updated grants once each.
+
+        Units sum what they wrote, so a grant listed under several keywords
+        would be counted once per unit. Every write stamps
+        ``last_synced_at``, so the grants the sync wrote are those stamped
+        since it started, and the ones it created also date from then.
+        """
+        since = self.log.started_at
+        result = await self.db.execute(
+            select(func.count(), func.count().filter(Grant.created_at >= since))
+            .where(Grant.source == self.SOURCE, Grant.last_synced_at >= since)
+        )
+        written, created = result.one()
+        await self.db.commit()
+        self.stats["records_created"] = created
+        self.stats["records_updated"] = written - created
+
+    async def work(self, queue: CrawlQueue, scrape_log_id: Optional[UUID] = None) -> int:
+        """Process units until none is claimable; returns how many were processed."""
+        processed = 0
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            while (unit := await queue.claim(scrape_log_id)) is not None:
+                await self.process(queue, client, unit)
+                processed += 1
+        return processed
+
+    async def process(self, queue: CrawlQueue, client: httpx.AsyncClient, unit: CrawlUnit):
+        before = {c: self.stats[c] for c in COUNTERS}
+        if not await self._take_token(queue, unit):
+            logger.warning(f"[crawl] Lost the lease on unit {unit.id} while waiting for the rate budget")
+            return
+        try:
+            raw_items, follow_ups = await self.fetch_unit(client, unit.params)
+            self.stats["pages_fetched"] += 1
+            # Concurrent units can share grants; writing in one order keeps them from deadlocking.
+            parsed_items = sorted(self.parse(raw_items), key=lambda item: item["source_id"])
+            self.stats["records_found"] += len(parsed_items)
+            await self.write(parsed_items)
+        except RetryUnit:
+            await self.db.rollback()
+            self._pending_ids = []
+            await queue.release(unit)
+            return
+        except Exception as e:
+            await self.db.rollback()
+            self._pending_ids = []
+            logger.error(f"[{self.source_name}] Crawl unit {unit.params} failed: {e}")
+            await queue.fail(unit, str(e))
+            return
+        counters = {c: self.stats[c] - before[c] for c in COUNTERS}
+        await queue.complete(unit, counters, follow_ups)
+
+    async def _take_token(self, queue: CrawlQueue, unit: CrawlUnit) -> bool:
+        """Wait for an upstream token, renewing the unit's lease to cover each wait.
+
+        A throttle pause can outlast a lease; without renewing, the unit would
+        be claimed again meanwhile, spending an attempt and fetching twice.
+        """
+        while (wait := await try_take_token(
+            self.db.bind, self.SOURCE, self.RATE_PER_SEC, self.RATE_BURST
+        )) > 0:
+            if not await queue.renew(unit, wait):
+                return False
+            await asyncio.sleep(wait)
+        return True
+
+
+async def serve(
+    db: AsyncSession,
+    scrapers: dict[str, PartitionedScraper],
+    idle_sec: float = 5.0,
+    stop: Optional[asyncio.Event] = None,
+):
+    """Work on units of any running sync until ``stop`` is set; ``scrapers`` maps unit source to scraper."""
+    queue = CrawlQueue(db)
+    clients = {}
+    try:
+        while stop is None or not stop.is_set():
+            unit = await queue.claim()
+            if unit is None:
+                try:
+                    await asyncio.wait_for((stop or asyncio.Event()).wait(), timeout=idle_sec)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            scraper = scrapers.get(unit.source)
+            if scraper is None:
+                logger.error(f"[crawl] No scraper for units of '{unit.source}'")
+                await queue.release(unit)
+                await asyncio.sleep(idle_sec)
+                continue
+            if unit.source not in clients:
+                clients[unit.source] = httpx.AsyncClient(timeout=30.0)
+            await scraper.process(queue, clients[unit.source], unit)
+    finally:
+        for client in clients.values():
+            await client.aclose()
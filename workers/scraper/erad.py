@@ -5,30 +5,38 @@ import asyncio
 import re
 import logging
 
-from workers.scraper.base import BaseScraper
+from workers.scraper.crawl import PartitionedScraper
 
 logger = logging.getLogger(__name__)
 
 
-class ERadScraper(BaseScraper):
-    """e-Rad public offering list scraper."""
+class ERadScraper(PartitionedScraper):
+    """e-Rad public offering list scraper.
+
+    The list is a single page, crawled as a single unit so that e-Rad syncs
+    are checkpointed and resumed like JGrants ones.
+    """
 
     BASE_URL = "https://www.e-rad.go.jp"
 
-    async def fetch(self) -> list:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            headers = {
-                "User-Agent": "GrantDraft/1.0 (research-grant-aggregator)",
-                "Accept": "text/html",
-                "Accept-Language": "ja,en;q=0.9",
-            }
-            resp = await client.get(
-                f"{self.BASE_URL}/offer_list.html",
-                headers=headers,
-                follow_redirects=True,
-            )
-            resp.raise_for_status()
-            return [resp.text]
+    SOURCE = "erad"
+
+    def plan(self) -> list[dict]:
+        return [{"page": "offer_list"}]
+
+    async def fetch_unit(self, client: httpx.AsyncClient, params: dict) -> tuple[list, list[dict]]:
+        headers = {
+            "User-Agent": "GrantDraft/1.0 (research-grant-aggregator)",
+            "Accept": "text/html",
+            "Accept-Language": "ja,en;q=0.9",
+        }
+        resp = await client.get(
+            f"{self.BASE_URL}/{params['page']}.html",
+            headers=headers,
+            follow_redirects=True,
+        )
+        resp.raise_for_status()
+        return [resp.text], []
 
     def parse(self, raw_data: list) -> list[dict]:
         html = raw_data[0]
@@ -1,81 +1,71 @@
 import httpx
-import asyncio
 from datetime import datetime, date
 import logging
 
-from workers.scraper.base import BaseScraper
+from config import settings
+from workers.scraper.crawl import PartitionedScraper, RetryUnit, pause_budget
 
 logger = logging.getLogger(__name__)
 
 
-class JGrantsScraper(BaseScraper):
-    """JGrants API integration worker."""
+class JGrantsScraper(PartitionedScraper):
+    """JGrants API integration worker.
 
-    KEYWORDS = ["研究", "科学技術", "イノベーション", "スタートアップ", "事業"]
-
-    async def fetch(self) -> list:
-        all_results = []
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for keyword in self.KEYWORDS:
-                offset = 0
-                while True:
-                    params = {
-                        "keyword": keyword,
-                        "sort": "created_date",
-                        "order": "DESC",
-                        "acceptance": 1,
-                        "limit": 100,
-                        "offset": offset,
-                    }
-                    headers = {
-                        "User-Agent": "GrantDraft/1.0 (research-grant-aggregator)",
-                        "Accept": "application/json",
-                    }
-                    try:
-                        resp = await client.get(
-                            "https://api.jgrants-portal.go.jp/exp/v1/public/subsidies",
-                            params=params,
-                            headers=headers,
-                        )
-                        if resp.status_code == 403:
-                            logger.warning(f"[JGrants] 403 received for keyword='{keyword}', waiting 5 min...")
-                            await asyncio.sleep(300)
-                            continue
-
-                        resp.raise_for_status()
-                        data = resp.json()
-                    except httpx.HTTPStatusError as e:
-                        logger.error(f"[JGrants] HTTP error: {e}")
-                        break
-                    except Exception as e:
-                        logger.error(f"[JGrants] Request error: {e}")
-                        break
-
-                    results = data.get("result", [])
-                    if not results:
-                        break
-
-                    all_results.extend(results)
-                    offset += len(results)
+    Each keyword's search pages are crawl units, so any number of workers
+    can share one sync; records seen under several keywords are upserted
+    once per page they appear on.
+    """
 
-                    if len(results) < 100:
-                        break
-
-                    await asyncio.sleep(1.0)
-
-                await asyncio.sleep(1.0)
-
-        # Deduplicate by source ID
-        seen = set()
-        unique = []
-        for item in all_results:
-            sid = str(item.get("id", ""))
-            if sid and sid not in seen:
-                seen.add(sid)
-                unique.append(item)
+    KEYWORDS = ["研究", "科学技術", "イノベーション", "スタートアップ", "事業"]
 
-        logger.info(f"[JGrants] Fetched {len(unique)} unique records (from {len(all_results)} total)")
-        return unique
+    SOURCE = "jgrants"
+    RATE_PER_SEC = settings.JGRANTS_RATE_PER_SEC
+    RATE_BURST = settings.JGRANTS_RATE_BURST
+    PAGE_SIZE = 100
+    # Seconds every worker holds off JGrants after a 403
+    THROTTLE_PAUSE_SEC = 300
+
+    def plan(self) -> list[dict]:
+        return [{"keyword": keyword, "offset": 0} for keyword in self.KEYWORDS]
+
+    async def fetch_unit(self, client: httpx.AsyncClient, params: dict) -> tuple[list, list[dict]]:
+        """One search page. The first page of a keyword plans all remaining pages when
+        the response reports a total; otherwise each full page plans the next one."""
+        keyword, offset = params["keyword"], params["offset"]
+        resp = await client.get(
+            f"{settings.JGRANTS_API_BASE_URL}/subsidies",
+            params={
+                "keyword": keyword,
+                "sort": "created_date",
+                "order": "DESC",
+                "acceptance": 1,
+                "limit": self.PAGE_SIZE,
+                "offset": offset,
+            },
+            headers={
+                "User-Agent": "GrantDraft/1.0 (research-grant-aggregator)",
+                "Accept": "application/json",
+            },
+        )
+        if resp.status_code == 403:
+            logger.warning(
+                f"[JGrants] 403 received for keyword='{keyword}', pausing all workers for "
+                f"{self.THROTTLE_PAUSE_SEC}s"
+            )
+            await pause_budget(self.db.bind, self.SOURCE, self.RATE_PER_SEC, self.THROTTLE_PAUSE_SEC)
+            raise RetryUnit()
+        resp.raise_for_status()
+        data = resp.json()
+
+        results = data.get("result", [])
+        if len(results) < self.PAGE_SIZE:
+            return results, []
+        total = (data.get("metadata") or {}).get("resultset", {}).get("count")
+        if offset == 0 and isinstance(total, int):
+            offsets = range(self.PAGE_SIZE, total, self.PAGE_SIZE)
+        else:
+            offsets = [offset + len(results)]
+        return results, [{"keyword": keyword, "offset": o} for o in offsets]
 
     def parse(self, raw_data: list) -> list[dict]:
         parsed = []
@@ -0,0 +1,410 @@
+"""Partition upkeep and retention for ``scrape_logs``, and the grant archive.
+
+``scrape_logs`` is range-partitioned by calendar month (UTC) on ``started_at``.
+Each run creates the partitions for the current month and a few months ahead,
+then folds every month older than the retention window into per-day,
+per-source totals in ``scrape_log_daily`` and drops it. Dropping a partition
+is a catalogue operation, so retention costs the same however many rows the
+month held, and leaves no dead tuples behind in the live months.
+
+Grants closed for ``--archive-after-days`` past their deadline, or withdrawn
+(no longer listed upstream) for as long, are moved with their payload history
+into ``grants_archive`` and ``grant_raw_snapshots_archive``, so ``grants``
+and its indexes only hold current opportunities. Deleting them leaves
+tombstones for change-feed clients, as any grant deletion does; duplicates
+of an archived canonical grant are regrouped under the oldest survivor.
+
+Writes to ``grants`` append their rollup deltas to ``grant_rollups``; each
+run folds every group's deltas back into a single row.
+
+Run it from cron or a scheduler alongside the scrapers:
+
+    python -m workers.scraper.maintenance --retention-months 6 --archive-after-days 180
+"""
+import argparse
+import asyncio
+import logging
+import re
+import sys
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "apps", "api"))
+sys.path.insert(0, "/app")
+
+from sqlalchemy import Date, Float, all_, and_, any_, case, cast, delete, func, insert, literal, null, or_, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from events import GRANTS_CHANGED_CHANNEL, grants_changed_payload
+from models.grant import (
+    Grant,
+    GrantArchive,
+    GrantRawSnapshot,
+    GrantRawSnapshotArchive,
+    GrantRollup,
+    ScrapeLog,
+    ScrapeLogDaily,
+)
+
+logger = logging.getLogger(__name__)
+
+RETENTION_MONTHS = 6
+PARTITIONS_AHEAD = 2
+DEFAULT_PARTITION = "scrape_logs_default"
+
+ARCHIVE_AFTER_DAYS = 180
+# Grants moved per transaction
+ARCHIVE_BATCH_SIZE = 1000
+
+_PARTITION_RE = re.compile(r"^scrape_logs_p(\d{4})(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"scrape_logs_p{month:%Y%m}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+class ScrapeLogMaintenance:
+    """Create upcoming ``scrape_logs`` partitions and retire expired ones."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        retention_months: int = RETENTION_MONTHS,
+        months_ahead: int = PARTITIONS_AHEAD,
+        today: Optional[date] = None,
+    ):
+        self.db = db
+        self.retention_months = retention_months
+        self.months_ahead = months_ahead
+        self.today = today or datetime.now(timezone.utc).date()
+        self.stats = {"created": [], "dropped": [], "summarized_days": 0}
+
+    @property
+    def cutoff(self) -> date:
+        """First month that is kept; everything started before it is summarized."""
+        return add_months(month_start(self.today), -self.retention_months)
+
+    async def run(self) -> dict:
+        await self.ensure_partitions()
+        await self.retire_expired()
+        logger.info(f"[scrape_logs] {self.stats}")
+        return self.stats
+
+    async def partitions(self) -> dict[date, str]:
+        """Monthly partitions currently attached to ``scrape_logs``."""
+        result = await self.db.execute(text("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'scrape_logs'::regclass
+        """))
+        found = {}
+        for name in result.scalars().all():
+            month = parse_partition_name(name)
+            if month:
+                found[month] = name
+        return found
+
+    async def ensure_partitions(self):
+        """Create partitions from the current month through ``months_ahead`` months out."""
+        existing = await self.partitions()
+        current = month_start(self.today)
+        for offset in range(self.months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                await self._create_partition(month)
+                self.stats["created"].append(partition_name(month))
+        await self.db.commit()
+
+    async def _create_partition(self, month: date):
+        """Create ``month``'s partition, moving its rows out of the default partition.
+
+        ``CREATE TABLE ... PARTITION OF`` refuses to run while the default
+        partition holds rows for the new range, so the table is built
+        standalone, filled from the default partition and then attached.
+        """
+        name = partition_name(month)
+        lower, upper = _bound(month), _bound(add_months(month, 1))
+        await self.db.execute(text(
+            f"CREATE TABLE {name} (LIKE scrape_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        await self.db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE started_at >= {lower} AND started_at < {upper}
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """))
+        await self.db.execute(text(
+            f"ALTER TABLE scrape_logs ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"
+        ))
+
+    async def retire_expired(self):
+        """Summarize every run started before the cutoff, then drop or delete it."""
+        cutoff = self.cutoff
+        cutoff_at = datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)
+        self.stats["summarized_days"] = await self._summarize(ScrapeLog.started_at < cutoff_at)
+
+        for month, name in sorted((await self.partitions()).items()):
+            if month < cutoff:
+                await self.db.execute(text(f"DROP TABLE {name}"))
+                self.stats["dropped"].append(name)
+        # Runs that predate every monthly partition.
+        await self.db.execute(text(
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE started_at < {_bound(cutoff)}"
+        ))
+        await self.db.commit()
+
+    async def _summarize(self, condition) -> int:
+        day = cast(func.timezone("UTC", ScrapeLog.started_at), Date)
+        duration = func.coalesce(
+            func.extract("epoch", ScrapeLog.finished_at - ScrapeLog.started_at), 0
+        )
+        summary = (
+            select(
+                day,
+                ScrapeLog.source_id,
+                func.count(),
+                func.count().filter(ScrapeLog.status == "success"),
+                func.count().filter(ScrapeLog.status == "failed"),
+                func.coalesce(func.sum(ScrapeLog.records_found), 0),
+                func.coalesce(func.sum(ScrapeLog.records_created), 0),
+                func.coalesce(func.sum(ScrapeLog.records_updated), 0),
+                cast(func.sum(duration), Float),
+            )
+            .where(condition)
+            .group_by(day, ScrapeLog.source_id)
+        )
+        columns = [
+            "day", "source_id", "runs", "succeeded", "failed",
+            "records_found", "records_created", "records_updated", "duration_sec",
+        ]
+        stmt = pg_insert(ScrapeLogDaily).from_select(columns, summary)
+        # Days never straddle the month-aligned cutoff, but backdated rows can
+        # land in a day that was already summarized; add rather than overwrite.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "source_id"],
+            set_={
+                column: getattr(ScrapeLogDaily, column) + getattr(stmt.excluded, column)
+                for column in columns[2:]
+            },
+        ).returning(literal(1))
+        result = await self.db.execute(stmt)
+        return len(result.all())
+
+
+def _move(source, target, condition):
+    """``DELETE FROM source ... RETURNING *`` inserted into ``target``, as one statement."""
+    names = [column.name for column in source.__table__.columns]
+    moved = delete(source).where(condition).returning(*source.__table__.columns).cte("moved")
+    return insert(target).from_select(names, select(*(moved.c[name] for name in names)))
+
+
+class GrantArchiver:
+    """Move grants closed or withdrawn for ``after_days`` out of the hot tables."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        after_days: int = ARCHIVE_AFTER_DAYS,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        today: Optional[date] = None,
+    ):
+        self.db = db
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.today = today or datetime.now(timezone.utc).date()
+        self.stats = {"archived": 0}
+
+    @property
+    def cutoff(self) -> date:
+        return self.today - timedelta(days=self.after_days)
+
+    def archivable(self):
+        cutoff = self.cutoff
+        cutoff_at = datetime(cutoff.year, cutoff.month, cutoff.day, tzinfo=timezone.utc)
+        return or_(
+            and_(Grant.status == "withdrawn", Grant.updated_at < cutoff_at),
+            and_(
+                Grant.status == "closed",
+                func.coalesce(Grant.application_deadline, cast(Grant.updated_at, Date)) < cutoff,
+            ),
+        )
+
+    async def run(self) -> dict:
+        while await self._archive_batch() == self.batch_size:
+            pass
+        logger.info(f"[grants_archive] {self.stats}")
+        return self.stats
+
+    async def _archive_batch(self) -> int:
+        result = await self.db.execute(
+            select(Grant.id)
+            .where(self.archivable())
+            .order_by(Grant.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        ids = list(result.scalars().all())
+        if not ids:
+            await self.db.commit()
+            return 0
+        batch = literal(ids, ARRAY(PG_UUID(as_uuid=True)))
+        regrouped = await self._promote_heirs(batch)
+        # Payloads first: deleting the grants would cascade to them.
+        await self.db.execute(
+            _move(GrantRawSnapshot, GrantRawSnapshotArchive, GrantRawSnapshot.grant_id == any_(batch))
+        )
+        await self.db.execute(_move(Grant, GrantArchive, Grant.id == any_(batch)))
+        version = (await self.db.execute(select(func.next_grants_version()))).scalar()
+        await self.db.execute(
+            select(func.pg_notify(
+                GRANTS_CHANGED_CHANNEL, grants_changed_payload([*ids, *regrouped], version)
+            ))
+        )
+        await self.db.commit()
+        self.stats["archived"] += len(ids)
+        return len(ids)
+
+    async def _promote_heirs(self, batch) -> list:
+        """Regroup the remaining duplicates of canonical grants about to be archived.
+
+        Deleting a canonical grant would null its duplicates' ``canonical_id``
+        and leave each of them listed on its own; the oldest survivor becomes
+        the group's canonical grant instead, as the deduplicator would pick it.
+        """
+        survivors = and_(Grant.canonical_id == any_(batch), Grant.id != all_(batch))
+        heirs = (
+            select(Grant.canonical_id.label("group_id"), Grant.id.label("heir_id"))
+            .where(survivors)
+            .distinct(Grant.canonical_id)
+            .order_by(Grant.canonical_id, Grant.created_at, Grant.id)
+            .subquery("heirs")
+        )
+        result = await self.db.execute(
+            update(Grant)
+            .where(survivors, Grant.canonical_id == heirs.c.group_id)
+            .values(canonical_id=case((Grant.id == heirs.c.heir_id, null()), else_=heirs.c.heir_id))
+            .returning(Grant.id)
+        )
+        return list(result.scalars().all())
+
+
+ROLLUP_GROUP = ("dimension", "key", "source", "status", "category", "canonical")
+
+
+class RollupCompactor:
+    """Fold the delta rows writes append to ``grant_rollups`` into one row per group.
+
+    Deleting and re-inserting happen in one statement, so readers summing a
+    group see the same totals before and after. Deltas committed meanwhile
+    are left for the next run.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.stats = {"folded_rows": 0, "groups": 0}
+
+    async def run(self) -> dict:
+        group = [getattr(GrantRollup, column) for column in ROLLUP_GROUP]
+        count, total = func.sum(GrantRollup.grant_count), func.sum(GrantRollup.amount_max_sum)
+        # Groups with several rows, or a single row that nets out to nothing.
+        unfolded = (
+            select(func.unnest(func.array_agg(GrantRollup.id)))
+            .group_by(*group)
+            .having(or_(func.count() > 1, and_(count == 0, total == 0)))
+        )
+        folded = (
+            delete(GrantRollup)
+            .where(GrantRollup.id.in_(unfolded))
+            .returning(*GrantRollup.__table__.columns)
+            .cte("folded")
+        )
+        count, total = func.sum(folded.c.grant_count), func.sum(folded.c.amount_max_sum)
+        keys = [folded.c[column] for column in ROLLUP_GROUP]
+        inserted = (
+            insert(GrantRollup)
+            .from_select(
+                [*ROLLUP_GROUP, "grant_count", "amount_max_sum"],
+                select(*keys, count, total).group_by(*keys).having(or_(count != 0, total != 0)),
+            )
+            .returning(GrantRollup.id)
+            .cte("inserted")
+        )
+        result = await self.db.execute(select(
+            select(func.count()).select_from(folded).scalar_subquery(),
+            select(func.count()).select_from(inserted).scalar_subquery(),
+        ))
+        self.stats["folded_rows"], self.stats["groups"] = result.one()
+        await self.db.commit()
+        logger.info(f"[grant_rollups] {self.stats}")
+        return self.stats
+
+
+async def main(retention_months: int, months_ahead: int, archive_after_days: int):
+    database_url = os.environ.get(
+        "DATABASE_URL",
+        "postgresql+asyncpg://grantdraft:grantdraft_dev@db:5432/grantdraft",
+    )
+    engine = create_async_engine(database_url, echo=False)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        stats = await ScrapeLogMaintenance(session, retention_months, months_ahead).run()
+        logger.info(f"Scrape log maintenance finished: {stats}")
+        stats = await GrantArchiver(session, archive_after_days).run()
+        logger.info(f"Grant archiving finished: {stats}")
+        stats = await RollupCompactor(session).run()
+        logger.info(f"Rollup compaction finished: {stats}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="GrantDraft scrape log partition maintenance, grant archiving and rollup compaction")
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=int(os.environ.get("SCRAPE_LOG_RETENTION_MONTHS", RETENTION_MONTHS)),
+        help="Whole months of detailed scrape logs to keep besides the current one",
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=PARTITIONS_AHEAD,
+        help="Partitions to create ahead of the current month",
+    )
+    parser.add_argument(
+        "--archive-after-days",
+        type=int,
+        default=int(os.environ.get("GRANT_ARCHIVE_AFTER_DAYS", ARCHIVE_AFTER_DAYS)),
+        help="Days a grant stays closed or withdrawn before it is archived",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.retention_months, args.months_ahead, args.archive_after_days))
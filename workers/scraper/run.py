@@ -1,3 +1,4 @@
+from uuid import UUID
 import argparse
 import asyncio
 import logging
@@ -44,6 +45,70 @@ async def main(source: str):
     await engine.dispose()
 
 
+async def resume(log_id: UUID):
+    """Continue an interrupted or failed sync from its crawl checkpoint."""
+    from sqlalchemy import select
+    from models.grant import ScrapeLog, ScrapeSource
+    from workers.scraper.erad import ERadScraper
+    from workers.scraper.jgrants import JGrantsScraper
+
+    scrapers = {"JGrants API": JGrantsScraper, "e-Rad公募一覧": ERadScraper}
+    database_url = os.environ.get(
+        "DATABASE_URL",
+        "postgresql+asyncpg://grantdraft:grantdraft_dev@db:5432/grantdraft",
+    )
+    engine = create_async_engine(database_url, echo=False)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        result = await session.execute(
+            select(ScrapeLog.status, ScrapeSource.name)
+            .join(ScrapeSource, ScrapeSource.id == ScrapeLog.source_id)
+            .where(ScrapeLog.id == log_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            logger.error(f"Scrape log {log_id} not found")
+        elif row.name not in scrapers:
+            logger.error(f"No scraper for source '{row.name}'")
+        else:
+            if row.status == "running":
+                logger.warning(f"Sync {log_id} is marked running; resuming it alongside any live worker")
+            elif row.status == "success":
+                logger.info(f"Sync {log_id} already completed; only its failed units are retried")
+            logger.info(f"Resuming {row.name} sync {log_id}...")
+            scraper = scrapers[row.name](session, row.name, log_id=log_id, resume=True)
+            stats = await scraper.run()
+            logger.info(f"{row.name} sync finished: {stats}")
+
+    await engine.dispose()
+
+
+async def crawl_worker():
+    """Help with the crawl units of whichever syncs are running, until interrupted."""
+    from workers.scraper.crawl import serve
+    from workers.scraper.erad import ERadScraper
+    from workers.scraper.jgrants import JGrantsScraper
+
+    database_url = os.environ.get(
+        "DATABASE_URL",
+        "postgresql+asyncpg://grantdraft:grantdraft_dev@db:5432/grantdraft",
+    )
+    engine = create_async_engine(database_url, echo=False)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        scrapers = {
+            JGrantsScraper.SOURCE: JGrantsScraper(session, "JGrants API"),
+            ERadScraper.SOURCE: ERadScraper(session, "e-Rad公募一覧"),
+        }
+        logger.info(f"Crawl worker claiming units for: {', '.join(scrapers)}")
+        try:
+            await serve(session, scrapers)
+        finally:
+            await engine.dispose()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="GrantDraft data collection worker")
     parser.add_argument(
@@ -52,5 +117,21 @@ if __name__ == "__main__":
         default="all",
         help="Data source to scrape",
     )
+    parser.add_argument(
+        "--crawl-worker",
+        action="store_true",
+        help="Instead of starting a sync, process crawl units of running syncs",
+    )
+    parser.add_argument(
+        "--resume",
+        type=UUID,
+        metavar="LOG_ID",
+        help="Continue the interrupted or failed sync with this scrape log id",
+    )
     args = parser.parse_args()
-    asyncio.run(main(args.source))
+    if args.crawl_worker:
+        asyncio.run(crawl_worker())
+    elif args.resume:
+        asyncio.run(resume(args.resume))
+    else:
+        asyncio.run(main(args.source))
@@ -0,0 +1,98 @@
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "apps", "api"))
+sys.path.insert(0, "/app")
+
+from workers.scraper.dedup import (
+    BANDS,
+    NUM_HASHES,
+    SIMILARITY_THRESHOLD,
+    Member,
+    band_buckets,
+    cluster,
+    normalize,
+    shingles,
+    signature,
+    similarity,
+    text_hash,
+)
+
+
+def _sig(title, organization):
+    return signature(shingles(title, organization))
+
+
+class TestMinHash:
+    def test_normalize_folds_width_case_and_punctuation(self):
+        assert normalize("ＡＢＣ　研究、支援（2026）") == "abc研究支援2026"
+
+    def test_normalize_empty(self):
+        assert normalize(None) == ""
+
+    def test_signature_length(self):
+        assert len(_sig("研究開発支援事業", "文部科学省")) == NUM_HASHES
+
+    def test_identical_text_same_signature(self):
+        assert _sig("研究開発支援事業", "文部科学省") == _sig("研究開発支援事業", "文部科学省")
+
+    def test_formatting_differences_ignored(self):
+        a = _sig("令和8年度 研究開発支援事業（第2回）", "文部科学省")
+        b = _sig("令和８年度　研究開発支援事業 第2回", "文部科学省")
+        assert similarity(a, b) == 1.0
+
+    def test_near_duplicate_is_similar(self):
+        a = _sig("戦略的創造研究推進事業 さきがけ 2026年度 研究提案募集", "科学技術振興機構")
+        b = _sig("戦略的創造研究推進事業 さきがけ 2026年度研究提案の募集", "科学技術振興機構")
+        assert similarity(a, b) >= SIMILARITY_THRESHOLD
+
+    def test_unrelated_is_dissimilar(self):
+        a = _sig("戦略的創造研究推進事業 さきがけ", "科学技術振興機構")
+        b = _sig("小規模事業者持続化補助金", "中小企業庁")
+        assert similarity(a, b) < 0.3
+
+    def test_identical_signatures_share_every_bucket(self):
+        sig = _sig("研究開発支援事業", "文部科学省")
+        assert band_buckets(sig) == band_buckets(list(sig))
+        assert len(band_buckets(sig)) == BANDS
+
+    def test_signature_fits_bigint(self):
+        sig = _sig("国際共同研究プログラム", "JSPS")
+        assert all(-(1 << 63) <= v < (1 << 63) for v in sig)
+
+    def test_text_hash_matches_sql_concat(self):
+        import hashlib
+        assert text_hash("a", "b") == hashlib.md5("a|b".encode()).hexdigest()
+
+
+class TestCluster:
+    def _members(self, n):
+        return {
+            m.id: m
+            for m in (
+                Member(uuid4(), datetime(2026, 1, i + 1, tzinfo=timezone.utc))
+                for i in range(n)
+            )
+        }
+
+    def test_singletons_are_canonical(self):
+        members = self._members(3)
+        assert set(cluster(members, []).values()) == {None}
+
+    def test_oldest_member_is_canonical(self):
+        members = self._members(3)
+        oldest, middle, newest = sorted(members.values(), key=lambda m: m.created_at)
+        result = cluster(members, [(newest.id, middle.id)])
+        assert result[middle.id] is None
+        assert result[newest.id] == middle.id
+        assert result[oldest.id] is None
+
+    def test_transitive_pairs_form_one_group(self):
+        members = self._members(3)
+        a, b, c = sorted(members.values(), key=lambda m: m.created_at)
+        result = cluster(members, [(c.id, b.id), (b.id, a.id)])
+        assert result == {a.id: None, b.id: a.id, c.id: a.id}
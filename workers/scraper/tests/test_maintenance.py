@@ -0,0 +1,43 @@
+from datetime import date
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "apps", "api"))
+sys.path.insert(0, "/app")
+
+from workers.scraper.maintenance import (
+    ScrapeLogMaintenance,
+    add_months,
+    month_start,
+    parse_partition_name,
+    partition_name,
+)
+
+
+class TestPartitionNaming:
+    def test_partition_name(self):
+        assert partition_name(date(2026, 3, 1)) == "scrape_logs_p202603"
+
+    def test_parse_round_trip(self):
+        assert parse_partition_name(partition_name(date(2027, 12, 1))) == date(2027, 12, 1)
+
+    def test_parse_ignores_default_partition(self):
+        assert parse_partition_name("scrape_logs_default") is None
+
+    def test_add_months_crosses_years(self):
+        assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+        assert add_months(date(2026, 2, 1), -3) == date(2025, 11, 1)
+
+    def test_month_start(self):
+        assert month_start(date(2026, 10, 19)) == date(2026, 10, 1)
+
+
+class TestRetentionCutoff:
+    def test_cutoff_keeps_whole_months(self):
+        maintenance = ScrapeLogMaintenance(None, retention_months=6, today=date(2026, 10, 19))
+        assert maintenance.cutoff == date(2026, 4, 1)
+
+    def test_zero_retention_keeps_current_month(self):
+        maintenance = ScrapeLogMaintenance(None, retention_months=0, today=date(2026, 1, 31))
+        assert maintenance.cutoff == date(2026, 1, 1)